@@ -1,10 +1,12 @@
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
+import time
 from typing import Optional
 import uuid
 
 from app.core.config import settings
-from app.models.schemas import WeekPlanning, HistoryEntry, HistoryEntryType
+from app.models.schemas import WeekPlanning, HistoryEntry, HistoryEntryType, ChatSession
 
 
 # In-memory storage for current session
@@ -12,8 +14,13 @@ from app.models.schemas import WeekPlanning, HistoryEntry, HistoryEntryType
 class PlanningStore:
     def __init__(self):
         self._current_planning: Optional[WeekPlanning] = None
+        self._plannings: dict[tuple[int, int], WeekPlanning] = {}
         self._planning_file: Optional[Path] = None
         self._uploaded_files: dict[str, Path] = {}
+        self._exports: dict[str, Path] = {}
+        self._ingestions: dict[str, dict] = {}
+        # session_id -> (dernier accès, session), du moins au plus récemment utilisé
+        self._chat_sessions: OrderedDict[str, tuple[float, ChatSession]] = OrderedDict()
         self._history: list[HistoryEntry] = []
 
     @property
@@ -23,6 +30,28 @@ class PlanningStore:
     @current_planning.setter
     def current_planning(self, value: WeekPlanning):
         self._current_planning = value
+        if value is not None:
+            self._plannings[(value.year, value.week_number)] = value
+
+    @property
+    def plannings(self) -> list[WeekPlanning]:
+        """Semaines chargées, dans l'ordre chronologique (le planning courant en fait partie)."""
+        return [self._plannings[key] for key in sorted(self._plannings)]
+
+    def get_week(self, week_number: int, year: int) -> Optional[WeekPlanning]:
+        return self._plannings.get((year, week_number))
+
+    def set_week(self, week_number: int, year: int, planning: Optional[WeekPlanning]):
+        """Remplace une semaine chargée (None: la retire), sans changer le planning courant."""
+        if planning is None:
+            self._plannings.pop((year, week_number), None)
+        else:
+            self._plannings[(year, week_number)] = planning
+
+    def load_plannings(self, plannings: list[WeekPlanning]):
+        """Remplace les semaines chargées; la première devient le planning courant."""
+        self._plannings = {(planning.year, planning.week_number): planning for planning in plannings}
+        self._current_planning = plannings[0] if plannings else None
 
     @property
     def planning_file(self) -> Optional[Path]:
@@ -44,6 +73,44 @@ class PlanningStore:
     def get_uploaded_file(self, file_id: str) -> Optional[Path]:
         return self._uploaded_files.get(file_id)
 
+    def add_export(self, file_id: str, file_path: Path):
+        self._exports[file_id] = file_path
+
+    def get_export(self, file_id: str) -> Optional[Path]:
+        return self._exports.get(file_id)
+
+    def get_chat_session(self, session_id: Optional[str] = None) -> ChatSession:
+        """Retourne la session de chat, créée au premier message.
+
+        Les sessions inactives depuis `chat_session_ttl_seconds` sont oubliées,
+        et seules les `chat_max_sessions` plus récentes sont conservées.
+        """
+        session_id = session_id or "default"
+        now = time.monotonic()
+        while self._chat_sessions:
+            oldest_id, (last_used, _) = next(iter(self._chat_sessions.items()))
+            if now - last_used < settings.chat_session_ttl_seconds:
+                break
+            del self._chat_sessions[oldest_id]
+
+        entry = self._chat_sessions.pop(session_id, None)
+        session = entry[1] if entry else ChatSession(id=session_id)
+        self._chat_sessions[session_id] = (now, session)
+        while len(self._chat_sessions) > settings.chat_max_sessions:
+            self._chat_sessions.popitem(last=False)
+        return session
+
+    @property
+    def ingestions(self) -> dict[str, dict]:
+        """Imports PDF en cours: file_id -> {"filename", "done", "total"}."""
+        return self._ingestions
+
+    def set_ingestion_progress(self, file_id: str, filename: str, done: int, total: int):
+        self._ingestions[file_id] = {"filename": filename, "done": done, "total": total}
+
+    def finish_ingestion(self, file_id: str):
+        self._ingestions.pop(file_id, None)
+
     def add_history_entry(
         self,
         entry_type: HistoryEntryType,
@@ -64,8 +131,10 @@ class PlanningStore:
 
     def clear(self):
         self._current_planning = None
+        self._plannings.clear()
         self._planning_file = None
         self._uploaded_files.clear()
+        self._chat_sessions.clear()
         # Ne pas effacer l'historique lors du clear
 
 
@@ -1,47 +1,129 @@
+import json
 import uuid
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
 from app.core.config import settings
 from app.api.deps import PlanningStore, get_planning_store
-from app.models.schemas import ChatMessage, ChatResponse
+from app.models.schemas import ChatMessage, ChatResponse, WeekPlanning
 from app.services.ai_planner import ai_planner
-from app.services.excel_handler import excel_handler
+from app.services.chat_commands import chat_command_parser
+from app.services.planning_writer import planning_writer
 
 router = APIRouter()
 
 
+def _save_chat_planning(store: PlanningStore, new_planning: WeekPlanning):
+    previous_planning = store.current_planning
+    store.current_planning = new_planning
+
+    # Save/update Excel file: écriture différée, la réponse n'attend pas le disque
+    if not store.planning_file:
+        file_id = str(uuid.uuid4())
+        store.planning_file = settings.template_path / f"planning_{file_id}.xlsx"
+        previous_planning = None
+    planning_writer.schedule(store.planning_file, new_planning, previous_planning)
+
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
 @router.post("/message", response_model=ChatResponse)
 async def send_message(
     message: ChatMessage,
+    background_tasks: BackgroundTasks,
     store: PlanningStore = Depends(get_planning_store),
 ):
+    session = store.get_chat_session(message.session_id)
     try:
-        response_text, new_planning = ai_planner.process_chat_message(
+        response_text, new_planning = await ai_planner.process_chat_message(
             message=message.message,
             current_planning=store.current_planning,
+            session=session,
         )
 
         planning_updated = False
         if new_planning:
-            store.current_planning = new_planning
+            _save_chat_planning(store, new_planning)
             planning_updated = True
 
-            # Save/update Excel file
-            if store.planning_file:
-                excel_handler.update_planning_in_excel(store.planning_file, new_planning)
-            else:
-                file_id = str(uuid.uuid4())
-                excel_path = settings.template_path / f"planning_{file_id}.xlsx"
-                wb = excel_handler.create_planning_workbook(new_planning)
-                excel_handler.save_workbook(wb, excel_path)
-                store.planning_file = excel_path
+        # Le résumé de l'historique se fait après l'envoi de la réponse
+        background_tasks.add_task(ai_planner.compact_chat_session, session)
 
         return ChatResponse(
             response=response_text,
             planning_updated=planning_updated,
             planning=store.current_planning,
+            session_id=session.id,
         )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
+
+
+@router.get("/stats")
+async def get_chat_stats():
+    """Taux de messages traités localement, sans appel au modèle."""
+    return {"fast_path": chat_command_parser.stats()}
+
+
+@router.post("/message/stream")
+async def stream_message(
+    message: ChatMessage,
+    store: PlanningStore = Depends(get_planning_store),
+):
+    """Variante Server-Sent Events de /message.
+
+    Événements émis:
+    - token: {"content": str} pour chaque fragment de la réponse
+    - planning: ChatResponse dès que le bloc JSON du planning est complet
+    - done: ChatResponse finale avec la réponse complète
+    - error: {"detail": str} si la génération échoue
+    """
+
+    session = store.get_chat_session(message.session_id)
+
+    async def event_stream():
+        planning_updated = False
+        events = ai_planner.stream_chat_message(
+            message=message.message,
+            current_planning=store.current_planning,
+            session=session,
+        )
+        try:
+            async for event, data in events:
+                if event == "token":
+                    yield _sse_event("token", {"content": data})
+                elif event == "planning":
+                    _save_chat_planning(store, data)
+                    planning_updated = True
+                    yield _sse_event(
+                        "planning",
+                        ChatResponse(response="", planning_updated=True, planning=data).model_dump(),
+                    )
+                elif event == "done":
+                    yield _sse_event(
+                        "done",
+                        ChatResponse(
+                            response=data,
+                            planning_updated=planning_updated,
+                            planning=store.current_planning,
+                            session_id=session.id,
+                        ).model_dump(),
+                    )
+        except Exception as e:
+            yield _sse_event("error", {"detail": f"Error processing message: {str(e)}"})
+        finally:
+            # Client déconnecté: le flux du modèle est fermé au lieu de rester ouvert
+            await events.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Le résumé de l'historique se fait une fois le flux fermé, le client n'attend pas
+        background=BackgroundTask(ai_planner.compact_chat_session, session),
+    )
@@ -3,17 +3,37 @@ from datetime import datetime
 from pathlib import Path
 
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import FileResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
 
 from app.core.config import settings
 from app.api.deps import PlanningStore, get_planning_store
 from app.models.schemas import HistoryEntryType
 from app.services.pdf_generator import pdf_generator
 from app.services.excel_handler import excel_handler
+from app.services.planning_rows import iter_shift_rows, iter_csv, iter_ndjson, iter_columnar
 
 router = APIRouter()
 
 
+def _rows_response(store: PlanningStore, include_empty: bool, encode, media_type: str, extension: str):
+    """Toutes les semaines chargées, une ligne par employé/jour/service, streamées."""
+    plannings = store.plannings
+    if not plannings:
+        raise HTTPException(
+            status_code=400,
+            detail="No planning loaded. Upload a file or generate a planning first.",
+        )
+
+    first, last = plannings[0], plannings[-1]
+    filename = f"planning_{first.year}s{first.week_number}-{last.year}s{last.week_number}.{extension}"
+    return StreamingResponse(
+        encode(iter_shift_rows(plannings, include_empty=include_empty)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/pdf")
 async def export_pdf(
     store: PlanningStore = Depends(get_planning_store),
@@ -65,8 +85,7 @@ async def export_excel(
         file_id = str(uuid.uuid4())
         excel_path = settings.export_path / f"planning_{file_id}.xlsx"
 
-        wb = excel_handler.create_planning_workbook(store.current_planning)
-        excel_handler.save_workbook(wb, excel_path)
+        await run_in_threadpool(excel_handler.write_planning_file, [store.current_planning], excel_path)
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"planning_semaine{store.current_planning.week_number}_{timestamp}.xlsx"
@@ -87,3 +106,87 @@ async def export_excel(
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating Excel: {str(e)}")
+
+
+@router.get("/excel/weeks")
+async def export_excel_weeks(
+    store: PlanningStore = Depends(get_planning_store),
+):
+    """Toutes les semaines chargées dans un seul classeur, un onglet par semaine."""
+    plannings = store.plannings
+    if not plannings:
+        raise HTTPException(
+            status_code=400,
+            detail="No planning loaded. Upload a file or generate a planning first.",
+        )
+
+    try:
+        file_id = str(uuid.uuid4())
+        excel_path = settings.export_path / f"planning_weeks_{file_id}.xlsx"
+
+        await run_in_threadpool(excel_handler.write_planning_file, plannings, excel_path)
+        store.add_export(file_id, excel_path)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = (
+            f"planning_semaines{plannings[0].week_number}-{plannings[-1].week_number}_{timestamp}.xlsx"
+        )
+
+        # Add history entry
+        store.add_history_entry(
+            entry_type=HistoryEntryType.EXPORT_EXCEL,
+            filename=filename,
+            week_number=plannings[0].week_number,
+            year=plannings[0].year,
+        )
+
+        return FileResponse(
+            path=excel_path,
+            filename=filename,
+            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating Excel: {str(e)}")
+
+
+@router.get("/csv")
+async def export_csv(
+    include_empty: bool = False,
+    store: PlanningStore = Depends(get_planning_store),
+):
+    return _rows_response(store, include_empty, iter_csv, "text/csv; charset=utf-8", "csv")
+
+
+@router.get("/ndjson")
+async def export_ndjson(
+    include_empty: bool = False,
+    store: PlanningStore = Depends(get_planning_store),
+):
+    return _rows_response(store, include_empty, iter_ndjson, "application/x-ndjson", "ndjson")
+
+
+@router.get("/columnar")
+async def export_columnar(
+    include_empty: bool = False,
+    store: PlanningStore = Depends(get_planning_store),
+):
+    """Mêmes lignes, regroupées par colonne (chargement direct en DataFrame / Parquet)."""
+    return _rows_response(store, include_empty, iter_columnar, "application/json", "json")
+
+
+@router.get("/excel/{file_id}")
+async def download_excel_export(
+    file_id: str,
+    store: PlanningStore = Depends(get_planning_store),
+):
+    """Télécharge un fichier Excel déjà généré (ex: planning multi-semaines)."""
+    excel_path = store.get_export(file_id)
+    if excel_path is None or not excel_path.exists():
+        raise HTTPException(status_code=404, detail="Export not found")
+
+    return FileResponse(
+        path=excel_path,
+        filename=excel_path.name,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
@@ -1,17 +1,108 @@
+import asyncio
 from datetime import datetime
+import json
+from typing import AsyncGenerator, Optional
 import uuid
 
 from fastapi import APIRouter, HTTPException, Depends, Body
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
 from app.core.config import settings
 from app.api.deps import PlanningStore, get_planning_store
-from app.models.schemas import WeekPlanning, PlanningResponse, AIUpdateRequest
+from app.models.schemas import (
+    WeekPlanning,
+    PlanningResponse,
+    AIUpdateRequest,
+    PlanningEngine,
+    SchedulingConstraints,
+    BatchWeek,
+    BatchGenerateRequest,
+    BatchPlanningResponse,
+)
 from app.services.excel_handler import excel_handler
+from app.services.planning_writer import planning_writer
 from app.services.ai_planner import ai_planner
+from app.services.scheduler import planning_scheduler
 
 router = APIRouter()
 
 
+def _ndjson_line(event: str, data: dict) -> str:
+    return json.dumps({"event": event, "data": data}, ensure_ascii=False) + "\n"
+
+
+def _stream_into_store(
+    store: PlanningStore,
+    events: AsyncGenerator[tuple[str, object], None],
+    week_number: int,
+    year: int,
+    message: str,
+    new_file: bool = False,
+) -> StreamingResponse:
+    """Relaie un planning streamé en NDJSON, une ligne par événement:
+    - {"event": "employee", "data": EmployeeWeekSchedule} dès qu'un employé est complet
+    - {"event": "done", "data": PlanningResponse} avec le planning final
+    - {"event": "error", "data": {"detail": str}} si la génération échoue
+
+    Le planning du store est complété au fur et à mesure; en cas d'échec
+    ou de déconnexion du client, le planning précédent est restauré et la
+    semaine partielle retirée des semaines chargées.
+    """
+    previous_planning = store.current_planning
+    # La semaine générée remplace peut-être une semaine déjà chargée: à remettre en cas d'échec
+    previous_week = store.get_week(week_number, year)
+
+    async def ndjson_stream():
+        partial = WeekPlanning(week_number=week_number, year=year, employees=[])
+        finished = False
+        try:
+            async for event, data in events:
+                if event == "employee":
+                    partial.employees.append(data)
+                    store.current_planning = partial
+                    yield _ndjson_line("employee", data.model_dump())
+                elif event == "planning":
+                    data.week_number = week_number
+                    data.year = year
+                    store.current_planning = data
+                    if new_file:
+                        store.planning_file = None
+                    _save_planning_file(store, data, previous_planning)
+                    finished = True
+                    yield _ndjson_line(
+                        "done", PlanningResponse(success=True, message=message, data=data).model_dump()
+                    )
+        except Exception as e:
+            yield _ndjson_line("error", {"detail": f"Error streaming planning: {str(e)}"})
+        finally:
+            # Échec ou client déconnecté (GeneratorExit / CancelledError): pas de planning partiel
+            if not finished:
+                store.current_planning = previous_planning
+                store.set_week(week_number, year, previous_week)
+            # Ferme le flux du modèle (et sa connexion) s'il n'est pas allé au bout
+            await events.aclose()
+
+    return StreamingResponse(
+        ndjson_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _save_planning_file(
+    store: PlanningStore,
+    planning: WeekPlanning,
+    previous_planning: Optional[WeekPlanning] = None,
+):
+    """Programme l'enregistrement du planning (différé, voir planning_writer)."""
+    if not store.planning_file:
+        file_id = str(uuid.uuid4())
+        store.planning_file = settings.template_path / f"planning_{file_id}.xlsx"
+        previous_planning = None
+    planning_writer.schedule(store.planning_file, planning, previous_planning)
+
+
 @router.get("/current", response_model=PlanningResponse)
 async def get_current_planning(
     store: PlanningStore = Depends(get_planning_store),
@@ -35,11 +126,12 @@ async def update_planning(
     planning: WeekPlanning,
     store: PlanningStore = Depends(get_planning_store),
 ):
+    previous_planning = store.current_planning
     store.current_planning = planning
 
-    # Update Excel file if one exists
+    # Update Excel file if one exists: écriture différée, les modifications rapprochées sont regroupées
     if store.planning_file:
-        excel_handler.update_planning_in_excel(store.planning_file, planning)
+        planning_writer.schedule(store.planning_file, planning, previous_planning)
 
     return PlanningResponse(
         success=True,
@@ -48,11 +140,26 @@ async def update_planning(
     )
 
 
+@router.post("/flush")
+async def flush_planning_file(
+    store: PlanningStore = Depends(get_planning_store),
+):
+    """Attend que le fichier Excel du planning soit à jour sur disque."""
+    if store.planning_file:
+        try:
+            await planning_writer.flush(store.planning_file)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error saving planning file: {str(e)}")
+    return {"planning_file": store.planning_file.name if store.planning_file else None}
+
+
 @router.post("/generate", response_model=PlanningResponse)
 async def generate_planning(
-    instructions: str = Body(..., embed=True),
+    instructions: str = Body(default=""),
     week_number: int = Body(default=None),
     year: int = Body(default=None),
+    engine: PlanningEngine = Body(default=PlanningEngine.AI),
+    constraints: Optional[SchedulingConstraints] = Body(default=None),
     store: PlanningStore = Depends(get_planning_store),
 ):
     # Use current week/year if not specified
@@ -62,25 +169,39 @@ async def generate_planning(
     if year is None:
         year = now.year
 
+    if engine == PlanningEngine.LOCAL and constraints is None:
+        raise HTTPException(status_code=400, detail="The local engine requires scheduling constraints")
+    if engine == PlanningEngine.AI and not instructions.strip():
+        raise HTTPException(status_code=400, detail="Instructions are required for AI generation")
+
     try:
-        planning = ai_planner.generate_planning(
-            instructions=instructions,
-            week_number=week_number,
-            year=year,
-        )
+        message = "Planning generated successfully"
+        if engine == PlanningEngine.LOCAL:
+            planning, warnings = planning_scheduler.generate(
+                constraints=constraints,
+                week_number=week_number,
+                year=year,
+            )
+            if warnings:
+                message += ". Warnings: " + "; ".join(warnings)
+        else:
+            planning = await ai_planner.generate_planning(
+                instructions=instructions,
+                week_number=week_number,
+                year=year,
+            )
 
         store.current_planning = planning
 
         # Save as Excel
         file_id = str(uuid.uuid4())
         excel_path = settings.template_path / f"planning_{file_id}.xlsx"
-        wb = excel_handler.create_planning_workbook(planning)
-        excel_handler.save_workbook(wb, excel_path)
+        await run_in_threadpool(excel_handler.write_planning_file, [planning], excel_path)
         store.planning_file = excel_path
 
         return PlanningResponse(
             success=True,
-            message="Planning generated successfully",
+            message=message,
             data=planning,
         )
 
@@ -88,6 +209,109 @@ async def generate_planning(
         raise HTTPException(status_code=500, detail=f"Error generating planning: {str(e)}")
 
 
+@router.post("/generate/stream")
+async def generate_planning_stream(
+    instructions: str = Body(default=""),
+    week_number: int = Body(default=None),
+    year: int = Body(default=None),
+    store: PlanningStore = Depends(get_planning_store),
+):
+    """Génération IA streamée: chaque employé est envoyé dès que le modèle l'a terminé."""
+    now = datetime.now()
+    if week_number is None:
+        week_number = now.isocalendar()[1]
+    if year is None:
+        year = now.year
+    if not instructions.strip():
+        raise HTTPException(status_code=400, detail="Instructions are required for AI generation")
+
+    events = ai_planner.stream_generate_planning(
+        instructions=instructions,
+        week_number=week_number,
+        year=year,
+    )
+    return _stream_into_store(
+        store, events, week_number, year, "Planning generated successfully", new_file=True
+    )
+
+
+@router.post("/generate-batch", response_model=BatchPlanningResponse)
+async def generate_planning_batch(
+    request: BatchGenerateRequest,
+    store: PlanningStore = Depends(get_planning_store),
+):
+    weeks = list(request.weeks)
+    if request.start_week is not None and request.end_week is not None:
+        year = request.year or datetime.now().year
+        weeks.extend(
+            BatchWeek(week_number=week, year=year)
+            for week in range(request.start_week, request.end_week + 1)
+        )
+    if not weeks:
+        raise HTTPException(status_code=400, detail="No weeks requested")
+    # Une seule génération par semaine, dans l'ordre chronologique
+    weeks = sorted(
+        {(week.year, week.week_number): week for week in reversed(weeks)}.values(),
+        key=lambda week: (week.year, week.week_number),
+    )
+    if request.engine == PlanningEngine.LOCAL and request.constraints is None:
+        raise HTTPException(status_code=400, detail="The local engine requires scheduling constraints")
+
+    semaphore = asyncio.Semaphore(settings.batch_max_concurrency)
+
+    async def generate_week(week: BatchWeek) -> WeekPlanning:
+        if request.engine == PlanningEngine.LOCAL:
+            planning, _ = planning_scheduler.generate(
+                constraints=request.constraints,
+                week_number=week.week_number,
+                year=week.year,
+            )
+            return planning
+
+        instructions = week.instructions or request.instructions
+        if not instructions.strip():
+            raise ValueError("Instructions are required for AI generation")
+        async with semaphore:
+            planning = await ai_planner.generate_planning(
+                instructions=instructions,
+                week_number=week.week_number,
+                year=week.year,
+            )
+        # La semaine demandée fait foi, quelle que soit celle renvoyée par le modèle
+        planning.week_number = week.week_number
+        planning.year = week.year
+        return planning
+
+    results = await asyncio.gather(*(generate_week(week) for week in weeks), return_exceptions=True)
+
+    plannings = []
+    errors = []
+    for week, result in zip(weeks, results):
+        if isinstance(result, Exception):
+            errors.append(f"Semaine {week.week_number}/{week.year}: {str(result)}")
+        else:
+            plannings.append(result)
+
+    if not plannings:
+        raise HTTPException(status_code=500, detail=f"Error generating plannings: {'; '.join(errors)}")
+
+    try:
+        file_id = str(uuid.uuid4())
+        excel_path = settings.export_path / f"planning_batch_{file_id}.xlsx"
+        await run_in_threadpool(excel_handler.write_planning_file, plannings, excel_path)
+        store.add_export(file_id, excel_path)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating Excel: {str(e)}")
+
+    return BatchPlanningResponse(
+        success=not errors,
+        message=f"{len(plannings)}/{len(weeks)} plannings generated",
+        data=plannings,
+        errors=errors,
+        file_id=file_id,
+    )
+
+
 @router.put("/ai-update", response_model=PlanningResponse)
 async def ai_update_planning(
     request: AIUpdateRequest,
@@ -99,17 +323,19 @@ async def ai_update_planning(
             detail="No planning loaded. Upload an Excel file or generate a planning first.",
         )
 
+    previous_planning = store.current_planning
     try:
-        updated_planning = ai_planner.update_planning(
-            current_planning=store.current_planning,
+        updated_planning = await ai_planner.update_planning(
+            current_planning=previous_planning,
             instructions=request.instructions,
+            mode=request.mode,
         )
 
         store.current_planning = updated_planning
 
         # Update Excel file if one exists
         if store.planning_file:
-            excel_handler.update_planning_in_excel(store.planning_file, updated_planning)
+            planning_writer.schedule(store.planning_file, updated_planning, previous_planning)
 
         return PlanningResponse(
             success=True,
@@ -121,6 +347,28 @@ async def ai_update_planning(
         raise HTTPException(status_code=500, detail=f"Error updating planning: {str(e)}")
 
 
+@router.put("/ai-update/stream")
+async def ai_update_planning_stream(
+    request: AIUpdateRequest,
+    store: PlanningStore = Depends(get_planning_store),
+):
+    """Mise à jour IA streamée; toujours en mode complet (le mode patch n'a pas d'employés à streamer)."""
+    current = store.current_planning
+    if current is None:
+        raise HTTPException(
+            status_code=400,
+            detail="No planning loaded. Upload an Excel file or generate a planning first.",
+        )
+
+    events = ai_planner.stream_update_planning(
+        current_planning=current,
+        instructions=request.instructions,
+    )
+    return _stream_into_store(
+        store, events, current.week_number, current.year, "Planning updated with AI successfully"
+    )
+
+
 @router.delete("/clear", response_model=PlanningResponse)
 async def clear_planning(
     store: PlanningStore = Depends(get_planning_store),
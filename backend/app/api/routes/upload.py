@@ -1,15 +1,17 @@
-from datetime import datetime
-from pathlib import Path
+import shutil
 import uuid
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 
 from app.core.config import settings
 from app.api.deps import PlanningStore, get_planning_store
 from app.models.schemas import UploadResponse, HistoryEntryType
 from app.services.pdf_parser import pdf_parser
-from app.services.excel_handler import excel_handler
+from app.services.pdf_layout import pdf_layout_parser
+from app.services.excel_handler import ExcelPlanningError, excel_handler
 from app.services.ai_planner import ai_planner
+from app.services.upload_storage import UploadTooLargeError, UploadTypeError, upload_storage
 
 router = APIRouter()
 
@@ -23,31 +25,39 @@ async def upload_pdf(
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="File must be a PDF")
 
-    # Save uploaded file with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     file_id = str(uuid.uuid4())
-    file_path = settings.upload_path / f"pdf_{timestamp}_{file_id[:8]}.pdf"
 
     try:
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
-
+        file_path, content_hash = await upload_storage.save(file, ".pdf", "pdf")
         store.add_uploaded_file(file_path)
 
         # Process with AI if requested
+        already_imported = False
         if process_with_ai:
-            pdf_content = pdf_parser.extract_all(file_path)
-            planning = ai_planner.process_pdf_content(
-                pdf_text=pdf_content["text"],
-                pdf_tables=pdf_content["tables"],
-            )
+            # Même fichier déjà importé: le planning mémorisé évite l'extraction et le modèle
+            planning = await upload_storage.get_planning(content_hash, "pdf")
+            already_imported = planning is not None
+            if planning is None:
+                store.set_ingestion_progress(file_id, file.filename, 0, 0)
+                try:
+                    pages = await run_in_threadpool(pdf_parser.extract_pages, file_path)
+                    # Export de l'application: lu directement, le modèle n'est utile que pour les autres formats
+                    planning = pdf_layout_parser.parse(pages)
+                    if planning is None:
+                        planning = await ai_planner.process_pdf_pages(
+                            pages,
+                            progress=lambda done, total: store.set_ingestion_progress(
+                                file_id, file.filename, done, total
+                            ),
+                        )
+                finally:
+                    store.finish_ingestion(file_id)
+                await upload_storage.set_planning(content_hash, "pdf", planning)
             store.current_planning = planning
 
             # Save as Excel
             excel_path = settings.template_path / f"planning_{file_id}.xlsx"
-            wb = excel_handler.create_planning_workbook(planning)
-            excel_handler.save_workbook(wb, excel_path)
+            await run_in_threadpool(excel_handler.write_planning_file, [planning], excel_path)
             store.planning_file = excel_path
 
         # Add history entry
@@ -60,40 +70,61 @@ async def upload_pdf(
 
         return UploadResponse(
             success=True,
-            message="PDF uploaded and processed successfully" if process_with_ai else "PDF uploaded successfully",
+            message=(
+                "PDF already imported, planning reloaded" if already_imported
+                else "PDF uploaded and processed successfully" if process_with_ai
+                else "PDF uploaded successfully"
+            ),
             file_id=file_id,
             filename=file.filename,
         )
 
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadTypeError as e:
+        raise HTTPException(status_code=415, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
 
+@router.get("/progress")
+async def get_upload_progress(
+    store: PlanningStore = Depends(get_planning_store),
+):
+    """Avancement des imports PDF en cours (extraits traités / total)."""
+    return {"ingestions": store.ingestions}
+
+
 @router.post("/excel", response_model=UploadResponse)
 async def upload_excel(
     file: UploadFile = File(...),
     store: PlanningStore = Depends(get_planning_store),
 ):
-    if not file.filename.lower().endswith((".xlsx", ".xls")):
-        raise HTTPException(status_code=400, detail="File must be an Excel file (.xlsx or .xls)")
+    if not file.filename.lower().endswith(".xlsx"):
+        raise HTTPException(status_code=400, detail="File must be an Excel file (.xlsx)")
 
-    # Save uploaded file with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     file_id = str(uuid.uuid4())
-    file_ext = Path(file.filename).suffix
-    file_path = settings.upload_path / f"excel_{timestamp}_{file_id[:8]}{file_ext}"
 
     try:
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
-
+        file_path, content_hash = await upload_storage.save(file, ".xlsx", "xlsx")
         store.add_uploaded_file(file_path)
 
-        # Load planning from Excel
-        planning = excel_handler.load_planning_from_excel(file_path)
-        store.current_planning = planning
-        store.planning_file = file_path
+        # Un planning par onglet de semaine, lus en parallèle sur les gros classeurs
+        plannings = await upload_storage.get_plannings(content_hash, "excel_weeks")
+        if plannings is None:
+            plannings = await run_in_threadpool(excel_handler.load_plannings_from_excel, file_path)
+            await upload_storage.set_plannings(content_hash, "excel_weeks", plannings)
+        store.load_plannings(plannings)
+        planning = store.current_planning
+
+        # Copie de travail: le fichier importé, adressé par son contenu, ne doit pas être modifié
+        working_path = settings.template_path / f"planning_{file_id}{file_path.suffix}"
+        if len(plannings) == 1:
+            await run_in_threadpool(shutil.copyfile, file_path, working_path)
+        else:
+            # Les modifications portent sur le planning courant: fichier d'un seul onglet
+            await run_in_threadpool(excel_handler.write_planning_file, [planning], working_path)
+        store.planning_file = working_path
 
         # Add history entry
         store.add_history_entry(
@@ -105,10 +136,20 @@ async def upload_excel(
 
         return UploadResponse(
             success=True,
-            message="Excel file uploaded and loaded successfully",
+            message=(
+                "Excel file uploaded and loaded successfully" if len(plannings) == 1
+                else f"Excel file uploaded, {len(plannings)} weeks loaded"
+            ),
             file_id=file_id,
             filename=file.filename,
         )
 
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadTypeError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except ExcelPlanningError as e:
+        # Toutes les cellules invalides d'un coup, pour corriger le fichier en une fois
+        raise HTTPException(status_code=422, detail=e.errors)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
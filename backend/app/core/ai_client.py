@@ -1,6 +1,131 @@
-from openai import OpenAI
+import hashlib
+import json
+from pathlib import Path
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI
+
 from app.core.config import settings
 
 
-def get_openai_client() -> OpenAI:
-    return OpenAI(api_key=settings.openai_api_key)
+# Un seul client partagé par processus : le pool de connexions HTTP (keep-alive)
+# est réutilisé par toutes les requêtes au lieu d'être recréé à chaque appel.
+_async_client: Optional[AsyncOpenAI] = None
+
+# En-têtes qui ne décrivent plus le corps une fois celui-ci lu et décodé
+_STRIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class RecordReplayTransport(httpx.AsyncBaseTransport):
+    """Transport httpx qui enregistre ou rejoue les échanges avec l'API.
+
+    Chaque échange est stocké dans `<directory>/<clé>.json`, la clé étant un
+    hash de la méthode, du chemin et du corps JSON de la requête. En mode
+    "replay" aucune requête réseau n'est faite; une requête inconnue reçoit
+    une réponse 404. Les réponses streamées (SSE) sont rejouées telles quelles.
+    """
+
+    def __init__(self, mode: str, directory: Path, wrapped: Optional[httpx.AsyncBaseTransport] = None):
+        self.mode = mode
+        self.directory = directory
+        self.wrapped = wrapped
+
+    @staticmethod
+    def request_key(request: httpx.Request) -> str:
+        body = request.content
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, ensure_ascii=False).encode("utf-8")
+        except ValueError:
+            pass
+        digest = hashlib.sha256()
+        digest.update(request.method.encode("utf-8"))
+        digest.update(request.url.path.encode("utf-8"))
+        digest.update(body)
+        return digest.hexdigest()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = self.request_key(request)
+        path = self.directory / f"{key}.json"
+
+        if self.mode == "replay":
+            if not path.exists():
+                return httpx.Response(
+                    404,
+                    json={"error": {"message": f"No recording for request {key}", "type": "replay_miss"}},
+                    request=request,
+                )
+            recording = json.loads(path.read_text(encoding="utf-8"))
+            return httpx.Response(
+                recording["status_code"],
+                headers=recording["headers"],
+                content=recording["body"].encode("utf-8"),
+                request=request,
+            )
+
+        response = await self.wrapped.handle_async_request(request)
+        content = await response.aread()
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _STRIPPED_HEADERS}
+
+        if response.status_code < 400:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path.write_text(
+                json.dumps(
+                    {
+                        "request": json.loads(request.content or b"null"),
+                        "status_code": response.status_code,
+                        "headers": headers,
+                        "body": content.decode("utf-8"),
+                    },
+                    ensure_ascii=False,
+                    indent=2,
+                ),
+                encoding="utf-8",
+            )
+
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+    async def aclose(self):
+        if self.wrapped is not None:
+            await self.wrapped.aclose()
+
+
+def _build_timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.openai_timeout, connect=settings.openai_connect_timeout)
+
+
+def _build_http_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.openai_max_connections,
+        max_keepalive_connections=settings.openai_max_keepalive_connections,
+    )
+    if settings.ai_record_mode in ("record", "replay"):
+        wrapped = httpx.AsyncHTTPTransport(limits=limits) if settings.ai_record_mode == "record" else None
+        return httpx.AsyncClient(
+            transport=RecordReplayTransport(settings.ai_record_mode, settings.recordings_path, wrapped),
+            timeout=_build_timeout(),
+        )
+
+    return httpx.AsyncClient(limits=limits, timeout=_build_timeout())
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url or None,
+            timeout=_build_timeout(),
+            # Les reprises sont gérées par app.core.resilience (backoff, disjoncteur)
+            max_retries=0,
+            http_client=_build_http_client(),
+        )
+    return _async_client
+
+
+async def close_async_openai_client():
+    """Ferme le pool de connexions partagé (appelé à l'arrêt de l'application)."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
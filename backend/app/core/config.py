@@ -5,6 +5,66 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     # OpenAI
     openai_api_key: str = ""
+    openai_base_url: str = ""  # vide = API OpenAI; ex: http://localhost:8001/v1 pour le serveur de test
+    openai_timeout: float = 120.0  # secondes, durée max d'une completion
+    openai_connect_timeout: float = 10.0
+    openai_max_retries: int = 2
+    openai_max_connections: int = 100
+    openai_max_keepalive_connections: int = 20
+
+    # Résilience des appels au modèle
+    llm_deadline_seconds: float = 180.0  # budget total d'un appel, reprises comprises
+    llm_backoff_base_seconds: float = 0.5
+    llm_backoff_max_seconds: float = 8.0
+    llm_circuit_failure_threshold: int = 5
+    llm_circuit_reset_seconds: float = 30.0
+    llm_hedging_enabled: bool = False
+    llm_hedge_min_delay_seconds: float = 2.0
+
+    # Choix du modèle: le petit modèle tant que l'entrée reste modeste, le grand au-delà
+    # ou quand la réponse du petit est invalide
+    llm_model_small: str = "gpt-4o-mini"
+    llm_model_large: str = "gpt-4o"
+    llm_small_max_input_tokens: int = 4000
+    llm_small_max_employees: int = 30
+    llm_escalation_enabled: bool = True
+
+    # Génération multi-semaines: appels IA simultanés, nombre maximal de semaines par requête
+    batch_max_concurrency: int = 4
+    batch_max_weeks: int = 53
+
+    # Import PDF découpé: taille max d'un extrait envoyé au modèle, appels simultanés
+    pdf_chunk_max_chars: int = 12000
+    pdf_max_concurrency: int = 4
+    # Taille maximale d'un fichier importé
+    upload_max_bytes: int = 20 * 1024 * 1024
+
+    # Pool de processus partagé (extraction PDF, onglets Excel); 0 = nombre de CPU.
+    # Un PDF y est découpé en autant de plages de pages que de processus.
+    process_pool_workers: int = 0
+    # Extraction du PDF: pool de processus à partir de ce nombre de pages
+    pdf_parallel_min_pages: int = 16
+    # Import Excel multi-semaines: pool de processus à partir de ce nombre d'onglets
+    excel_parallel_min_sheets: int = 4
+
+    # Enregistrement différé du fichier Excel: délai sans modification avant l'écriture, attente maximale
+    planning_save_debounce_seconds: float = 0.5
+    planning_save_max_delay_seconds: float = 5.0
+
+    # Mémoire du chat: au-delà de ce budget, les échanges les plus anciens sont résumés
+    chat_history_token_budget: int = 2000
+    # Sessions de chat gardées en mémoire: nombre maximal, durée d'inactivité avant oubli
+    chat_max_sessions: int = 500
+    chat_session_ttl_seconds: int = 24 * 3600
+
+    # Enregistrement / rejeu des échanges HTTP avec le modèle: "off", "record" ou "replay"
+    ai_record_mode: str = "off"
+
+    # Cache des réponses IA
+    ai_cache_enabled: bool = True
+    ai_cache_ttl_seconds: int = 7 * 24 * 3600
+    ai_cache_max_memory_entries: int = 256
+    ai_cache_max_disk_entries: int = 2000
 
     # Application
     app_env: str = "development"
@@ -14,6 +74,8 @@ class Settings(BaseSettings):
     upload_dir: str = "data/uploads"
     export_dir: str = "data/exports"
     template_dir: str = "data/templates"
+    cache_dir: str = "data/cache"
+    recordings_dir: str = "data/recordings"
 
     # Base directory
     base_dir: Path = Path(__file__).parent.parent.parent
@@ -30,6 +92,14 @@ class Settings(BaseSettings):
     def template_path(self) -> Path:
         return self.base_dir / self.template_dir
 
+    @property
+    def cache_path(self) -> Path:
+        return self.base_dir / self.cache_dir
+
+    @property
+    def recordings_path(self) -> Path:
+        return self.base_dir / self.recordings_dir
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -0,0 +1,83 @@
+import time
+from collections import deque
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class LLMCallRecord(BaseModel):
+    method: str
+    model: str
+    latency: float  # secondes
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cache_hit: bool = False
+    parse_success: Optional[bool] = None  # None: pas de JSON attendu/fourni
+    error: Optional[str] = None
+    timestamp: float = 0.0
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class MetricsRegistry:
+    """Mesures des appels au modèle, conservées en mémoire par méthode.
+
+    Les totaux (appels, tokens) sont cumulés depuis le démarrage; les
+    percentiles et taux sont calculés sur les `window` derniers appels.
+    """
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._records: dict[str, deque[LLMCallRecord]] = {}
+        self._totals: dict[str, dict[str, int]] = {}
+
+    def record(self, method: str, model: str, latency: float, **fields) -> LLMCallRecord:
+        """Enregistre un appel; le record retourné peut encore être complété (ex: parse_success)."""
+        entry = LLMCallRecord(method=method, model=model, latency=latency, timestamp=time.time(), **fields)
+        self._records.setdefault(method, deque(maxlen=self.window)).append(entry)
+
+        totals = self._totals.setdefault(
+            method, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        )
+        totals["calls"] += 1
+        totals["prompt_tokens"] += entry.prompt_tokens
+        totals["completion_tokens"] += entry.completion_tokens
+        return entry
+
+    def summary(self) -> dict:
+        return {method: self._summarize(method) for method in sorted(self._records)}
+
+    def reset(self):
+        self._records.clear()
+        self._totals.clear()
+
+    def _summarize(self, method: str) -> dict:
+        records = list(self._records[method])
+        latencies = sorted(r.latency for r in records if not r.cache_hit and r.error is None)
+        parsed = [r.parse_success for r in records if r.parse_success is not None]
+        models: dict[str, int] = {}
+        for r in records:
+            models[r.model] = models.get(r.model, 0) + 1
+
+        return {
+            **self._totals[method],
+            "window": len(records),
+            "errors": sum(1 for r in records if r.error),
+            "cache_hits": sum(1 for r in records if r.cache_hit),
+            "parse_failures": parsed.count(False),
+            "parse_success_rate": parsed.count(True) / len(parsed) if parsed else None,
+            "latency_ms": {
+                "p50": round(_percentile(latencies, 0.50) * 1000, 1),
+                "p95": round(_percentile(latencies, 0.95) * 1000, 1),
+                "p99": round(_percentile(latencies, 0.99) * 1000, 1),
+            },
+            "models": models,
+        }
+
+
+metrics_registry = MetricsRegistry()
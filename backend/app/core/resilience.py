@@ -0,0 +1,225 @@
+"""Appels au modèle avec délai maximal, reprises, disjoncteur et requêtes doublées.
+
+- Chaque appel dispose d'un budget total (`llm_deadline_seconds`) qui couvre
+  toutes les tentatives et les attentes entre elles.
+- Les erreurs transitoires (429, 5xx, timeout, connexion) sont réessayées avec
+  un backoff exponentiel à jitter complet, en respectant Retry-After.
+- Après `llm_circuit_failure_threshold` échecs consécutifs, le disjoncteur
+  s'ouvre et les appels échouent immédiatement pendant
+  `llm_circuit_reset_seconds`, puis une seule tentative de test est autorisée.
+- Optionnellement (`llm_hedging_enabled`), si une requête dépasse le p95 des
+  latences récentes, une requête identique est lancée en parallèle et la
+  première réponse gagne.
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import openai
+
+from app.core.config import settings
+
+
+T = TypeVar("T")
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    asyncio.TimeoutError,
+)
+
+
+class CircuitOpenError(Exception):
+    """Le disjoncteur est ouvert: le fournisseur est considéré indisponible."""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> bool:
+        """Lève CircuitOpenError si l'appel est refusé; retourne True s'il est la requête de test."""
+        state = self.state
+        if state == "open":
+            raise CircuitOpenError("AI provider unavailable, retry later")
+        if state == "half_open":
+            # Une seule requête de test à la fois
+            if self._probe_in_flight:
+                raise CircuitOpenError("AI provider unavailable, retry later")
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def release_probe(self):
+        """Fin de la requête de test (quelle qu'en soit l'issue): un autre appel peut tester le fournisseur.
+
+        À n'appeler que par l'appel pour lequel before_call() a retourné True.
+        """
+        self._probe_in_flight = False
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.opened_at is not None or self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class ResilientCaller:
+    def __init__(
+        self,
+        deadline: float,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float,
+        breaker: CircuitBreaker,
+        hedging_enabled: bool = False,
+        hedge_min_delay: float = 2.0,
+        hedge_percentile: float = 0.95,
+        latency_window: int = 50,
+        hedge_min_samples: int = 10,
+    ):
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker
+        self.hedging_enabled = hedging_enabled
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_percentile = hedge_percentile
+        self.latency_window = latency_window
+        self.hedge_min_samples = hedge_min_samples
+        self._latencies: dict[str, deque[float]] = {}
+
+    async def call(
+        self,
+        make_call: Callable[[], Awaitable[T]],
+        key: str = "default",
+        hedge: bool = True,
+    ) -> T:
+        """Exécute `make_call` (une fabrique de coroutine, rappelée à chaque tentative)."""
+        started = time.monotonic()
+        attempt = 0
+
+        while True:
+            is_probe = self.breaker.before_call()
+            remaining = self.deadline - (time.monotonic() - started)
+            try:
+                try:
+                    if hedge and self.hedging_enabled:
+                        result = await asyncio.wait_for(self._hedged(make_call, key), timeout=remaining)
+                    else:
+                        result = await asyncio.wait_for(self._timed(make_call, key), timeout=remaining)
+                finally:
+                    # Y compris en cas d'annulation (client déconnecté): la requête de test
+                    # ne doit pas rester bloquée. Un appel qui n'était pas le test n'y touche pas.
+                    if is_probe:
+                        self.breaker.release_probe()
+            except RETRYABLE_ERRORS as e:
+                self.breaker.record_failure()
+                attempt += 1
+                delay = self._backoff_delay(attempt, e)
+                elapsed = time.monotonic() - started
+                if (
+                    attempt > self.max_retries
+                    or elapsed + delay >= self.deadline
+                    or self.breaker.state == "open"
+                ):
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except Exception:
+                # Erreur non transitoire (400, 401...): le fournisseur répond, le disjoncteur reste fermé
+                self.breaker.record_success()
+                raise
+
+            self.breaker.record_success()
+            return result
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """Délai avant la requête doublée: p95 des latences récentes (None si trop peu de mesures)."""
+        samples = self._latencies.get(key)
+        if not samples or len(samples) < self.hedge_min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(self.hedge_percentile * len(ordered)))
+        return max(self.hedge_min_delay, ordered[index])
+
+    async def _timed(self, make_call: Callable[[], Awaitable[T]], key: str) -> T:
+        started = time.monotonic()
+        result = await make_call()
+        samples = self._latencies.setdefault(key, deque(maxlen=self.latency_window))
+        samples.append(time.monotonic() - started)
+        return result
+
+    async def _hedged(self, make_call: Callable[[], Awaitable[T]], key: str) -> T:
+        delay = self.hedge_delay(key)
+        primary = asyncio.ensure_future(self._timed(make_call, key))
+        if delay is None:
+            return await primary
+
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+
+            pending.add(asyncio.ensure_future(self._timed(make_call, key)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                if not pending:
+                    # Les deux requêtes ont échoué: propager l'erreur de la dernière
+                    raise done.pop().exception()
+        finally:
+            # Y compris si l'appel est annulé ou dépasse son délai pendant l'attente
+            for task in pending:
+                if not task.done():
+                    task.cancel()
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        retry_after = None
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                retry_after = None
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        # Jitter complet: uniforme entre 0 et le plafond exponentiel
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+
+llm_caller = ResilientCaller(
+    deadline=settings.llm_deadline_seconds,
+    max_retries=settings.openai_max_retries,
+    backoff_base=settings.llm_backoff_base_seconds,
+    backoff_max=settings.llm_backoff_max_seconds,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.llm_circuit_failure_threshold,
+        reset_timeout=settings.llm_circuit_reset_seconds,
+    ),
+    hedging_enabled=settings.llm_hedging_enabled,
+    hedge_min_delay=settings.llm_hedge_min_delay_seconds,
+)
@@ -1,12 +1,35 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import upload, planning, chat, export, history
+from app.core.ai_client import close_async_openai_client
+from app.core.metrics import metrics_registry
+from app.core.resilience import llm_caller
+from app.services.chat_commands import chat_command_parser
+from app.services.planning_writer import planning_writer
+from app.services.process_pool import shutdown_process_pool
+from app.services.response_cache import response_cache
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    try:
+        # Enregistrer les modifications du planning encore en attente
+        await planning_writer.flush()
+    finally:
+        # Fermer proprement le pool HTTP partagé du client OpenAI
+        await close_async_openai_client()
+        shutdown_process_pool()
+
 
 app = FastAPI(
     title="AI Restaurant Planning",
     description="Automatic employee work hour scheduling for restaurants",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware for frontend
@@ -34,3 +57,15 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Latence et consommation de tokens des appels IA, par méthode."""
+    return {
+        "llm": metrics_registry.summary(),
+        "cache": response_cache.stats(),
+        "chat_fast_path": chat_command_parser.stats(),
+        "planning_writes": planning_writer.stats(),
+        "circuit_breaker": llm_caller.breaker.state,
+    }
@@ -1,7 +1,10 @@
-from pydantic import BaseModel
+import asyncio
+from pydantic import BaseModel, PrivateAttr, field_validator, model_validator
 from typing import Optional
 from enum import Enum
 
+from app.core.config import settings
+
 
 class DayOfWeek(str, Enum):
     MONDAY = "monday"
@@ -112,17 +115,150 @@ class PlanningResponse(BaseModel):
 class ChatMessage(BaseModel):
     message: str
     planning_id: Optional[str] = None
+    session_id: Optional[str] = None
 
 
 class ChatResponse(BaseModel):
     response: str
     planning_updated: bool = False
     planning: Optional[WeekPlanning] = None
+    session_id: Optional[str] = None
+
+
+class ChatTurn(BaseModel):
+    role: str  # "user" ou "assistant"
+    content: str
+
+
+class ChatSession(BaseModel):
+    id: str
+    summary: str = ""  # résumé des échanges les plus anciens
+    turns: list[ChatTurn] = []
+    # Une seule compaction à la fois par session (ai_planner.compact_chat_session)
+    _compaction_lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+
+
+class ServiceType(str, Enum):
+    AFTERNOON = "afternoon"
+    EVENING = "evening"
+
+
+class PlanningEditAction(str, Enum):
+    SET_SHIFT = "set_shift"
+    CLEAR_SHIFT = "clear_shift"
+    ADD_EMPLOYEE = "add_employee"
+    REMOVE_EMPLOYEE = "remove_employee"
+    RENAME_EMPLOYEE = "rename_employee"
+
+
+class PlanningEdit(BaseModel):
+    """Opération d'édition élémentaire appliquée localement à un WeekPlanning."""
+    action: PlanningEditAction
+    employee: str
+    day: Optional[DayOfWeek] = None
+    service: Optional[ServiceType] = None
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    meals: Optional[int] = None
+    new_name: Optional[str] = None
+
+
+class PlanningEngine(str, Enum):
+    AI = "ai"        # génération par le modèle à partir d'instructions libres
+    LOCAL = "local"  # solveur déterministe à partir de contraintes structurées
+
+
+class ServiceSlot(BaseModel):
+    day: DayOfWeek
+    service: ServiceType
+
+
+class EmployeeConstraints(BaseModel):
+    name: str
+    contract_hours: float = 35.0
+    max_days: int = 5
+    unavailable_days: list[DayOfWeek] = []
+    unavailable_services: list[ServiceSlot] = []
+
+
+class StaffingTarget(BaseModel):
+    service: ServiceType
+    staff: int
+    day: Optional[DayOfWeek] = None  # None = tous les jours
+
+
+class ServiceHours(BaseModel):
+    start_time: str
+    end_time: str
+
+
+class SchedulingConstraints(BaseModel):
+    employees: list[EmployeeConstraints]
+    staffing: list[StaffingTarget] = []
+    default_staff: int = 2
+    afternoon_hours: ServiceHours = ServiceHours(start_time="10:30", end_time="15:00")
+    evening_hours: ServiceHours = ServiceHours(start_time="17:30", end_time="23:00")
+    saturday_evening_end: str = "00:00"
+
+
+def _check_week_number(value: Optional[int]) -> Optional[int]:
+    if value is not None and not 1 <= value <= 53:
+        raise ValueError("week number must be between 1 and 53")
+    return value
+
+
+class BatchWeek(BaseModel):
+    week_number: int
+    year: int
+    instructions: Optional[str] = None  # remplace les instructions communes
+
+    _week_number_range = field_validator("week_number")(_check_week_number)
+
+
+class BatchGenerateRequest(BaseModel):
+    instructions: str = ""
+    weeks: list[BatchWeek] = []
+    # Alternative à `weeks`: plage de semaines d'une même année
+    year: Optional[int] = None
+    start_week: Optional[int] = None
+    end_week: Optional[int] = None
+    engine: PlanningEngine = PlanningEngine.AI
+    constraints: Optional[SchedulingConstraints] = None
+
+    _week_range = field_validator("start_week", "end_week")(_check_week_number)
+
+    @model_validator(mode="after")
+    def _check_batch_size(self):
+        count = len(self.weeks)
+        if (self.start_week is None) != (self.end_week is None):
+            raise ValueError("start_week and end_week must be given together")
+        if self.start_week is not None:
+            if self.start_week > self.end_week:
+                raise ValueError("start_week must not be after end_week")
+            count += self.end_week - self.start_week + 1
+        # Chaque semaine coûte un appel au modèle
+        if count > settings.batch_max_weeks:
+            raise ValueError(f"At most {settings.batch_max_weeks} weeks per batch")
+        return self
+
+
+class BatchPlanningResponse(BaseModel):
+    success: bool
+    message: str
+    data: list[WeekPlanning] = []
+    errors: list[str] = []
+    file_id: Optional[str] = None
+
+
+class UpdateMode(str, Enum):
+    PATCH = "patch"  # le modèle renvoie une liste d'éditions
+    FULL = "full"    # le modèle renvoie le planning complet
 
 
 class AIUpdateRequest(BaseModel):
     instructions: str
     planning_id: Optional[str] = None
+    mode: UpdateMode = UpdateMode.PATCH
 
 
 class UploadResponse(BaseModel):
@@ -1,8 +1,39 @@
+import asyncio
 import json
-from typing import Optional
-
-from app.core.ai_client import get_openai_client
-from app.models.schemas import WeekPlanning, EmployeeWeekSchedule, DaySchedule, ShiftData
+import re
+import time
+from typing import AsyncIterator, Callable, Optional, TypeVar
+
+from pydantic import ValidationError
+
+from app.core.ai_client import get_async_openai_client
+from app.core.config import settings
+from app.core.metrics import metrics_registry
+from app.core.resilience import llm_caller
+from app.models.schemas import (
+    ChatSession,
+    ChatTurn,
+    WeekPlanning,
+    EmployeeWeekSchedule,
+    DaySchedule,
+    ShiftData,
+    PlanningEdit,
+    UpdateMode,
+)
+from app.services.chat_commands import chat_command_parser
+from app.services.json_stream import EmployeeStreamParser
+from app.services.planning_codec import encode_planning, estimate_tokens
+from app.services.planning_patch import PlanningPatchError, apply_planning_edits
+from app.services.response_cache import ResponseCache, response_cache
+
+
+T = TypeVar("T")
+
+# Erreurs d'une réponse JSON hors format (ValidationError et JSONDecodeError sont des
+# ValueError): elles déclenchent le repli sur le grand modèle
+PARSE_ERRORS = (KeyError, ValueError)
+
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
 
 
 SYSTEM_PROMPT = """Tu es un assistant IA spécialisé dans la planification des horaires des employés de restaurant.
@@ -44,119 +75,603 @@ Notes importantes:
 """
 
 
-class AIPlanner:
-    def __init__(self):
-        self.client = None
+PATCH_SYSTEM_PROMPT = """Tu es un assistant IA spécialisé dans la planification des horaires des employés de restaurant.
+Tu reçois le planning actuel et une demande de modification.
+Ne renvoie PAS le planning complet: renvoie uniquement la liste minimale des modifications à appliquer.
+
+Règles pour les horaires:
+- Chaque jour a deux services: midi (afternoon) et soir (evening)
+- Heures au format "HH:MM" (ex: "10:30", "17:30", "00:00")
+- Service midi typique: 10:30-15:00, service soir typique: 17:30-23:00
+- Chaque employé qui travaille un service a droit à 1 repas par service
+
+Actions possibles:
+- "set_shift": fixe un service (employee, day, service, start_time, end_time, meals)
+- "clear_shift": l'employé ne travaille pas ce service (employee, day, service)
+- "add_employee": ajoute un employé sans horaires (employee au format "NOM Prénom"), suivi de set_shift
+- "remove_employee": retire un employé (employee)
+- "rename_employee": renomme un employé (employee, new_name)
+
+day: monday, tuesday, wednesday, thursday, friday, saturday, sunday
+service: afternoon, evening
+
+Réponds TOUJOURS avec du JSON valide dans ce format exact:
+{
+    "edits": [
+        {"action": "clear_shift", "employee": "DUPONT Jean", "day": "monday", "service": "evening"},
+        {"action": "set_shift", "employee": "MARTIN Marie", "day": "tuesday", "service": "afternoon", "start_time": "11:00", "end_time": "15:00", "meals": 1}
+    ]
+}
+"""
 
+
+CHAT_RULES = """
+Dans le chat:
+- Si l'utilisateur demande de créer ou modifier un planning, réponds avec le planning JSON.
+- Si l'utilisateur pose une question, réponds de manière conversationnelle mais inclus les modifications de planning en JSON si applicable.
+- Si tu fournis un planning, assure-toi de l'inclure en JSON valide dans un bloc ```json```.
+- Le planning actuel, s'il existe, est donné au format compact à la fin du dernier message.
+"""
+
+# Préfixe système identique pour tous les messages de chat: il reste en tête du
+# prompt et bénéficie du cache de prompt du fournisseur.
+CHAT_SYSTEM_PROMPT = SYSTEM_PROMPT + CHAT_RULES
+
+# Tâches dont le modèle ne dépend pas de la taille de l'entrée. Les autres
+# utilisent le petit modèle tant que l'entrée et l'effectif restent sous les
+# seuils de Settings.
+TASK_TIERS = {
+    # Texte PDF brut, mise en page perdue: la qualité d'extraction prime
+    "process_pdf_content": "large",
+    "process_pdf_chunk": "large",
+    "summarize_chat": "small",
+}
+
+SUMMARY_SYSTEM_PROMPT = """Tu résumes une conversation entre un gérant de restaurant et un assistant de planning.
+Conserve les demandes, décisions et contraintes durables (employés, disponibilités, préférences, règles).
+Ignore les formules de politesse et le détail des plannings JSON. Réponds en quelques phrases, en français."""
+
+
+class AIPlanner:
     def _get_client(self):
-        if self.client is None:
-            self.client = get_openai_client()
-        return self.client
+        # Client AsyncOpenAI partagé (pool HTTP commun à tout le processus)
+        return get_async_openai_client()
 
-    def generate_planning(
+    async def generate_planning(
         self,
         instructions: str,
         week_number: int = 1,
         year: int = 2024,
     ) -> WeekPlanning:
-        client = self._get_client()
+        user_prompt = self._generate_prompt(instructions, week_number, year)
+        model = self._route_model("generate_planning", user_prompt)
+        return await self._request_planning("generate_planning", model, user_prompt, temperature=0.3)
+
+    async def stream_generate_planning(
+        self,
+        instructions: str,
+        week_number: int = 1,
+        year: int = 2024,
+    ) -> AsyncIterator[tuple[str, object]]:
+        """Version streaming de generate_planning, voir _stream_planning."""
+        user_prompt = self._generate_prompt(instructions, week_number, year)
+        model = self._route_model("generate_planning", user_prompt)
+        async for event in self._stream_planning(
+            "stream_generate_planning", model, user_prompt, temperature=0.3
+        ):
+            yield event
+
+    async def update_planning(
+        self,
+        current_planning: WeekPlanning,
+        instructions: str,
+        mode: UpdateMode = UpdateMode.PATCH,
+    ) -> WeekPlanning:
+        if mode == UpdateMode.PATCH:
+            try:
+                return await self._update_planning_with_edits(current_planning, instructions)
+            except (PlanningPatchError, ValidationError, json.JSONDecodeError):
+                # Éditions inapplicables: repli sur la régénération complète
+                pass
 
-        user_prompt = f"""Crée un planning hebdomadaire des employés pour la semaine {week_number} de {year}.
+        user_prompt = self._update_prompt(current_planning, instructions)
+        model = self._route_model("update_planning", user_prompt, len(current_planning.employees))
+        return await self._request_planning("update_planning", model, user_prompt, temperature=0.3)
+
+    async def stream_update_planning(
+        self,
+        current_planning: WeekPlanning,
+        instructions: str,
+    ) -> AsyncIterator[tuple[str, object]]:
+        """Version streaming de update_planning en mode complet.
+
+        Le mode patch renvoie des éditions et non des employés: il n'y a rien à
+        afficher avant la fin, il n'est donc pas proposé ici.
+        """
+        user_prompt = self._update_prompt(current_planning, instructions)
+        model = self._route_model("update_planning", user_prompt, len(current_planning.employees))
+        async for event in self._stream_planning(
+            "stream_update_planning", model, user_prompt, temperature=0.3
+        ):
+            yield event
+
+    def _generate_prompt(self, instructions: str, week_number: int, year: int) -> str:
+        return f"""Crée un planning hebdomadaire des employés pour la semaine {week_number} de {year}.
 
 Instructions de l'utilisateur:
 {instructions}
 
 Génère le planning au format JSON avec les plages horaires (start_time, end_time)."""
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.3,
-            response_format={"type": "json_object"},
-        )
+    def _update_prompt(self, current_planning: WeekPlanning, instructions: str) -> str:
+        return f"""Voici le planning actuel des employés (format compact):
+{encode_planning(current_planning)}
 
-        return self._parse_response(response.choices[0].message.content)
+Modifie ce planning selon ces instructions:
+{instructions}
+
+Retourne le planning complet mis à jour au format JSON."""
 
-    def update_planning(
+    async def _update_planning_with_edits(
         self,
         current_planning: WeekPlanning,
         instructions: str,
     ) -> WeekPlanning:
-        client = self._get_client()
-
-        current_json = current_planning.model_dump_json(indent=2)
-
-        user_prompt = f"""Voici le planning actuel des employés:
-{current_json}
+        """Le modèle renvoie une liste d'éditions appliquées localement au planning."""
+        user_prompt = f"""Voici le planning actuel des employés (format compact):
+{encode_planning(current_planning)}
 
-Modifie ce planning selon ces instructions:
+Modifications demandées:
 {instructions}
 
-Retourne le planning complet mis à jour au format JSON."""
+Retourne uniquement la liste des modifications au format JSON."""
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
+        edits = await self._request_json(
+            "update_planning_patch",
+            self._route_model("update_planning_patch", user_prompt, len(current_planning.employees)),
+            PATCH_SYSTEM_PROMPT,
+            user_prompt,
             temperature=0.3,
-            response_format={"type": "json_object"},
+            parse=self._parse_edits,
         )
+        return apply_planning_edits(current_planning, edits)
 
-        return self._parse_response(response.choices[0].message.content)
-
-    def process_chat_message(
+    async def process_chat_message(
         self,
         message: str,
         current_planning: Optional[WeekPlanning] = None,
+        session: Optional[ChatSession] = None,
     ) -> tuple[str, Optional[WeekPlanning]]:
-        client = self._get_client()
+        # Commandes simples reconnues localement: pas d'appel au modèle
+        fast_path = chat_command_parser.try_apply(message, current_planning)
+        if fast_path:
+            self._remember_turn(session, message, fast_path[0])
+            return fast_path
+
+        messages = self._build_chat_messages(message, current_planning, session)
+        model = self._route_chat_model(messages, current_planning)
+        while True:
+            response, record = await self._create_completion(
+                "process_chat_message",
+                model=model,
+                messages=messages,
+                temperature=0.5,
+            )
+
+            response_text = response.choices[0].message.content
+            planning = self._extract_chat_planning(response_text)
+            if "```json" not in response_text:
+                break
+            record.parse_success = planning is not None
+            # Planning illisible: une seconde chance avec le grand modèle
+            if planning is not None or not self._can_escalate(model):
+                break
+            model = settings.llm_model_large
+
+        self._remember_turn(session, message, response_text)
+        return response_text, planning
 
-        context = ""
-        if current_planning:
-            context = f"\n\nCurrent schedule:\n{current_planning.model_dump_json(indent=2)}"
+    async def stream_chat_message(
+        self,
+        message: str,
+        current_planning: Optional[WeekPlanning] = None,
+        session: Optional[ChatSession] = None,
+    ) -> AsyncIterator[tuple[str, object]]:
+        """Version streaming de process_chat_message.
+
+        Produit des tuples (événement, données):
+        - ("token", str) pour chaque fragment de texte reçu du modèle
+        - ("planning", WeekPlanning) dès que le bloc ```json``` est fermé
+        - ("done", str) avec la réponse complète en fin de flux
+        """
+        fast_path = chat_command_parser.try_apply(message, current_planning)
+        if fast_path:
+            response_text, planning = fast_path
+            self._remember_turn(session, message, response_text)
+            yield "token", response_text
+            yield "planning", planning
+            yield "done", response_text
+            return
+
+        # Pas d'escalade en streaming: les tokens du petit modèle sont déjà envoyés
+        messages = self._build_chat_messages(message, current_planning, session)
+        model = self._route_chat_model(messages, current_planning)
+        started = time.perf_counter()
+        try:
+            stream = await self._call_model(
+                model=model,
+                messages=messages,
+                temperature=0.5,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+        except Exception as e:
+            metrics_registry.record(
+                "stream_chat_message", model, time.perf_counter() - started, error=type(e).__name__
+            )
+            raise
+
+        buffer = ""
+        json_start = -1
+        planning_sent = False
+        parse_success = None
+        usage = None
+        # Fermé aussi si le client se déconnecte: la réponse HTTP amont ne reste pas ouverte
+        async with stream:
+            async for chunk in stream:
+                if chunk.usage:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                buffer += delta
+                yield "token", delta
+
+                if planning_sent:
+                    continue
+                # Chercher le bloc ```json``` une seule fois, puis sa fermeture
+                if json_start < 0:
+                    marker = buffer.find("```json")
+                    if marker >= 0:
+                        json_start = marker + len("```json")
+                if json_start >= 0:
+                    json_end = buffer.find("```", json_start)
+                    if json_end >= 0:
+                        planning_sent = True
+                        try:
+                            planning = self._parse_response(buffer[json_start:json_end].strip())
+                        except PARSE_ERRORS:
+                            planning = None
+                        parse_success = planning is not None
+                        if planning:
+                            yield "planning", planning
+
+        metrics_registry.record(
+            "stream_chat_message",
+            model,
+            time.perf_counter() - started,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+            parse_success=parse_success,
+        )
+        self._remember_turn(session, message, buffer)
+        yield "done", buffer
+
+    async def compact_chat_session(self, session: ChatSession):
+        """Résume les échanges les plus anciens quand l'historique dépasse son budget de tokens.
+
+        Les échanges résumés sont retirés de la session et fusionnés dans
+        `session.summary`; les deux derniers messages sont toujours conservés.
+        """
+        async with session._compaction_lock:
+            await self._compact_chat_session(session)
+
+    async def _compact_chat_session(self, session: ChatSession):
+        budget = settings.chat_history_token_budget
+        sizes = [estimate_tokens(turn.content) for turn in session.turns]
+        if sum(sizes) <= budget:
+            return
+
+        # Retirer les plus anciens jusqu'à revenir à la moitié du budget
+        cut = 0
+        remaining = sum(sizes)
+        while cut < len(sizes) - 2 and remaining > budget // 2:
+            remaining -= sizes[cut]
+            cut += 1
+        old_turns = session.turns[:cut]
+        if not old_turns:
+            return
+
+        transcript = "\n".join(f"{turn.role}: {turn.content}" for turn in old_turns)
+        user_prompt = f"""Résumé existant:
+{session.summary or "(aucun)"}
+
+Nouveaux échanges à intégrer:
+{transcript}
+
+Donne le résumé mis à jour."""
+        try:
+            response, _ = await self._create_completion(
+                "summarize_chat",
+                model=self._route_model("summarize_chat", user_prompt),
+                messages=[
+                    {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                    {"role": "user", "content": user_prompt},
+                ],
+                temperature=0.2,
+            )
+            session.summary = response.choices[0].message.content.strip()
+        except Exception:
+            # Sans résumé, l'historique reste borné: les anciens échanges sont simplement oubliés
+            pass
+        # Des messages ont pu arriver pendant le résumé: seuls les échanges résumés sont retirés
+        summarised = {id(turn) for turn in old_turns}
+        session.turns = [turn for turn in session.turns if id(turn) not in summarised]
+
+    def _remember_turn(self, session: Optional[ChatSession], message: str, response_text: str):
+        if session is None:
+            return
+        # Les plannings JSON ne sont pas conservés: le planning courant est renvoyé à chaque message
+        response_text = re.sub(r"```json.*?(```|$)", "[planning JSON]", response_text, flags=re.DOTALL)
+        session.turns.append(ChatTurn(role="user", content=message))
+        session.turns.append(ChatTurn(role="assistant", content=response_text))
+
+    async def _create_completion(self, method: str, **kwargs):
+        """Appel non streamé, mesuré dans metrics_registry; retourne (réponse, record)."""
+        started = time.perf_counter()
+        try:
+            response = await self._call_model(**kwargs)
+        except Exception as e:
+            metrics_registry.record(
+                method, kwargs["model"], time.perf_counter() - started, error=type(e).__name__
+            )
+            raise
+
+        usage = response.usage
+        record = metrics_registry.record(
+            method,
+            kwargs["model"],
+            time.perf_counter() - started,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+        )
+        return response, record
 
-        user_prompt = f"""Message de l'utilisateur: {message}{context}
+    async def _call_model(self, **kwargs):
+        """Appel chat.completions via le wrapper de résilience (délai, reprises, disjoncteur)."""
+        client = self._get_client()
+        return await llm_caller.call(
+            lambda: client.chat.completions.create(**kwargs),
+            key=kwargs["model"],
+            # Pas de requête doublée pour un flux: les tokens seraient émis deux fois
+            hedge=not kwargs.get("stream", False),
+        )
 
-Si l'utilisateur demande de créer ou modifier un planning, réponds avec le planning JSON.
-Si l'utilisateur pose une question, réponds de manière conversationnelle mais inclus les modifications de planning en JSON si applicable.
+    async def _request_planning(
+        self,
+        method: str,
+        model: str,
+        user_prompt: str,
+        temperature: float,
+    ) -> WeekPlanning:
+        return await self._request_json(
+            method,
+            model,
+            SYSTEM_PROMPT,
+            user_prompt,
+            temperature=temperature,
+            parse=self._parse_response,
+        )
 
-Si tu fournis un planning, assure-toi de l'inclure en JSON valide dans un bloc ```json```."""
+    async def _stream_planning(
+        self,
+        method: str,
+        model: str,
+        user_prompt: str,
+        temperature: float,
+    ) -> AsyncIterator[tuple[str, object]]:
+        """Planning JSON streamé, lu au fil de l'eau.
+
+        Produit des tuples (événement, données):
+        - ("employee", EmployeeWeekSchedule) dès que l'objet de l'employé est fermé
+        - ("planning", WeekPlanning) avec le planning complet en fin de flux
+
+        Même clé de cache que _request_planning: une réponse en cache est rejouée
+        employé par employé.
+        """
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ]
+        cache_key = ResponseCache.make_key(model, messages, temperature)
+        if settings.ai_cache_enabled:
+            started = time.perf_counter()
+            cached = await response_cache.get(cache_key)
+            if cached is not None:
+                planning = self._parse_response(cached)
+                metrics_registry.record(
+                    method, model, time.perf_counter() - started, cache_hit=True, parse_success=True
+                )
+                for employee in planning.employees:
+                    yield "employee", employee
+                yield "planning", planning
+                return
+
+        started = time.perf_counter()
+        parser = EmployeeStreamParser()
+        usage = None
+        try:
+            stream = await self._call_model(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                response_format={"type": "json_object"},
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            async with stream:
+                async for chunk in stream:
+                    if chunk.usage:
+                        usage = chunk.usage
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    for employee_data in parser.feed(chunk.choices[0].delta.content):
+                        yield "employee", self._parse_employee(employee_data)
+            planning = self._parse_response(parser.text)
+        except Exception as e:
+            metrics_registry.record(
+                method,
+                model,
+                time.perf_counter() - started,
+                parse_success=False if isinstance(e, PARSE_ERRORS) else None,
+                error=type(e).__name__,
+            )
+            raise
+
+        metrics_registry.record(
+            method,
+            model,
+            time.perf_counter() - started,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+            parse_success=True,
+        )
+        if settings.ai_cache_enabled:
+            await response_cache.set(cache_key, parser.text)
+        yield "planning", planning
 
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.5,
+    async def _request_json(
+        self,
+        method: str,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        parse: Callable[[str], T],
+    ) -> T:
+        """Appel JSON au modèle, servi depuis le cache si la même requête a déjà abouti.
+
+        Si la réponse du petit modèle ne passe pas `parse`, la requête est
+        rejouée une fois avec le grand modèle.
+        """
+        try:
+            return await self._request_json_once(method, model, system_prompt, user_prompt, temperature, parse)
+        except PARSE_ERRORS:
+            if not self._can_escalate(model):
+                raise
+        return await self._request_json_once(
+            method, settings.llm_model_large, system_prompt, user_prompt, temperature, parse
         )
 
-        response_text = response.choices[0].message.content
+    async def _request_json_once(
+        self,
+        method: str,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        parse: Callable[[str], T],
+    ) -> T:
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+        cache_key = ResponseCache.make_key(model, messages, temperature)
+        if settings.ai_cache_enabled:
+            started = time.perf_counter()
+            cached = await response_cache.get(cache_key)
+            if cached is not None:
+                result = parse(cached)
+                metrics_registry.record(
+                    method, model, time.perf_counter() - started, cache_hit=True, parse_success=True
+                )
+                return result
+
+        response, record = await self._create_completion(
+            method,
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            response_format={"type": "json_object"},
+        )
+        content = response.choices[0].message.content
+
+        # Parser avant de mettre en cache: une réponse invalide n'est jamais mémorisée
+        try:
+            result = parse(content)
+        except Exception:
+            record.parse_success = False
+            raise
+        record.parse_success = True
+        if settings.ai_cache_enabled:
+            await response_cache.set(cache_key, content)
+        return result
+
+    def _route_model(self, task: str, prompt: str, roster_size: int = 0) -> str:
+        """Modèle à utiliser selon la tâche, la taille du prompt et l'effectif du planning."""
+        tier = TASK_TIERS.get(task)
+        if tier is None:
+            small_enough = (
+                estimate_tokens(prompt) <= settings.llm_small_max_input_tokens
+                and roster_size <= settings.llm_small_max_employees
+            )
+            tier = "small" if small_enough else "large"
+        return settings.llm_model_small if tier == "small" else settings.llm_model_large
+
+    def _route_chat_model(self, messages: list[dict], current_planning: Optional[WeekPlanning]) -> str:
+        roster_size = len(current_planning.employees) if current_planning else 0
+        # Le préfixe système est identique d'un message à l'autre: seul le reste varie
+        prompt = "\n".join(message["content"] for message in messages[1:])
+        return self._route_model("process_chat_message", prompt, roster_size)
+
+    def _can_escalate(self, model: str) -> bool:
+        return (
+            settings.llm_escalation_enabled
+            and model == settings.llm_model_small
+            and settings.llm_model_large != settings.llm_model_small
+        )
 
-        # Try to extract JSON from response
-        planning = None
-        if "```json" in response_text:
-            try:
-                json_str = response_text.split("```json")[1].split("```")[0].strip()
-                planning = self._parse_response(json_str)
-            except (IndexError, json.JSONDecodeError):
-                pass
+    def _build_chat_messages(
+        self,
+        message: str,
+        current_planning: Optional[WeekPlanning] = None,
+        session: Optional[ChatSession] = None,
+    ) -> list[dict]:
+        """Ordre stable, du plus statique au plus variable, pour profiter du cache de prompt:
+        règles système, résumé, échanges précédents, puis message et planning courant."""
+        messages = [{"role": "system", "content": CHAT_SYSTEM_PROMPT}]
+        if session is not None:
+            if session.summary:
+                messages.append({
+                    "role": "system",
+                    "content": f"Résumé de la conversation précédente:\n{session.summary}",
+                })
+            messages.extend({"role": turn.role, "content": turn.content} for turn in session.turns)
 
-        return response_text, planning
+        context = ""
+        if current_planning:
+            context = f"\n\nCurrent schedule (format compact):\n{encode_planning(current_planning)}"
+        messages.append({"role": "user", "content": f"Message de l'utilisateur: {message}{context}"})
+        return messages
 
-    def process_pdf_content(
+    def _extract_chat_planning(self, response_text: str) -> Optional[WeekPlanning]:
+        # Try to extract JSON from response
+        if "```json" not in response_text:
+            return None
+        try:
+            json_str = response_text.split("```json")[1].split("```")[0].strip()
+            return self._parse_response(json_str)
+        except (IndexError, *PARSE_ERRORS):
+            return None
+
+    async def process_pdf_content(
         self,
         pdf_text: str,
         pdf_tables: list,
         additional_instructions: str = "",
     ) -> WeekPlanning:
-        client = self._get_client()
-
         tables_str = json.dumps(pdf_tables, indent=2) if pdf_tables else "No tables found"
 
         user_prompt = f"""Extrais les informations de planning des employés du contenu PDF suivant et crée un planning hebdomadaire.
@@ -171,52 +686,198 @@ Tableaux du PDF:
 
 Crée un planning complet basé sur ces informations. Si des données manquent, fais des hypothèses raisonnables pour un planning de restaurant."""
 
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.3,
-            response_format={"type": "json_object"},
-        )
+        model = self._route_model("process_pdf_content", user_prompt)
+        return await self._request_planning("process_pdf_content", model, user_prompt, temperature=0.3)
+
+    async def process_pdf_pages(
+        self,
+        pages: list[dict],
+        additional_instructions: str = "",
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> WeekPlanning:
+        """Import map-reduce: un appel par extrait (pages/tableaux), en parallèle, puis fusion.
+
+        `progress(done, total)` est appelé après chaque extrait traité.
+        Un PDF assez court pour tenir dans un seul extrait suit le chemin
+        classique de process_pdf_content.
+        """
+        chunks = self._split_pdf_pages(pages, settings.pdf_chunk_max_chars)
+        total = len(chunks)
+        if total <= 1:
+            planning = await self.process_pdf_content(
+                pdf_text="\n\n".join(page["text"] for page in pages if page["text"]),
+                pdf_tables=[table for page in pages for table in page["tables"]],
+                additional_instructions=additional_instructions,
+            )
+            if progress:
+                progress(1, 1)
+            return planning
+
+        semaphore = asyncio.Semaphore(settings.pdf_max_concurrency)
+        done = 0
+
+        async def extract(index: int, chunk: str) -> WeekPlanning:
+            nonlocal done
+            user_prompt = f"""Voici l'extrait {index + 1}/{total} d'un PDF de planning des employés.
+
+{chunk}
+
+{f'Instructions supplémentaires: {additional_instructions}' if additional_instructions else ''}
 
-        return self._parse_response(response.choices[0].message.content)
+Extrais uniquement les employés et les horaires présents dans cet extrait, sans en inventer.
+Les autres extraits sont traités séparément puis fusionnés."""
+
+            async with semaphore:
+                partial = await self._request_planning(
+                    "process_pdf_chunk",
+                    self._route_model("process_pdf_chunk", user_prompt),
+                    user_prompt,
+                    temperature=0.0,
+                )
+            done += 1
+            if progress:
+                progress(done, total)
+            return partial
+
+        partials = await asyncio.gather(*(extract(i, chunk) for i, chunk in enumerate(chunks)))
+        return self._merge_partial_plannings(partials)
+
+    def _split_pdf_pages(self, pages: list[dict], max_chars: int) -> list[str]:
+        """Découpe le contenu du PDF en extraits d'au plus `max_chars` caractères (hors ligne géante).
+
+        Chaque page est un bloc; une page trop grande est découpée en texte puis
+        tableaux, et un tableau trop grand en groupes de lignes qui répètent les
+        deux lignes d'en-tête. Les blocs consécutifs sont regroupés tant que
+        l'extrait reste sous la limite.
+        """
+        blocks = []
+        for page in pages:
+            tables_str = "\n".join(json.dumps(table, ensure_ascii=False) for table in page["tables"])
+            block = f"--- Page {page['page']} ---\nTexte:\n{page['text']}\nTableaux:\n{tables_str}"
+            if len(block) <= max_chars:
+                blocks.append(block)
+                continue
+
+            text = page["text"]
+            for start in range(0, len(text), max_chars):
+                blocks.append(f"--- Page {page['page']} (texte) ---\n{text[start:start + max_chars]}")
+            for table_idx, table in enumerate(page["tables"], start=1):
+                header, rows = table[:2], table[2:]
+                for group in self._split_table_rows(header, rows, max_chars):
+                    blocks.append(
+                        f"--- Page {page['page']}, tableau {table_idx} ---\n"
+                        f"{json.dumps(header + group, ensure_ascii=False)}"
+                    )
+
+        chunks: list[str] = []
+        for block in blocks:
+            if chunks and len(chunks[-1]) + len(block) + 2 <= max_chars:
+                chunks[-1] += "\n\n" + block
+            else:
+                chunks.append(block)
+        return chunks
+
+    def _split_table_rows(self, header: list, rows: list, max_chars: int) -> list[list]:
+        groups: list[list] = []
+        group: list = []
+        size = len(json.dumps(header, ensure_ascii=False))
+        header_size = size
+        for row in rows:
+            row_size = len(json.dumps(row, ensure_ascii=False)) + 2
+            if group and size + row_size > max_chars:
+                groups.append(group)
+                group, size = [], header_size
+            group.append(row)
+            size += row_size
+        groups.append(group)
+        return groups
+
+    def _merge_partial_plannings(self, partials: list[WeekPlanning]) -> WeekPlanning:
+        """Fusion déterministe: employés dans l'ordre d'apparition, premier service renseigné gagnant."""
+        weeks = [(p.week_number, p.year) for p in partials if p.employees]
+        week_number, year = max(weeks, key=weeks.count) if weeks else (partials[0].week_number, partials[0].year)
+
+        merged: dict[str, EmployeeWeekSchedule] = {}
+        for partial in partials:
+            for employee in partial.employees:
+                key = " ".join(employee.name.split()).casefold()
+                if key not in merged:
+                    merged[key] = employee.model_copy(deep=True)
+                    continue
+                target = merged[key]
+                for day in DAYS:
+                    source_day: DaySchedule = getattr(employee, day)
+                    target_day: DaySchedule = getattr(target, day)
+                    for service in ("afternoon", "evening"):
+                        source_shift = getattr(source_day, service)
+                        target_shift = getattr(target_day, service)
+                        if not target_shift.time_range and source_shift.time_range:
+                            setattr(target_day, service, source_shift.model_copy())
+
+        return WeekPlanning(week_number=week_number, year=year, employees=list(merged.values()))
+
+    def _parse_edits(self, response_text: str) -> list[PlanningEdit]:
+        data = json.loads(response_text)
+        edits = data.get("edits") if isinstance(data, dict) else None
+        if not isinstance(edits, list):
+            # Réponse JSON valide mais hors format: repli sur le mode complet
+            raise PlanningPatchError("Réponse sans liste d'éditions")
+        return [PlanningEdit.model_validate(edit) for edit in edits]
 
     def _parse_response(self, response_text: str) -> WeekPlanning:
+        """Planning décrit par la réponse JSON du modèle.
+
+        Une réponse hors format lève KeyError ou ValueError (PARSE_ERRORS), ce
+        qui déclenche le repli sur le grand modèle.
+        """
         data = json.loads(response_text)
+        if not isinstance(data, dict) or not isinstance(data.get("employees", []), list):
+            raise ValueError("Planning JSON sans liste d'employés")
 
-        employees = []
-        for emp_data in data.get("employees", []):
-            emp = EmployeeWeekSchedule(name=emp_data["name"])
+        return WeekPlanning(
+            week_number=data.get("week_number", 1),
+            year=data.get("year", 2024),
+            employees=[self._parse_employee(emp_data) for emp_data in data.get("employees", [])],
+        )
+
+    def _parse_employee(self, emp_data: dict) -> EmployeeWeekSchedule:
+        if not isinstance(emp_data, dict):
+            raise ValueError("Employé JSON invalide")
+        emp = EmployeeWeekSchedule(name=emp_data["name"])
 
-            for day in ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]:
-                if day in emp_data:
-                    day_data = emp_data[day]
-                    afternoon_data = day_data.get("afternoon", {})
-                    evening_data = day_data.get("evening", {})
+        for day in DAYS:
+            if day in emp_data:
+                day_data = _json_object(emp_data[day], day)
+                afternoon_data = _json_object(day_data.get("afternoon"), f"{day}.afternoon")
+                evening_data = _json_object(day_data.get("evening"), f"{day}.evening")
 
+                try:
                     day_schedule = DaySchedule(
                         afternoon=ShiftData(
                             start_time=afternoon_data.get("start_time") or "",
                             end_time=afternoon_data.get("end_time") or "",
-                            meals=int(afternoon_data.get("meals", 0)),
+                            meals=int(afternoon_data.get("meals") or 0),
                         ),
                         evening=ShiftData(
                             start_time=evening_data.get("start_time") or "",
                             end_time=evening_data.get("end_time") or "",
-                            meals=int(evening_data.get("meals", 0)),
+                            meals=int(evening_data.get("meals") or 0),
                         ),
                     )
-                    setattr(emp, day, day_schedule)
+                except TypeError as e:
+                    # "meals": [1]...
+                    raise ValueError(f"Service JSON invalide ({day}): {e}") from e
+                setattr(emp, day, day_schedule)
 
-            employees.append(emp)
+        return emp
 
-        return WeekPlanning(
-            week_number=data.get("week_number", 1),
-            year=data.get("year", 2024),
-            employees=employees,
-        )
 
+def _json_object(value, label: str) -> dict:
+    """Objet JSON attendu à `label`; null compte comme un objet vide."""
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise ValueError(f"Objet JSON attendu pour {label}")
+    return value
 
 ai_planner = AIPlanner()
@@ -0,0 +1,285 @@
+"""Interprétation locale des commandes de chat les plus courantes.
+
+Les messages du type "DUPONT Jean off samedi soir", "décale Martin de 30 min
+mardi midi" ou "Martin lundi 11h-15h" sont traduits directement en
+PlanningEdit, sans appel au modèle. Tout message qui n'est pas reconnu avec
+certitude (employé inconnu ou ambigu, jour absent, intention inconnue) est
+laissé au modèle.
+"""
+import re
+import unicodedata
+from typing import Optional
+
+from app.models.schemas import (
+    WeekPlanning,
+    ShiftData,
+    DayOfWeek,
+    ServiceType,
+    PlanningEdit,
+    PlanningEditAction,
+)
+from app.services.planning_patch import PlanningPatchError, apply_planning_edits
+
+
+DAY_WORDS = {
+    DayOfWeek.MONDAY: ["lundi", "lun", "monday", "mon"],
+    DayOfWeek.TUESDAY: ["mardi", "mar", "tuesday", "tue", "tues"],
+    DayOfWeek.WEDNESDAY: ["mercredi", "mer", "wednesday", "wed"],
+    DayOfWeek.THURSDAY: ["jeudi", "jeu", "thursday", "thu", "thurs"],
+    DayOfWeek.FRIDAY: ["vendredi", "ven", "friday", "fri"],
+    DayOfWeek.SATURDAY: ["samedi", "sam", "saturday", "sat"],
+    DayOfWeek.SUNDAY: ["dimanche", "dim", "sunday", "sun"],
+}
+WEEKEND_WORDS = ["weekend", "week-end"]
+# Mots outils ignorés pour reconnaître l'employé ("décale Dupont de 30 min" ne vise pas "DE SOUZA")
+STOP_WORDS = {
+    "de", "du", "des", "d", "le", "la", "les", "l", "a", "au", "aux", "et", "en", "pour", "sur",
+    "the", "of", "by", "to", "on", "at", "and",
+}
+
+SERVICE_WORDS = {
+    ServiceType.AFTERNOON: ["midi", "dejeuner", "afternoon", "lunch", "noon"],
+    ServiceType.EVENING: ["soir", "diner", "evening", "dinner", "night"],
+}
+
+# "enlève"/"retire" sont exclus: "enlève 30 min à Dupont" ne vide pas le service
+OFF_WORDS = ["off", "repos", "conge", "absent", "absente", "libre", "supprime", "remove"]
+OFF_PHRASES = ["ne travaille pas", "ne bosse pas", "day off", "does not work", "doesn't work", "not working"]
+MOVE_WORDS = ["decale", "decaler", "shift", "move", "retarde", "retarder", "delay", "postpone", "avance", "avancer"]
+EARLIER_WORDS = ["avance", "avancer", "tot", "earlier", "before", "avant"]
+# Messages qui concernent un nouvel employé ou tout le monde: laissés au modèle
+UNSUPPORTED_WORDS = [
+    "ajoute", "ajouter", "add", "nouveau", "nouvelle", "new", "embauche",
+    "tous", "toutes", "tout", "everyone", "all", "planning", "schedule",
+]
+
+DAY_SERVICE_LABELS_FR = {
+    DayOfWeek.MONDAY: "lundi",
+    DayOfWeek.TUESDAY: "mardi",
+    DayOfWeek.WEDNESDAY: "mercredi",
+    DayOfWeek.THURSDAY: "jeudi",
+    DayOfWeek.FRIDAY: "vendredi",
+    DayOfWeek.SATURDAY: "samedi",
+    DayOfWeek.SUNDAY: "dimanche",
+}
+SERVICE_LABELS_FR = {ServiceType.AFTERNOON: "midi", ServiceType.EVENING: "soir"}
+
+TIME = r"(\d{1,2})\s*(?::|h)\s*(\d{2})?"
+TIME_RANGE_PATTERN = re.compile(rf"{TIME}\s*(?:-|–|a|to|jusqu'a)\s*{TIME}")
+DELTA_PATTERN = re.compile(
+    r"(?:\b(?:de|by|of)\s+|(?P<sign>[+-])\s*)(?P<amount>\d+)\s*"
+    r"(?:(?P<hours>h)\s*(?P<minutes>\d{2})?|min(?:utes?)?|mn)\b"
+)
+# Durée ou heure isolée ("30 min", "2h", "11h"), cherchée hors des plages horaires
+DURATION_PATTERN = re.compile(r"\b\d+\s*(?:min(?:utes?)?|mn|h(?:eures?)?)(?![a-z0-9])")
+
+MAX_COMMAND_WORDS = 20
+
+
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return text.casefold()
+
+
+def _words(text: str) -> list[str]:
+    return re.findall(r"[a-z0-9'\-]+", text)
+
+
+def _to_minutes(hours: str, minutes: Optional[str]) -> int:
+    return int(hours) * 60 + int(minutes or 0)
+
+
+def _parse_time(hours: str, minutes: Optional[str]) -> Optional[int]:
+    """Heure d'une plage saisie, en minutes; None hors de 00:00-23:59 ("25h")."""
+    if int(hours) > 23 or int(minutes or 0) > 59:
+        return None
+    return _to_minutes(hours, minutes)
+
+
+def _format_minutes(total: int) -> str:
+    total %= 24 * 60
+    return f"{total // 60:02d}:{total % 60:02d}"
+
+
+class ChatCommandParser:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def try_apply(
+        self,
+        message: str,
+        planning: Optional[WeekPlanning],
+    ) -> Optional[tuple[str, WeekPlanning]]:
+        """Applique le message s'il est reconnu; retourne (réponse, planning) ou None."""
+        edits = self.parse(message, planning) if planning else None
+        if edits:
+            try:
+                updated = apply_planning_edits(planning, edits)
+            except PlanningPatchError:
+                edits = None
+
+        if not edits:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self._describe(edits), updated
+
+    def parse(self, message: str, planning: WeekPlanning) -> Optional[list[PlanningEdit]]:
+        text = _normalize(message)
+        if "?" in text:
+            return None
+        words = _words(text)
+        if not words or len(words) > MAX_COMMAND_WORDS:
+            return None
+        if any(w in UNSUPPORTED_WORDS for w in words):
+            return None
+
+        match = self._match_employee(words, planning)
+        if match is None:
+            return None
+        employee, name_words = match
+        # Un mot du nom n'est pas lu comme jour ou service ("Sam" n'est pas samedi)
+        slot_words = [w for w in words if w not in name_words]
+        days = self._match_days(slot_words)
+        if not days:
+            return None
+        services = self._match_services(slot_words)
+        # Une seule plage horaire, et aucune durée en dehors des décalages
+        time_ranges = list(TIME_RANGE_PATTERN.finditer(text))
+        if len(time_ranges) > 1:
+            return None
+        is_move = any(w in MOVE_WORDS for w in words)
+        if not is_move and DURATION_PATTERN.search(TIME_RANGE_PATTERN.sub(" ", text)):
+            return None
+
+        if any(w in OFF_WORDS for w in words) or any(p in text for p in OFF_PHRASES):
+            # "off samedi, travaille dimanche 18h-23h": consigne mixte, laissée au modèle
+            named_days = [day for day, names in DAY_WORDS.items() if any(w in names for w in slot_words)]
+            if time_ranges or is_move or len(named_days) > 1:
+                return None
+            return [
+                PlanningEdit(action=PlanningEditAction.CLEAR_SHIFT, employee=employee, day=day, service=service)
+                for day in days
+                for service in (services or list(ServiceType))
+            ]
+
+        if is_move:
+            return self._parse_move(text, words, employee, days, services, planning)
+
+        if time_ranges:
+            time_range = time_ranges[0]
+            start = _parse_time(time_range.group(1), time_range.group(2))
+            end = _parse_time(time_range.group(3), time_range.group(4))
+            if start is None or end is None:
+                return None
+            if not services:
+                # Sans précision, un service qui commence avant 16h est celui du midi
+                services = [ServiceType.AFTERNOON if start < 16 * 60 else ServiceType.EVENING]
+            return [
+                PlanningEdit(
+                    action=PlanningEditAction.SET_SHIFT,
+                    employee=employee,
+                    day=day,
+                    service=service,
+                    start_time=_format_minutes(start),
+                    end_time=_format_minutes(end),
+                    meals=1,
+                )
+                for day in days
+                for service in services
+            ]
+
+        return None
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def _parse_move(
+        self,
+        text: str,
+        words: list[str],
+        employee: str,
+        days: list[DayOfWeek],
+        services: list[ServiceType],
+        planning: WeekPlanning,
+    ) -> Optional[list[PlanningEdit]]:
+        delta_match = DELTA_PATTERN.search(text)
+        if not delta_match or not services:
+            return None
+        if delta_match.group("hours"):
+            delta = _to_minutes(delta_match.group("amount"), delta_match.group("minutes"))
+        else:
+            delta = int(delta_match.group("amount"))
+        if delta_match.group("sign") == "-" or any(w in EARLIER_WORDS for w in words) or "plus tot" in text:
+            delta = -delta
+
+        schedule = next(emp for emp in planning.employees if emp.name == employee)
+        edits = []
+        for day in days:
+            for service in services:
+                shift: ShiftData = getattr(getattr(schedule, day.value), service.value)
+                if not shift.start_time or not shift.end_time:
+                    return None
+                start_h, start_m = shift.start_time.split(":")
+                end_h, end_m = shift.end_time.split(":")
+                edits.append(
+                    PlanningEdit(
+                        action=PlanningEditAction.SET_SHIFT,
+                        employee=employee,
+                        day=day,
+                        service=service,
+                        start_time=_format_minutes(_to_minutes(start_h, start_m) + delta),
+                        end_time=_format_minutes(_to_minutes(end_h, end_m) + delta),
+                        meals=shift.meals,
+                    )
+                )
+        return edits
+
+    def _match_employee(self, words: list[str], planning: WeekPlanning) -> Optional[tuple[str, set[str]]]:
+        """Employé désigné par le message et mots de son nom qui y figurent.
+
+        Chaque mot du message qui appartient à un nom (hors mots outils) doit
+        désigner le même et unique employé; sinon (nom partagé sans prénom,
+        deux employés cités, aucun nom reconnu) le message est laissé au modèle.
+        """
+        word_set = {w for w in words if w not in STOP_WORDS}
+        names = {emp.name: set(_words(_normalize(emp.name))) for emp in planning.employees}
+        name_words = {w for w in word_set if any(w in parts for parts in names.values())}
+        if not name_words:
+            return None
+
+        # Employés dont le nom contient tous ces mots: il doit en rester exactement un
+        candidates = [name for name, parts in names.items() if name_words <= parts]
+        if len(candidates) != 1:
+            return None
+        return candidates[0], name_words
+
+    def _match_days(self, words: list[str]) -> list[DayOfWeek]:
+        days = [day for day, names in DAY_WORDS.items() if any(w in names for w in words)]
+        if any(w in WEEKEND_WORDS for w in words):
+            days.extend(d for d in (DayOfWeek.SATURDAY, DayOfWeek.SUNDAY) if d not in days)
+        return days
+
+    def _match_services(self, words: list[str]) -> list[ServiceType]:
+        return [service for service, names in SERVICE_WORDS.items() if any(w in names for w in words)]
+
+    def _describe(self, edits: list[PlanningEdit]) -> str:
+        lines = ["C'est noté, planning mis à jour :"]
+        for edit in edits:
+            slot = f"{DAY_SERVICE_LABELS_FR[edit.day]} {SERVICE_LABELS_FR[edit.service]}"
+            if edit.action == PlanningEditAction.CLEAR_SHIFT:
+                lines.append(f"• {edit.employee} ne travaille pas {slot}")
+            else:
+                lines.append(f"• {edit.employee} travaille {slot} de {edit.start_time} à {edit.end_time}")
+        return "\n".join(lines)
+
+
+chat_command_parser = ChatCommandParser()
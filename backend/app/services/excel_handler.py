@@ -1,16 +1,35 @@
+from copy import copy
 from pathlib import Path
 from datetime import datetime, timedelta
+from itertools import chain
+import os
 import re
+from typing import Optional
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape, unescape
+import zipfile
 from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+from openpyxl.cell import Cell, WriteOnlyCell
+from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, NamedStyle, DEFAULT_FONT
 from openpyxl.utils import get_column_letter
 
+from app.core.config import settings
+from app.services.process_pool import get_process_pool, process_pool_size
 from app.models.schemas import WeekPlanning, EmployeeWeekSchedule, DaySchedule, ShiftData
 
 
 DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
 DAY_LABELS_FR = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"]
 
+# Mise à jour directe du XML d'une feuille (.xlsx = archive zip)
+SPREADSHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+SHEET_XML_PATTERN = re.compile(r"^xl/worksheets/sheet\d+\.xml$")
+CELL_XML_PATTERN = re.compile(r'<c r="([A-Z]+[0-9]+)"([^>]*?)(?:/>|>(.*?)</c>)', re.S)
+# Onglet d'une semaine: "Semaine 12", "Week 12", "Semaine 1 2026" (année ajoutée si deux onglets
+# ont le même numéro), éventuellement suivi d'un libellé ("Semaine 12 - Cuisine")
+SHEET_TITLE_PATTERN = re.compile(r"^(?:Semaine|Week)\s+(\d{1,2})\b(?:\s+(\d{4})\b)?", re.I)
+WEEK_TITLE_PATTERN = re.compile(r"Semaine\s+(\d{1,2})\s+du\s+\d{2}/\d{2}/(\d{4})\s+au\s+\d{2}/\d{2}/(\d{4})")
+
 
 def get_next_week_info() -> tuple[int, int, str, str]:
     """Retourne le numéro de semaine, l'année, et les dates de la semaine prochaine."""
@@ -30,8 +49,8 @@ def get_next_week_info() -> tuple[int, int, str, str]:
     return week_number, year, start_date, end_date
 
 
-def get_week_dates(week_number: int, year: int) -> tuple[str, str]:
-    """Calcule les dates de début et fin pour une semaine donnée."""
+def get_week_monday(week_number: int, year: int) -> datetime:
+    """Lundi de la semaine donnée (la semaine 53 d'une année qui n'en a que 52 tombe sur la suivante)."""
     jan1 = datetime(year, 1, 1)
     days_to_monday = (7 - jan1.weekday()) % 7
     if jan1.weekday() <= 3:
@@ -39,12 +58,54 @@ def get_week_dates(week_number: int, year: int) -> tuple[str, str]:
     else:
         first_monday = jan1 + timedelta(days=days_to_monday)
 
-    target_monday = first_monday + timedelta(weeks=week_number - 1)
+    return first_monday + timedelta(weeks=week_number - 1)
+
+
+def get_week_dates(week_number: int, year: int) -> tuple[str, str]:
+    """Calcule les dates de début et fin pour une semaine donnée."""
+    target_monday = get_week_monday(week_number, year)
     target_sunday = target_monday + timedelta(days=6)
 
     return target_monday.strftime("%d/%m/%Y"), target_sunday.strftime("%d/%m/%Y")
 
 
+def _copy_resolved_style(source: Cell, target: Cell):
+    """Donne à `target` le style déjà résolu de `source`.
+
+    `cell.style = nom` recherche le style nommé dans le classeur à chaque
+    cellule (environ 30 % du temps d'export). Recopier le tableau d'indices
+    interne `_style` évite cette recherche. C'est un détail d'implémentation
+    d'openpyxl, validé pour la plage fixée dans requirements.txt (3.1.x).
+    À défaut, le style est affecté par l'API publique.
+    """
+    style_array = getattr(source, "_style", None)
+    if style_array is None:
+        target.style = source.style
+    else:
+        target._style = copy(style_array)
+
+
+class ExcelPlanningError(ValueError):
+    """Cellules illisibles dans un fichier de planning, toutes signalées en une fois."""
+
+    def __init__(self, errors: list[str]):
+        self.errors = errors
+        super().__init__(f"{len(errors)} invalid cell(s): " + "; ".join(errors[:20]))
+
+    def __reduce__(self):
+        # Remontée depuis un processus du pool: reconstruire à partir de la liste
+        return ExcelPlanningError, (self.errors,)
+
+
+def _load_sheet(path: Path, title: str) -> WeekPlanning:
+    # Fonction de module: exécutée dans un processus du pool, elle rouvre le classeur
+    wb = load_workbook(path, read_only=True)
+    try:
+        return ExcelHandler()._load_planning_sheet(wb[title])
+    finally:
+        wb.close()
+
+
 class ExcelHandler:
     def __init__(self):
         self.header_font = Font(bold=True, size=10)
@@ -58,43 +119,17 @@ class ExcelHandler:
             bottom=Side(style="thin"),
         )
         self.center_align = Alignment(horizontal="center", vertical="center", wrap_text=True)
+        self.left_align = Alignment(horizontal="left", vertical="center")
+        self.title_align = Alignment(horizontal="center", vertical="center")
 
-    def create_planning_workbook(self, planning: WeekPlanning) -> Workbook:
-        wb = Workbook()
-        ws = wb.active
-
+    def _week_info(self, planning: WeekPlanning) -> tuple[int, int, str, str]:
         # Calculer les dates
         if planning.week_number and planning.year:
-            week_num = planning.week_number
-            year = planning.year
-            start_date, end_date = get_week_dates(week_num, year)
-        else:
-            week_num, year, start_date, end_date = get_next_week_info()
-
-        # Titre de l'onglet
-        ws.title = f"Semaine {week_num}"
-
-        # Titre du document (ligne 1)
-        title = f"Planning des employés WOK10 - Semaine {week_num} du {start_date} au {end_date}"
-        # 1 + 7*6 + 2 = 45 colonnes
-        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=45)
-        cell = ws.cell(row=1, column=1, value=title)
-        cell.font = self.title_font
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-
-        # Ligne vide
-        ws.row_dimensions[2].height = 10
-
-        self._setup_headers(ws, start_row=3)
-        self._populate_data(ws, planning, start_row=5)
-        self._adjust_column_widths(ws)
-
-        return wb
-
-    def _setup_headers(self, ws, start_row: int = 3):
-        # Structure: Employé | [Midi, H, Repas, Soir, H, Repas] x 7 jours | Total Heures, Total Repas
-        # Les colonnes "H" (heures) seront cachées
+            start_date, end_date = get_week_dates(planning.week_number, planning.year)
+            return planning.week_number, planning.year, start_date, end_date
+        return get_next_week_info()
 
+    def _header_rows(self) -> tuple[list[str], list[str]]:
         # Row 1: Main headers
         headers_row1 = ["Employé"]
         for day in DAY_LABELS_FR:
@@ -106,110 +141,47 @@ class ExcelHandler:
         for _ in DAY_LABELS_FR:
             headers_row2.extend(["Midi", "H", "Repas", "Soir", "H", "Repas"])
         headers_row2.extend(["Heures", "Repas"])
+        return headers_row1, headers_row2
 
-        # Write headers
-        for col, header in enumerate(headers_row1, 1):
-            cell = ws.cell(row=start_row, column=col, value=header)
-            cell.font = self.header_font_white
-            cell.fill = self.header_fill
-            cell.alignment = self.center_align
-            cell.border = self.thin_border
+    def _write_employee_row(self, ws, row_idx: int, employee: EmployeeWeekSchedule):
+        values = self._employee_row_values(employee, row_idx)
+        total_hours_col = len(values) - 1
 
-        for col, header in enumerate(headers_row2, 1):
-            cell = ws.cell(row=start_row + 1, column=col, value=header)
-            cell.font = self.header_font
-            cell.alignment = self.center_align
-            cell.border = self.thin_border
-
-        # Merge day headers (6 colonnes par jour maintenant)
-        col = 2
-        for _ in DAY_LABELS_FR:
-            ws.merge_cells(start_row=start_row, start_column=col, end_row=start_row, end_column=col + 5)
-            col += 6
-
-        # Merge weekly total header
-        ws.merge_cells(start_row=start_row, start_column=col, end_row=start_row, end_column=col + 1)
+        # Employee name
+        cell = ws.cell(row=row_idx, column=1, value=values[0])
+        cell.border = self.thin_border
+        cell.alignment = self.left_align
 
-        # Cacher les colonnes d'heures (H) - colonnes 3, 6, 9, 12, ... (pattern: col 2 + 6*n + 1)
-        for day_idx in range(7):
-            # Colonne H midi = 2 + day_idx*6 + 1 = 3 + day_idx*6
-            # Colonne H soir = 2 + day_idx*6 + 4 = 6 + day_idx*6
-            h_midi_col = 3 + day_idx * 6
-            h_soir_col = 6 + day_idx * 6
-            ws.column_dimensions[get_column_letter(h_midi_col)].hidden = True
-            ws.column_dimensions[get_column_letter(h_soir_col)].hidden = True
-
-    def _populate_data(self, ws, planning: WeekPlanning, start_row: int = 5):
-        for row_idx, employee in enumerate(planning.employees, start=start_row):
-            # Employee name
-            cell = ws.cell(row=row_idx, column=1, value=employee.name)
-            cell.border = self.thin_border
-            cell.alignment = Alignment(horizontal="left", vertical="center")
-
-            col = 2
-            meals_cols = []  # Pour stocker les colonnes des repas pour la formule
-            hours_cols = []  # Pour stocker les colonnes des heures pour la formule
-
-            for day in DAYS:
-                day_schedule: DaySchedule = getattr(employee, day)
-
-                # Afternoon time range
-                cell = ws.cell(row=row_idx, column=col, value=day_schedule.afternoon.time_range or "-")
-                cell.border = self.thin_border
-                cell.alignment = self.center_align
-                col += 1
-
-                # Afternoon hours (colonne cachée)
-                cell = ws.cell(row=row_idx, column=col, value=day_schedule.afternoon.hours if day_schedule.afternoon.hours else 0)
-                cell.border = self.thin_border
-                cell.alignment = self.center_align
-                hours_cols.append(get_column_letter(col))
-                col += 1
-
-                # Afternoon meals
-                afternoon_meals_val = day_schedule.afternoon.meals if day_schedule.afternoon.meals else 0
-                cell = ws.cell(row=row_idx, column=col, value=afternoon_meals_val if afternoon_meals_val else "-")
-                cell.border = self.thin_border
-                cell.alignment = self.center_align
-                meals_cols.append(get_column_letter(col))
-                col += 1
-
-                # Evening time range
-                cell = ws.cell(row=row_idx, column=col, value=day_schedule.evening.time_range or "-")
-                cell.border = self.thin_border
-                cell.alignment = self.center_align
-                col += 1
-
-                # Evening hours (colonne cachée)
-                cell = ws.cell(row=row_idx, column=col, value=day_schedule.evening.hours if day_schedule.evening.hours else 0)
-                cell.border = self.thin_border
-                cell.alignment = self.center_align
-                hours_cols.append(get_column_letter(col))
-                col += 1
-
-                # Evening meals
-                evening_meals_val = day_schedule.evening.meals if day_schedule.evening.meals else 0
-                cell = ws.cell(row=row_idx, column=col, value=evening_meals_val if evening_meals_val else "-")
-                cell.border = self.thin_border
-                cell.alignment = self.center_align
-                meals_cols.append(get_column_letter(col))
-                col += 1
-
-            # Weekly total hours - formule Excel pour additionner les colonnes d'heures cachées
-            hours_formula = "=" + "+".join([f'{c}{row_idx}' for c in hours_cols])
-            cell = ws.cell(row=row_idx, column=col, value=hours_formula)
+        for col, value in enumerate(values[1:], start=2):
+            cell = ws.cell(row=row_idx, column=col, value=value)
             cell.border = self.thin_border
             cell.alignment = self.center_align
-            cell.font = self.header_font
-            col += 1
-
-            # Weekly total meals - formule Excel pour additionner les repas (ignorer "-")
-            meals_formula_parts = [f'IF({c}{row_idx}="-",0,{c}{row_idx})' for c in meals_cols]
-            meals_formula = "=" + "+".join(meals_formula_parts)
-            cell = ws.cell(row=row_idx, column=col, value=meals_formula)
-            cell.border = self.thin_border
-            cell.alignment = self.center_align
-            cell.font = self.header_font
+            if col >= total_hours_col:
+                cell.font = self.header_font
+
+    def _employee_row_values(self, employee: EmployeeWeekSchedule, row_idx: int) -> list:
+        """Valeurs des 45 colonnes d'une ligne employé: nom, [Midi, H, Repas, Soir, H, Repas] x 7, totaux."""
+        values = [employee.name]
+        meals_cols = []  # Pour stocker les colonnes des repas pour la formule
+        hours_cols = []  # Pour stocker les colonnes des heures pour la formule
+
+        for day in DAYS:
+            day_schedule: DaySchedule = getattr(employee, day)
+            for shift in (day_schedule.afternoon, day_schedule.evening):
+                # Plage horaire, heures (colonne cachée), repas
+                values.append(shift.time_range or "-")
+                values.append(shift.hours if shift.hours else 0)
+                hours_cols.append(get_column_letter(len(values)))
+                values.append(shift.meals if shift.meals else "-")
+                meals_cols.append(get_column_letter(len(values)))
+
+        # Weekly total hours - formule Excel pour additionner les colonnes d'heures cachées
+        values.append("=" + "+".join([f'{c}{row_idx}' for c in hours_cols]))
+
+        # Weekly total meals - formule Excel pour additionner les repas (ignorer "-")
+        meals_formula_parts = [f'IF({c}{row_idx}="-",0,{c}{row_idx})' for c in meals_cols]
+        values.append("=" + "+".join(meals_formula_parts))
+        return values
 
     def _adjust_column_widths(self, ws):
         ws.column_dimensions["A"].width = 18
@@ -230,92 +202,209 @@ class ExcelHandler:
         ws.column_dimensions[get_column_letter(total_col)].width = 8      # Total Heures
         ws.column_dimensions[get_column_letter(total_col + 1)].width = 7  # Total Repas
 
+    def write_planning_file(self, plannings: list[WeekPlanning], path: Path) -> Path:
+        """Écrit directement sur disque un classeur d'un onglet "Semaine N" par planning.
+
+        Classeur en mode write-only: les lignes sont émises une à une avec des
+        styles nommés partagés, la mémoire reste constante quel que soit le
+        nombre d'employés et de semaines.
+        """
+        wb = Workbook(write_only=True)
+        for style in self._named_styles():
+            wb.add_named_style(style)
+
+        week_numbers = [planning.week_number for planning in plannings]
+        for planning in plannings:
+            week_num, year, start_date, end_date = self._week_info(planning)
+            ws = wb.create_sheet(f"Semaine {week_num}")
+            # Même numéro de semaine sur deux années: préciser l'année dans l'onglet
+            if week_numbers.count(planning.week_number) > 1:
+                ws.title = f"Semaine {planning.week_number} {planning.year}"
+            self._stream_planning_sheet(ws, planning, f"Semaine {week_num} du {start_date} au {end_date}")
+
+        wb.save(path)
+        return path
+
+    def _named_styles(self) -> list[NamedStyle]:
+        # Nouveaux objets à chaque classeur: un NamedStyle n'est rattaché qu'à un seul classeur
+        return [
+            NamedStyle(name="planning_title", font=self.title_font, alignment=self.title_align),
+            NamedStyle(
+                name="planning_header",
+                font=self.header_font_white,
+                fill=self.header_fill,
+                alignment=self.center_align,
+                border=self.thin_border,
+            ),
+            NamedStyle(
+                name="planning_subheader",
+                font=self.header_font,
+                alignment=self.center_align,
+                border=self.thin_border,
+            ),
+            NamedStyle(name="planning_name", font=DEFAULT_FONT, alignment=self.left_align, border=self.thin_border),
+            NamedStyle(name="planning_cell", font=DEFAULT_FONT, alignment=self.center_align, border=self.thin_border),
+            NamedStyle(
+                name="planning_total",
+                font=self.header_font,
+                alignment=self.center_align,
+                border=self.thin_border,
+            ),
+        ]
+
+    def _stream_planning_sheet(self, ws, planning: WeekPlanning, week_label: str):
+        # Dimensions et fusions avant la première ligne: elles ne peuvent plus changer ensuite
+        self._adjust_column_widths(ws)
+        for day_idx in range(7):
+            ws.column_dimensions[get_column_letter(3 + day_idx * 6)].hidden = True
+            ws.column_dimensions[get_column_letter(6 + day_idx * 6)].hidden = True
+        ws.row_dimensions[2].height = 10
+        ws.merged_cells.add("A1:AS1")
+        for col in range(2, 2 + 7 * 6, 6):
+            ws.merged_cells.add(f"{get_column_letter(col)}3:{get_column_letter(col + 5)}3")
+        ws.merged_cells.add("AR3:AS3")
+
+        # Un style nommé résolu une fois par onglet, puis recopié sur les cellules suivantes
+        prototypes: dict[str, Cell] = {}
+
+        def styled(value, style: str) -> Cell:
+            cell = WriteOnlyCell(ws, value=value)
+            if style not in prototypes:
+                cell.style = style
+                prototypes[style] = cell
+            else:
+                _copy_resolved_style(prototypes[style], cell)
+            return cell
+
+        ws.append([styled(f"Planning des employés WOK10 - {week_label}", "planning_title")])
+        ws.append([])
+        headers_row1, headers_row2 = self._header_rows()
+        ws.append([styled(value, "planning_header") for value in headers_row1])
+        ws.append([styled(value, "planning_subheader") for value in headers_row2])
+
+        cell_styles = ["planning_name"] + ["planning_cell"] * 42 + ["planning_total"] * 2
+        for row_idx, employee in enumerate(planning.employees, start=5):
+            values = self._employee_row_values(employee, row_idx)
+            ws.append([styled(value, style) for value, style in zip(values, cell_styles)])
+
     def save_workbook(self, wb: Workbook, path: Path) -> Path:
         wb.save(path)
         return path
 
     def load_planning_from_excel(self, path: Path) -> WeekPlanning:
-        wb = load_workbook(path)
-        ws = wb.active
-
-        # Extract week number from sheet title
-        week_number = 1
-        year = datetime.now().year
-
-        if ws.title:
-            if ws.title.startswith("Semaine "):
-                try:
-                    week_number = int(ws.title.split(" ")[1])
-                except (ValueError, IndexError):
-                    pass
-            elif ws.title.startswith("Week "):
-                try:
-                    week_number = int(ws.title.split(" ")[1])
-                except (ValueError, IndexError):
-                    pass
+        """Lit le planning de l'onglet actif.
+
+        Le classeur est ouvert en lecture seule et parcouru ligne par ligne.
+        Toutes les cellules invalides sont signalées ensemble par ExcelPlanningError.
+        """
+        wb = load_workbook(path, read_only=True)
+        try:
+            return self._load_planning_sheet(wb.active)
+        finally:
+            wb.close()
+
+    def load_plannings_from_excel(self, path: Path) -> list[WeekPlanning]:
+        """Un planning par onglet "Semaine N" / "Week N", triés par semaine.
+
+        Sans onglet de ce nom, seul l'onglet actif est lu. À partir de
+        `settings.excel_parallel_min_sheets` onglets, ils sont répartis sur le
+        pool de processus partagé (lecture limitée par le CPU). Les cellules invalides
+        de tous les onglets sont signalées ensemble par ExcelPlanningError.
+        """
+        plannings, errors = [], []
+
+        def collect(title: str, load):
+            try:
+                plannings.append(load())
+            except ExcelPlanningError as e:
+                errors.extend(f"'{title}'!{error}" for error in e.errors)
+
+        wb = load_workbook(path, read_only=True)
+        try:
+            titles = [ws.title for ws in wb.worksheets if SHEET_TITLE_PATTERN.match(ws.title)]
+            if not titles:
+                return [self._load_planning_sheet(wb.active)]
+            parallel = process_pool_size() > 1 and len(titles) >= settings.excel_parallel_min_sheets
+            if not parallel:
+                for title in titles:
+                    collect(title, lambda: self._load_planning_sheet(wb[title]))
+        finally:
+            wb.close()
+
+        if parallel:
+            pool = get_process_pool()
+            futures = [pool.submit(_load_sheet, path, title) for title in titles]
+            for title, future in zip(titles, futures):
+                collect(title, future.result)
+
+        if errors:
+            raise ExcelPlanningError(errors)
+        return sorted(plannings, key=lambda planning: (planning.year, planning.week_number))
+
+    def _load_planning_sheet(self, ws) -> WeekPlanning:
+        # Extract week number (and year, if present) from sheet title
+        week_number, year = 1, None
+        match = SHEET_TITLE_PATTERN.match(ws.title or "")
+        if match:
+            week_number = int(match.group(1))
+            year = int(match.group(2)) if match.group(2) else None
 
+        rows = ws.iter_rows(values_only=True)
         # Detect if there's a title row (new format starts data at row 5)
         # Old format starts at row 3
-        first_cell = ws.cell(row=1, column=1).value
+        head = [row for _, row in zip(range(4), rows)]
+        first_cell = head[0][0] if head and head[0] else None
         if first_cell and "Planning des employés" in str(first_cell):
             data_start_row = 5
+            # Année de la ligne de titre "Semaine N du JJ/MM/AAAA au JJ/MM/AAAA"
+            title_match = WEEK_TITLE_PATTERN.search(str(first_cell))
+            if year is None and title_match and int(title_match.group(1)) == week_number:
+                # La semaine 1 peut commencer en décembre, les dernières finir en janvier
+                year = int(title_match.group(2)) if week_number >= 52 else int(title_match.group(3))
         else:
             data_start_row = 3
-
-        employees = []
-        row = data_start_row
+        if year is None:
+            year = datetime.now().year
 
         # Détecter si c'est l'ancien format (4 colonnes par jour) ou le nouveau (6 colonnes par jour)
-        # En vérifiant le header de la ligne 4 ou 3+1
-        header_row = data_start_row - 1
-        # Vérifier si colonne 3 contient "H" (nouveau format) ou "Repas" (ancien format)
-        col3_header = ws.cell(row=header_row, column=3).value or ""
-        is_new_format = str(col3_header).strip() == "H"
-        cols_per_day = 6 if is_new_format else 4
-
-        while True:
-            employee_name = ws.cell(row=row, column=1).value
+        # Vérifier si colonne 3 de la ligne d'en-tête contient "H" (nouveau format) ou "Repas" (ancien format)
+        header_row = head[data_start_row - 2] if len(head) >= data_start_row - 1 else ()
+        col3_header = header_row[2] if len(header_row) > 2 else ""
+        column_map = self._compile_column_map(str(col3_header or "").strip() == "H")
+        width = column_map[-1][-1] + 1
+
+        employees = []
+        errors = []
+        # Les lignes déjà lues pour les en-têtes, puis le reste de la feuille
+        for row_idx, row in enumerate(chain(head[data_start_row - 1:], rows), start=data_start_row):
+            employee_name = row[0] if row else None
             if not employee_name or str(employee_name).upper() == "TOTAL":
                 break
-
-            employee = EmployeeWeekSchedule(name=str(employee_name))
-            col = 2
-
-            for day in DAYS:
-                if is_new_format:
-                    # Nouveau format: Midi, H, Repas, Soir, H, Repas
-                    afternoon_time = ws.cell(row=row, column=col).value or ""
-                    afternoon_start, afternoon_end = self._parse_time_range(afternoon_time)
-                    # col+1 = H (heures, ignoré car calculé)
-                    afternoon_meals = ws.cell(row=row, column=col + 2).value
-                    afternoon_meals = int(afternoon_meals) if afternoon_meals and afternoon_meals != "-" else 0
-
-                    evening_time = ws.cell(row=row, column=col + 3).value or ""
-                    evening_start, evening_end = self._parse_time_range(evening_time)
-                    # col+4 = H (heures, ignoré car calculé)
-                    evening_meals = ws.cell(row=row, column=col + 5).value
-                    evening_meals = int(evening_meals) if evening_meals and evening_meals != "-" else 0
-                else:
-                    # Ancien format: Midi, Repas, Soir, Repas
-                    afternoon_time = ws.cell(row=row, column=col).value or ""
-                    afternoon_start, afternoon_end = self._parse_time_range(afternoon_time)
-                    afternoon_meals = ws.cell(row=row, column=col + 1).value
-                    afternoon_meals = int(afternoon_meals) if afternoon_meals and afternoon_meals != "-" else 0
-
-                    evening_time = ws.cell(row=row, column=col + 2).value or ""
-                    evening_start, evening_end = self._parse_time_range(evening_time)
-                    evening_meals = ws.cell(row=row, column=col + 3).value
-                    evening_meals = int(evening_meals) if evening_meals and evening_meals != "-" else 0
-
-                day_schedule = DaySchedule(
-                    afternoon=ShiftData(start_time=afternoon_start, end_time=afternoon_end, meals=afternoon_meals),
-                    evening=ShiftData(start_time=evening_start, end_time=evening_end, meals=evening_meals),
+            if len(row) < width:
+                row = tuple(row) + (None,) * (width - len(row))
+
+            days = {}
+            for day, afternoon_time, afternoon_meals, evening_time, evening_meals in column_map:
+                afternoon_start, afternoon_end = self._parse_time_range(row[afternoon_time] or "")
+                evening_start, evening_end = self._parse_time_range(row[evening_time] or "")
+                days[day] = DaySchedule(
+                    afternoon=ShiftData(
+                        start_time=afternoon_start,
+                        end_time=afternoon_end,
+                        meals=self._parse_meals(row[afternoon_meals], row_idx, afternoon_meals, errors),
+                    ),
+                    evening=ShiftData(
+                        start_time=evening_start,
+                        end_time=evening_end,
+                        meals=self._parse_meals(row[evening_meals], row_idx, evening_meals, errors),
+                    ),
                 )
-                setattr(employee, day, day_schedule)
-                col += cols_per_day
 
-            employees.append(employee)
-            row += 1
+            # Tous les jours fournis au constructeur: pas de copie des valeurs par défaut
+            employees.append(EmployeeWeekSchedule(name=str(employee_name), **days))
+
+        if errors:
+            raise ExcelPlanningError(errors)
 
         return WeekPlanning(
             week_number=week_number,
@@ -323,6 +412,30 @@ class ExcelHandler:
             employees=employees,
         )
 
+    def _compile_column_map(self, is_new_format: bool) -> list[tuple[str, int, int, int, int]]:
+        """Par jour: indices (base 0) des colonnes Midi, Repas midi, Soir, Repas soir."""
+        if is_new_format:
+            # Nouveau format: Midi, H, Repas, Soir, H, Repas (H = heures, ignorées car calculées)
+            cols_per_day, offsets = 6, (0, 2, 3, 5)
+        else:
+            # Ancien format: Midi, Repas, Soir, Repas
+            cols_per_day, offsets = 4, (0, 1, 2, 3)
+
+        column_map = []
+        for day_idx, day in enumerate(DAYS):
+            base = 1 + day_idx * cols_per_day
+            column_map.append((day, *(base + offset for offset in offsets)))
+        return column_map
+
+    def _parse_meals(self, value, row_idx: int, col_idx: int, errors: list[str]) -> int:
+        if not value or value == "-":
+            return 0
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            errors.append(f"{get_column_letter(col_idx + 1)}{row_idx}: nombre de repas invalide ({value!r})")
+            return 0
+
     def _parse_time_range(self, time_str: str) -> tuple[str, str]:
         """Parse time range string like '11:30 - 14:30' into (start, end)."""
         if not time_str or time_str == "-":
@@ -333,10 +446,160 @@ class ExcelHandler:
             return match.group(1), match.group(2)
         return "", ""
 
-    def update_planning_in_excel(self, path: Path, planning: WeekPlanning) -> Path:
-        wb = self.create_planning_workbook(planning)
-        self.save_workbook(wb, path)
-        return path
+    def update_planning_in_excel(
+        self,
+        path: Path,
+        planning: WeekPlanning,
+        previous: Optional[WeekPlanning] = None,
+    ) -> Path:
+        """Enregistre `planning` dans le fichier existant.
+
+        Avec le planning `previous` correspondant au contenu actuel du fichier,
+        seules les cellules qui changent sont réécrites et la mise en forme
+        ajoutée par l'utilisateur est conservée:
+        - mêmes employés et même semaine: les cellules sont modifiées directement
+          dans le XML de la feuille, sans charger le classeur;
+        - sinon le classeur est chargé, les lignes ajoutées ou retirées.
+        Sans `previous`, ou si le fichier n'a pas la disposition de
+        write_planning_file, il est reconstruit.
+        """
+        if previous is not None and path.exists():
+            changes = self._changed_cells(previous, planning)
+            if changes is not None and self._patch_sheet_xml(path, changes):
+                return path
+
+            wb = load_workbook(path)
+            if self._is_planning_sheet(wb.active):
+                self._apply_planning_diff(wb.active, previous, planning)
+                self.save_workbook(wb, path)
+                return path
+
+        return self.write_planning_file([planning], path)
+
+    def _changed_cells(self, previous: WeekPlanning, planning: WeekPlanning, start_row: int = 5) -> Optional[dict]:
+        """Cellules ("K12" -> valeur) qui diffèrent entre les deux plannings, ou None
+        si la semaine ou les lignes changent (titre, lignes ajoutées/retirées)."""
+        if (previous.week_number, previous.year) != (planning.week_number, planning.year):
+            return None
+        if len(previous.employees) != len(planning.employees):
+            return None
+
+        changes = {}
+        for index, (old, new) in enumerate(zip(previous.employees, planning.employees)):
+            row_idx = start_row + index
+            old_values = self._employee_row_values(old, row_idx)
+            for col, value in enumerate(self._employee_row_values(new, row_idx), start=1):
+                if value != old_values[col - 1]:
+                    changes[f"{get_column_letter(col)}{row_idx}"] = value
+        return changes
+
+    def _patch_sheet_xml(self, path: Path, changes: dict) -> bool:
+        """Remplace les cellules `changes` dans le XML de l'unique feuille du fichier.
+
+        Les autres parties de l'archive sont recopiées telles quelles. Retourne
+        False (fichier inchangé) si la feuille n'a pas la disposition attendue
+        ou si une cellule à modifier n'y figure pas.
+        """
+        with zipfile.ZipFile(path) as archive:
+            sheets = [name for name in archive.namelist() if SHEET_XML_PATTERN.match(name)]
+            if len(sheets) != 1:
+                return False
+            sheet_name = sheets[0]
+            xml = archive.read(sheet_name).decode("utf-8")
+            shared_strings = self._read_shared_strings(archive)
+
+            cells = {match.group(1): match for match in CELL_XML_PATTERN.finditer(xml)}
+            if (
+                self._xml_cell_text(cells.get("A3"), shared_strings) != "Employé"
+                or self._xml_cell_text(cells.get("C4"), shared_strings) != "H"
+                or any(coordinate not in cells for coordinate in changes)
+            ):
+                return False
+
+            # Les totaux de la ligne sont recalculés par Excel: retirer leur valeur en cache
+            total_columns = (get_column_letter(44), get_column_letter(45))
+            stale_totals = {
+                f"{column}{re.sub('[A-Z]', '', coordinate)}" for coordinate in changes for column in total_columns
+            }
+
+            def replace(match) -> str:
+                coordinate = match.group(1)
+                if coordinate in changes:
+                    return self._xml_cell(coordinate, match.group(2), changes[coordinate])
+                if coordinate in stale_totals:
+                    return re.sub(r"<v>.*?</v>", "", match.group(0))
+                return match.group(0)
+
+            patched = CELL_XML_PATTERN.sub(replace, xml).encode("utf-8")
+
+            partial_path = path.with_name(f".{path.name}.part")
+            with zipfile.ZipFile(partial_path, "w") as output:
+                for item in archive.infolist():
+                    output.writestr(item, patched if item.filename == sheet_name else archive.read(item))
+
+        os.replace(partial_path, path)
+        return True
+
+    def _read_shared_strings(self, archive: zipfile.ZipFile) -> list[str]:
+        try:
+            root = ElementTree.fromstring(archive.read("xl/sharedStrings.xml"))
+        except KeyError:
+            # openpyxl écrit les chaînes dans les cellules (inlineStr)
+            return []
+        return ["".join(node.text or "" for node in item.iter(f"{{{SPREADSHEET_NS}}}t")) for item in root]
+
+    def _xml_cell_text(self, match, shared_strings: list[str]) -> Optional[str]:
+        if match is None:
+            return None
+        attributes, content = match.group(2), match.group(3) or ""
+        texts = re.findall(r"<(?:\w+:)?t(?:\s[^>]*)?>(.*?)</(?:\w+:)?t>", content, re.S)
+        if 't="s"' in attributes:
+            value = re.search(r"<v>(\d+)</v>", content)
+            if value is None or int(value.group(1)) >= len(shared_strings):
+                return None
+            return shared_strings[int(value.group(1))]
+        return unescape("".join(texts)) if texts else None
+
+    def _xml_cell(self, coordinate: str, attributes: str, value) -> str:
+        # Le style de la cellule (attribut s) est conservé, son type est redéfini
+        attributes = re.sub(r'\s+t="[^"]*"', "", attributes)
+        if isinstance(value, str) and value.startswith("="):
+            return f'<c r="{coordinate}"{attributes}><f>{escape(value[1:])}</f></c>'
+        if isinstance(value, str):
+            return f'<c r="{coordinate}"{attributes} t="inlineStr"><is><t>{escape(value)}</t></is></c>'
+        return f'<c r="{coordinate}"{attributes} t="n"><v>{value}</v></c>'
+
+    def _is_planning_sheet(self, ws) -> bool:
+        title = ws.cell(row=1, column=1).value
+        return (
+            bool(title)
+            and str(title).startswith("Planning des employés")
+            and ws.cell(row=3, column=1).value == "Employé"
+            and ws.cell(row=4, column=3).value == "H"
+        )
+
+    def _apply_planning_diff(self, ws, previous: WeekPlanning, planning: WeekPlanning, start_row: int = 5):
+        if (previous.week_number, previous.year) != (planning.week_number, planning.year):
+            start_date, end_date = get_week_dates(planning.week_number, planning.year)
+            ws.title = f"Semaine {planning.week_number}"
+            ws.cell(row=1, column=1).value = (
+                f"Planning des employés WOK10 - Semaine {planning.week_number} du {start_date} au {end_date}"
+            )
+
+        for index, employee in enumerate(planning.employees):
+            row_idx = start_row + index
+            if index >= len(previous.employees):
+                # Nouvelle ligne: même mise en forme que lors de la création
+                self._write_employee_row(ws, row_idx, employee)
+                continue
+            old_values = self._employee_row_values(previous.employees[index], row_idx)
+            for col, value in enumerate(self._employee_row_values(employee, row_idx), start=1):
+                if value != old_values[col - 1]:
+                    ws.cell(row=row_idx, column=col).value = value
+
+        removed = len(previous.employees) - len(planning.employees)
+        if removed > 0:
+            ws.delete_rows(start_row + len(planning.employees), removed)
 
 
 excel_handler = ExcelHandler()
@@ -0,0 +1,74 @@
+"""Lecture incrémentale d'un planning JSON reçu par fragments.
+
+Le modèle renvoie un objet {"week_number": ..., "year": ..., "employees": [...]}.
+EmployeeStreamParser reçoit le texte au fil du flux et renvoie chaque objet du
+tableau "employees" dès que son accolade fermante arrive, sans attendre la fin
+de la réponse:
+
+    parser = EmployeeStreamParser()
+    for fragment in flux:
+        for employee in parser.feed(fragment):
+            ...  # dict d'un employé complet
+
+Seule la structure (chaînes, échappements, profondeur) est suivie; le contenu
+de chaque objet est ensuite décodé par json.loads.
+"""
+import json
+
+
+class EmployeeStreamParser:
+    def __init__(self, array_key: str = "employees"):
+        self.array_key = array_key
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = -1
+        self._last_key = None  # dernière chaîne lue au premier niveau de l'objet racine
+        self._in_array = False
+        self._item_start = -1
+
+    def feed(self, fragment: str) -> list[dict]:
+        """Ajoute un fragment et retourne les objets complétés par celui-ci."""
+        self._buffer += fragment
+        items = []
+        buffer = self._buffer
+
+        for pos in range(self._pos, len(buffer)):
+            char = buffer[pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = buffer[self._string_start + 1:pos]
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = pos
+            elif char in "{[":
+                if self._depth == 1 and char == "[" and self._last_key == self.array_key:
+                    self._in_array = True
+                elif self._in_array and self._depth == 2 and char == "{":
+                    self._item_start = pos
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._in_array and self._depth == 2 and char == "}" and self._item_start >= 0:
+                    items.append(json.loads(buffer[self._item_start:pos + 1]))
+                    self._item_start = -1
+                elif self._in_array and self._depth == 1:
+                    self._in_array = False
+
+        self._pos = len(buffer)
+        return items
+
+    @property
+    def text(self) -> str:
+        """Texte complet reçu jusqu'ici."""
+        return self._buffer
@@ -0,0 +1,125 @@
+"""Lecture sans IA des PDF au format de l'export de l'application (PDFGenerator).
+
+Chaque page contient un titre "Planning des employés ... - Semaine N du JJ/MM/AAAA
+au JJ/MM/AAAA" et deux tableaux (Lundi–Jeudi, Vendredi–Dimanche + totaux) dont
+les deux lignes d'en-tête sont:
+
+    Employé | Lundi |       |      |       | Mardi | ...
+            | Midi  | Repas | Soir | Repas | Midi  | ...
+
+Tant que tous les tableaux du document suivent ce format, le planning est
+reconstruit directement depuis les cellules; sinon parse() retourne None et
+l'import passe par le modèle.
+"""
+import re
+from typing import Optional
+
+from app.models.schemas import WeekPlanning, EmployeeWeekSchedule, DaySchedule, ShiftData
+
+
+DAY_LABELS = {
+    "lundi": "monday",
+    "mardi": "tuesday",
+    "mercredi": "wednesday",
+    "jeudi": "thursday",
+    "vendredi": "friday",
+    "samedi": "saturday",
+    "dimanche": "sunday",
+}
+SERVICE_HEADERS = ["midi", "repas", "soir", "repas"]
+
+TITLE_PATTERN = re.compile(r"Semaine\s+(\d{1,2})\s+du\s+\d{2}/\d{2}/(\d{4})\s+au\s+\d{2}/\d{2}/(\d{4})")
+TIME_RANGE_PATTERN = re.compile(r"^(\d{1,2}:\d{2})\s*-\s*(\d{1,2}:\d{2})$")
+EMPTY_CELLS = {"", "-"}
+
+
+def _cell(value) -> str:
+    # Les cellules fusionnées valent None; un nom long peut être coupé sur deux lignes
+    return " ".join((value or "").split())
+
+
+class PlanningTableParser:
+    def parse(self, pages: list[dict]) -> Optional[WeekPlanning]:
+        """Planning reconstruit à partir des pages de PDFParser.extract_pages, ou None
+        si un tableau ne suit pas le format connu."""
+        employees: dict[str, EmployeeWeekSchedule] = {}
+        week = None
+
+        for page in pages:
+            if week is None:
+                week = self._parse_title(page["text"])
+            for table in page["tables"]:
+                columns = self._day_columns(table)
+                if columns is None:
+                    return None
+                for row in table[2:]:
+                    if not self._parse_row(row, columns, employees):
+                        return None
+
+        if not employees or week is None:
+            return None
+
+        week_number, year = week
+        return WeekPlanning(week_number=week_number, year=year, employees=list(employees.values()))
+
+    def _parse_title(self, text: str) -> Optional[tuple[int, int]]:
+        match = TITLE_PATTERN.search(text or "")
+        if not match:
+            return None
+        week_number = int(match.group(1))
+        # La semaine 1 peut commencer en décembre, les dernières finir en janvier
+        year = int(match.group(2)) if week_number >= 52 else int(match.group(3))
+        return week_number, year
+
+    def _day_columns(self, table: list[list]) -> Optional[dict[str, int]]:
+        """Jour -> index de sa colonne "Midi", si les deux lignes d'en-tête sont reconnues."""
+        if len(table) < 2:
+            return None
+        header, sub_header = [_cell(v).lower() for v in table[0]], [_cell(v).lower() for v in table[1]]
+        if not header or header[0] != "employé":
+            return None
+
+        columns = {}
+        for index, label in enumerate(header):
+            day = DAY_LABELS.get(label)
+            if day is None:
+                continue
+            if sub_header[index:index + 4] != SERVICE_HEADERS:
+                return None
+            columns[day] = index
+        return columns or None
+
+    def _parse_row(self, row: list, columns: dict[str, int], employees: dict[str, EmployeeWeekSchedule]) -> bool:
+        name = _cell(row[0])
+        if not name or len(row) < max(columns.values()) + 4:
+            return False
+        employee = employees.setdefault(name, EmployeeWeekSchedule(name=name))
+
+        for day, index in columns.items():
+            afternoon = self._parse_shift(row[index], row[index + 1])
+            evening = self._parse_shift(row[index + 2], row[index + 3])
+            if afternoon is None or evening is None:
+                return False
+            setattr(employee, day, DaySchedule(afternoon=afternoon, evening=evening))
+        return True
+
+    def _parse_shift(self, time_cell, meals_cell) -> Optional[ShiftData]:
+        time_value, meals_value = _cell(time_cell), _cell(meals_cell)
+        if time_value in EMPTY_CELLS:
+            start_time = end_time = ""
+        else:
+            match = TIME_RANGE_PATTERN.match(time_value)
+            if not match:
+                return None
+            start_time, end_time = match.groups()
+
+        if meals_value in EMPTY_CELLS:
+            meals = 0
+        elif meals_value.isdigit():
+            meals = int(meals_value)
+        else:
+            return None
+        return ShiftData(start_time=start_time, end_time=end_time, meals=meals)
+
+
+pdf_layout_parser = PlanningTableParser()
@@ -1,34 +1,70 @@
 from pathlib import Path
+from typing import Iterator, Optional
+
 import pdfplumber
 
+from app.core.config import settings
+from app.services.process_pool import get_process_pool, process_pool_size
+
+
+def _extract_page_range(pdf_path: Path, start: int, stop: int) -> list[dict]:
+    # Fonction de module: exécutée dans un processus du pool, elle rouvre le fichier
+    return list(PDFParser().iter_pages(pdf_path, start, stop))
+
 
 class PDFParser:
-    def extract_text(self, pdf_path: Path) -> str:
-        text_content = []
+    def iter_pages(
+        self,
+        pdf_path: Path,
+        start: int = 0,
+        stop: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """Texte et tableaux page par page, en une seule ouverture du fichier.
 
+        Produit {"page": n, "text": str, "tables": [...]} pour les pages
+        d'index [start, stop) (numérotées à partir de 1 dans "page").
+        """
         with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_content.append(page_text)
+            for index in range(start, len(pdf.pages) if stop is None else min(stop, len(pdf.pages))):
+                page = pdf.pages[index]
+                yield {
+                    "page": index + 1,
+                    "text": page.extract_text() or "",
+                    "tables": page.extract_tables() or [],
+                }
+                # Libère les objets de la page: la mémoire reste stable sur les gros documents
+                page.close()
 
-        return "\n\n".join(text_content)
+    def extract_text(self, pdf_path: Path) -> str:
+        return "\n\n".join(page["text"] for page in self.iter_pages(pdf_path) if page["text"])
 
     def extract_tables(self, pdf_path: Path) -> list[list[list[str]]]:
-        tables = []
+        return [table for page in self.iter_pages(pdf_path) for table in page["tables"]]
 
+    def extract_pages(self, pdf_path: Path) -> list[dict]:
+        """Texte et tableaux page par page: [{"page": n, "text": str, "tables": [...]}].
+
+        À partir de `settings.pdf_parallel_min_pages` pages, les pages sont
+        réparties sur le pool de processus partagé, une plage contiguë par
+        processus (extraction limitée par le CPU, pas d'intérêt à utiliser des threads).
+        """
+        chunks = process_pool_size()
         with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_tables = page.extract_tables()
-                if page_tables:
-                    tables.extend(page_tables)
+            page_count = len(pdf.pages)
+
+        if chunks <= 1 or page_count < settings.pdf_parallel_min_pages:
+            return list(self.iter_pages(pdf_path))
 
-        return tables
+        chunks = min(chunks, page_count)
+        bounds = [page_count * i // chunks for i in range(chunks + 1)]
+        ranges = get_process_pool().map(_extract_page_range, [pdf_path] * chunks, bounds[:-1], bounds[1:])
+        return [page for page_range in ranges for page in page_range]
 
     def extract_all(self, pdf_path: Path) -> dict:
+        pages = self.extract_pages(pdf_path)
         return {
-            "text": self.extract_text(pdf_path),
-            "tables": self.extract_tables(pdf_path),
+            "text": "\n\n".join(page["text"] for page in pages if page["text"]),
+            "tables": [table for page in pages for table in page["tables"]],
         }
 
 
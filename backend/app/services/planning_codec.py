@@ -0,0 +1,157 @@
+"""Encodage compact d'un WeekPlanning pour les prompts du modèle.
+
+Le JSON pydantic répète les clés ("afternoon", "start_time", "meals"...) pour
+chaque employé et chaque jour. Ici chaque employé tient sur une ligne, avec
+14 colonnes fixes (midi/soir pour chaque jour):
+
+    # Planning semaine 5/2025 ...
+    DUPONT Jean|10:30-15:00|17:30-23:00|-|-|...
+
+Un service vaut "-" s'il n'est pas travaillé, "HH:MM-HH:MM" s'il est
+travaillé avec 1 repas, suivi de "/N" quand le nombre de repas diffère de
+la valeur implicite (1 si travaillé, 0 sinon). Dans le nom, "\\", "|" et les
+retours à la ligne sont échappés ("\\\\", "\\|", "\\n", "\\r").
+decode_planning(encode_planning(p)) == p pour tout planning aux heures "HH:MM".
+"""
+import re
+
+from app.models.schemas import WeekPlanning, EmployeeWeekSchedule, DaySchedule, ShiftData
+
+
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+DAY_SHORT_FR = ["lun", "mar", "mer", "jeu", "ven", "sam", "dim"]
+
+HEADER_PATTERN = re.compile(r"^# Planning semaine (\d+)/(\d+)")
+# Un champ: caractères ordinaires ou paires "\x" échappées, jusqu'au "|" suivant
+FIELD_PATTERN = re.compile(r"((?:\\.|[^|\\])*)(\|?)")
+ESCAPES = {"\\": "\\\\", "|": "\\|", "\n": "\\n", "\r": "\\r"}
+UNESCAPES = {"n": "\n", "r": "\r"}
+
+
+def _columns_legend() -> str:
+    return "|".join(["NOM"] + [f"{d} {s}" for d in DAY_SHORT_FR for s in ("midi", "soir")])
+
+
+def _escape_name(name: str) -> str:
+    escaped = "".join(ESCAPES.get(char, char) for char in name)
+    # Une ligne commençant par "#" serait lue comme un commentaire
+    if escaped.startswith("#"):
+        escaped = "\\" + escaped
+    return escaped
+
+
+def _unescape_name(name: str) -> str:
+    return re.sub(r"\\(.)", lambda m: UNESCAPES.get(m.group(1), m.group(1)), name)
+
+
+def _split_fields(line: str) -> list[str]:
+    """Champs d'une ligne, séparés par les "|" non échappés ("\\\\|" sépare bien)."""
+    fields = []
+    pos = 0
+    while True:
+        match = FIELD_PATTERN.match(line, pos)
+        fields.append(match.group(1))
+        if not match.group(2):
+            # Fin de ligne; un "\\" final isolé est conservé tel quel
+            fields[-1] += line[match.end():]
+            return fields
+        pos = match.end()
+
+
+def _encode_shift(shift: ShiftData) -> str:
+    worked = bool(shift.start_time or shift.end_time)
+    text = f"{shift.start_time}-{shift.end_time}" if worked else "-"
+    default_meals = 1 if worked else 0
+    if shift.meals != default_meals:
+        text += f"/{shift.meals}"
+    return text
+
+
+def _decode_shift(text: str) -> ShiftData:
+    text = text.strip()
+    meals = None
+    if "/" in text:
+        text, meals_str = text.rsplit("/", 1)
+        meals = int(meals_str)
+
+    if text == "-":
+        return ShiftData(meals=meals if meals is not None else 0)
+
+    start_time, end_time = text.split("-", 1)
+    return ShiftData(
+        start_time=start_time.strip(),
+        end_time=end_time.strip(),
+        meals=meals if meals is not None else 1,
+    )
+
+
+def encode_planning(planning: WeekPlanning) -> str:
+    lines = [
+        f"# Planning semaine {planning.week_number}/{planning.year}. Une ligne par employé.",
+        "# Service: '-' = non travaillé, 'HH:MM-HH:MM' = travaillé avec 1 repas, '/N' = N repas si différent.",
+        f"# {_columns_legend()}",
+    ]
+    for employee in planning.employees:
+        fields = [_escape_name(employee.name)]
+        for day in DAYS:
+            day_schedule: DaySchedule = getattr(employee, day)
+            fields.append(_encode_shift(day_schedule.afternoon))
+            fields.append(_encode_shift(day_schedule.evening))
+        lines.append("|".join(fields))
+    return "\n".join(lines)
+
+
+def decode_planning(text: str) -> WeekPlanning:
+    week_number, year = 1, 2024
+    employees = []
+
+    # Pas splitlines(): les autres sauts de ligne Unicode restent dans les noms
+    for line in text.split("\n"):
+        if not line.strip():
+            continue
+        if line.startswith("#"):
+            match = HEADER_PATTERN.match(line)
+            if match:
+                week_number, year = int(match.group(1)), int(match.group(2))
+            continue
+
+        fields = _split_fields(line)
+        if len(fields) != 1 + 2 * len(DAYS):
+            raise ValueError(f"Ligne de planning invalide ({len(fields)} colonnes): {line}")
+
+        employee = EmployeeWeekSchedule(name=_unescape_name(fields[0]))
+        for day_idx, day in enumerate(DAYS):
+            setattr(
+                employee,
+                day,
+                DaySchedule(
+                    afternoon=_decode_shift(fields[1 + 2 * day_idx]),
+                    evening=_decode_shift(fields[2 + 2 * day_idx]),
+                ),
+            )
+        employees.append(employee)
+
+    return WeekPlanning(week_number=week_number, year=year, employees=employees)
+
+
+def estimate_tokens(text: str) -> int:
+    """Nombre de tokens du texte (tiktoken si disponible, sinon ~4 caractères par token)."""
+    try:
+        import tiktoken
+    except ImportError:
+        return max(1, len(text) // 4)
+    return len(tiktoken.get_encoding("o200k_base").encode(text))
+
+
+def token_report(planning: WeekPlanning) -> dict:
+    """Compare la taille en tokens des différents encodages d'un planning."""
+    encodings = {
+        "json_indent": planning.model_dump_json(indent=2),
+        "json": planning.model_dump_json(),
+        "compact": encode_planning(planning),
+    }
+    report = {name: estimate_tokens(text) for name, text in encodings.items()}
+    report["employees"] = len(planning.employees)
+    report["round_trip_ok"] = decode_planning(encodings["compact"]) == planning
+    report["reduction_vs_json_indent"] = 1 - report["compact"] / report["json_indent"]
+    return report
@@ -0,0 +1,104 @@
+import re
+
+from app.models.schemas import (
+    WeekPlanning,
+    EmployeeWeekSchedule,
+    ShiftData,
+    PlanningEdit,
+    PlanningEditAction,
+)
+
+
+TIME_PATTERN = re.compile(r"^([01]?\d|2[0-3]):[0-5]\d$")
+
+
+class PlanningPatchError(ValueError):
+    """Une édition ne peut pas être appliquée au planning courant."""
+
+
+def find_employee_index(planning: WeekPlanning, name: str) -> int:
+    """Retrouve un employé par nom (insensible à la casse).
+
+    Un nom partiel est accepté s'il désigne un seul employé, mot entier par mot
+    entier: "Dupont" retrouve "DUPONT Jean", mais "Lea" ne retrouve pas "CHARLEAU Marc".
+    """
+    target = " ".join(name.split()).casefold()
+    names = [" ".join(emp.name.split()).casefold() for emp in planning.employees]
+
+    if target in names:
+        return names.index(target)
+
+    matches = [i for i, n in enumerate(names) if set(target.split()) <= set(n.split())]
+    if len(matches) == 1:
+        return matches[0]
+    if not matches:
+        raise PlanningPatchError(f"Employé inconnu: {name}")
+    raise PlanningPatchError(f"Nom ambigu: {name}")
+
+
+def _normalize_time(value: str) -> str:
+    value = value.strip()
+    if not TIME_PATTERN.match(value):
+        raise PlanningPatchError(f"Heure invalide: {value}")
+    hours, minutes = value.split(":")
+    return f"{int(hours):02d}:{minutes}"
+
+
+def apply_planning_edits(planning: WeekPlanning, edits: list[PlanningEdit]) -> WeekPlanning:
+    """Applique une liste d'éditions sur une copie du planning.
+
+    Toutes les éditions sont validées: la première invalide lève
+    PlanningPatchError et le planning d'origine reste inchangé.
+    """
+    result = planning.model_copy(deep=True)
+
+    for edit in edits:
+        if edit.action == PlanningEditAction.ADD_EMPLOYEE:
+            if any(emp.name.casefold() == edit.employee.casefold() for emp in result.employees):
+                raise PlanningPatchError(f"Employé déjà présent: {edit.employee}")
+            result.employees.append(EmployeeWeekSchedule(name=edit.employee))
+            continue
+
+        index = find_employee_index(result, edit.employee)
+        employee = result.employees[index]
+
+        if edit.action == PlanningEditAction.REMOVE_EMPLOYEE:
+            del result.employees[index]
+            continue
+
+        if edit.action == PlanningEditAction.RENAME_EMPLOYEE:
+            if not edit.new_name:
+                raise PlanningPatchError("new_name manquant pour rename_employee")
+            employee.name = edit.new_name
+            continue
+
+        if edit.day is None or edit.service is None:
+            raise PlanningPatchError(f"day et service sont requis pour {edit.action.value}")
+        day_schedule = getattr(employee, edit.day.value)
+
+        if edit.action == PlanningEditAction.CLEAR_SHIFT:
+            setattr(day_schedule, edit.service.value, ShiftData())
+            continue
+
+        # SET_SHIFT: les champs absents conservent leur valeur actuelle
+        current: ShiftData = getattr(day_schedule, edit.service.value)
+        start_time = _normalize_time(edit.start_time) if edit.start_time else current.start_time
+        end_time = _normalize_time(edit.end_time) if edit.end_time else current.end_time
+        if not start_time or not end_time:
+            raise PlanningPatchError(
+                f"Horaires incomplets pour {employee.name} {edit.day.value} {edit.service.value}"
+            )
+        if edit.meals is not None:
+            meals = edit.meals
+        else:
+            meals = current.meals or 1
+        if meals < 0:
+            raise PlanningPatchError(f"Nombre de repas invalide: {meals}")
+
+        setattr(
+            day_schedule,
+            edit.service.value,
+            ShiftData(start_time=start_time, end_time=end_time, meals=meals),
+        )
+
+    return result
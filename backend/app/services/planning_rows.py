@@ -0,0 +1,90 @@
+"""Exports à plat des plannings pour les traitements automatiques (paie...).
+
+Une ligne par employé, jour et service, heures déjà calculées:
+
+    year,week_number,date,day,employee,service,start_time,end_time,hours,meals
+    2025,5,2025-01-27,monday,DUPONT Jean,afternoon,10:30,15:00,4.5,1
+
+Trois formats, produits au fil de l'eau sans construire de classeur:
+- CSV (iter_csv) et NDJSON (iter_ndjson), par paquets de lignes;
+- JSON en colonnes (iter_columnar), {"columns": [...], "data": {colonne: [valeurs]}},
+  qui se charge directement en DataFrame ou en table Arrow/Parquet.
+Les services non travaillés sont omis, sauf avec include_empty=True.
+"""
+import csv
+from datetime import timedelta
+import io
+import json
+from typing import Iterable, Iterator
+
+from app.models.schemas import WeekPlanning
+from app.services.excel_handler import get_week_monday
+
+
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+SERVICES = ["afternoon", "evening"]
+COLUMNS = ["year", "week_number", "date", "day", "employee", "service", "start_time", "end_time", "hours", "meals"]
+
+# Lignes regroupées par fragment envoyé
+BATCH_ROWS = 500
+
+
+def iter_shift_rows(plannings: Iterable[WeekPlanning], include_empty: bool = False) -> Iterator[tuple]:
+    """Lignes (dans l'ordre de COLUMNS) de chaque planning, semaine par semaine."""
+    for planning in plannings:
+        # Mêmes dates que les titres Excel et PDF, y compris pour une semaine 53 hors calendrier ISO
+        monday = get_week_monday(planning.week_number, planning.year)
+        dates = [(monday + timedelta(days=day_idx)).date().isoformat() for day_idx in range(len(DAYS))]
+        for employee in planning.employees:
+            for day, day_date in zip(DAYS, dates):
+                day_schedule = getattr(employee, day)
+                for service in SERVICES:
+                    shift = getattr(day_schedule, service)
+                    if not include_empty and not shift.start_time and not shift.meals:
+                        continue
+                    yield (
+                        planning.year,
+                        planning.week_number,
+                        day_date,
+                        day,
+                        employee.name,
+                        service,
+                        shift.start_time,
+                        shift.end_time,
+                        round(shift.hours, 2),
+                        shift.meals,
+                    )
+
+
+def iter_csv(rows: Iterable[tuple]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(COLUMNS)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % BATCH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_ndjson(rows: Iterable[tuple]) -> Iterator[str]:
+    batch = []
+    for row in rows:
+        batch.append(json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False))
+        if len(batch) == BATCH_ROWS:
+            yield "\n".join(batch) + "\n"
+            batch = []
+    if batch:
+        yield "\n".join(batch) + "\n"
+
+
+def iter_columnar(rows: Iterable[tuple]) -> Iterator[str]:
+    # Les colonnes ne peuvent être écrites qu'une fois toutes les lignes lues
+    columns = [list(values) for values in zip(*rows)] or [[] for _ in COLUMNS]
+    yield f'{{"columns": {json.dumps(COLUMNS)}, "rows": {len(columns[0])}, "data": {{'
+    for index, (name, values) in enumerate(zip(COLUMNS, columns)):
+        separator = ", " if index else ""
+        yield f"{separator}{json.dumps(name)}: {json.dumps(values, ensure_ascii=False)}"
+    yield "}}\n"
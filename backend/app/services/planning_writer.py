@@ -0,0 +1,141 @@
+"""Enregistrement différé (write-behind) du fichier Excel du planning.
+
+Les routes mettent à jour le planning en mémoire puis appellent schedule():
+l'écriture du fichier se fait en tâche de fond, après `debounce_seconds` sans
+nouvelle modification du même fichier. Une rafale de modifications depuis le
+tableau ne coûte donc qu'une écriture, qui réécrit les cellules modifiées
+entre le contenu du fichier et le dernier planning (update_planning_in_excel).
+
+    planning_writer.schedule(path, planning, previous)  # retourne immédiatement
+    await planning_writer.flush()                      # fichiers à jour sur disque
+
+`max_delay_seconds` borne l'attente quand les modifications ne s'arrêtent pas.
+Les écritures d'un même fichier sont faites l'une après l'autre, hors de la
+boucle d'événements; flush() est appelé à l'arrêt de l'application.
+"""
+import asyncio
+from pathlib import Path
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.models.schemas import WeekPlanning
+from app.services.excel_handler import excel_handler
+
+
+class PlanningWriter:
+    def __init__(self, debounce_seconds: float = 0.5, max_delay_seconds: float = 5.0):
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        # Fichier -> {"base": planning contenu dans le fichier, "planning": dernier planning}
+        self._pending: dict[Path, dict] = {}
+        self._changed: dict[Path, asyncio.Event] = {}
+        self._flush_now: dict[Path, asyncio.Event] = {}
+        self._tasks: dict[Path, asyncio.Task] = {}
+        self._errors: dict[Path, Exception] = {}
+        self.scheduled = 0
+        self.writes = 0
+        self.failures = 0
+        # Modifications fusionnées dans une écriture déjà en attente (écritures évitées)
+        self.coalesced = 0
+
+    def schedule(self, path: Path, planning: WeekPlanning, previous: Optional[WeekPlanning] = None):
+        """Programme l'enregistrement de `planning` dans `path`.
+
+        `previous` est le planning que le fichier contiendra avant cette
+        modification (None: fichier à créer). Si une écriture est déjà en
+        attente, seul le dernier planning est conservé.
+        """
+        self.scheduled += 1
+        pending = self._pending.get(path)
+        if pending is None:
+            # Après un échec, le contenu du fichier n'est plus connu: il sera reconstruit
+            base = None if path in self._errors else previous
+            self._pending[path] = {"base": base, "planning": planning}
+        else:
+            pending["planning"] = planning
+            self.coalesced += 1
+
+        if path in self._tasks:
+            self._changed[path].set()
+        else:
+            self._changed[path] = asyncio.Event()
+            self._flush_now[path] = asyncio.Event()
+            self._tasks[path] = asyncio.get_running_loop().create_task(self._run(path))
+
+    async def flush(self, path: Optional[Path] = None):
+        """Écrit sans attendre les modifications en attente (de `path`, ou de tous
+        les fichiers) et retourne une fois ces fichiers enregistrés.
+
+        Lève la dernière erreur d'écriture de ces fichiers, s'il y en a eu une.
+        """
+        paths = [path] if path is not None else list(self._tasks)
+        tasks = []
+        for item in paths:
+            if item in self._tasks:
+                self._flush_now[item].set()
+                tasks.append(self._tasks[item])
+        await asyncio.gather(*tasks)
+
+        for item in paths if path is not None else list(self._errors):
+            error = self._errors.pop(item, None)
+            if error is not None:
+                raise error
+
+    def stats(self) -> dict:
+        return {
+            "scheduled": self.scheduled,
+            "writes": self.writes,
+            "coalesced": self.coalesced,
+            "pending": len(self._pending),
+            "errors": len(self._errors),
+        }
+
+    async def _run(self, path: Path):
+        loop = asyncio.get_running_loop()
+        try:
+            while path in self._pending:
+                await self._debounce(path, loop.time() + self.max_delay_seconds)
+                pending = self._pending.pop(path)
+                # Un flush() demandé pendant cette écriture vaudra pour la suivante; sinon délai normal
+                self._flush_now[path].clear()
+                try:
+                    await run_in_threadpool(
+                        excel_handler.update_planning_in_excel, path, pending["planning"], pending["base"]
+                    )
+                    self.writes += 1
+                    self._errors.pop(path, None)
+                except Exception as e:
+                    # Conservée pour flush(); la prochaine écriture repart du fichier reconstruit
+                    self.failures += 1
+                    self._errors[path] = e
+                    next_pending = self._pending.get(path)
+                    if next_pending is not None:
+                        next_pending["base"] = None
+        finally:
+            del self._tasks[path]
+            del self._changed[path]
+            del self._flush_now[path]
+
+    async def _debounce(self, path: Path, deadline: float):
+        """Attend `debounce_seconds` sans modification, au plus jusqu'à `deadline`."""
+        loop = asyncio.get_running_loop()
+        changed, flush_now = self._changed[path], self._flush_now[path]
+        while not flush_now.is_set():
+            timeout = min(self.debounce_seconds, deadline - loop.time())
+            if timeout <= 0:
+                return
+            changed.clear()
+            waiters = [asyncio.ensure_future(changed.wait()), asyncio.ensure_future(flush_now.wait())]
+            done, _ = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for waiter in waiters:
+                waiter.cancel()
+            if not done:
+                return
+
+
+planning_writer = PlanningWriter(
+    debounce_seconds=settings.planning_save_debounce_seconds,
+    max_delay_seconds=settings.planning_save_max_delay_seconds,
+)
@@ -0,0 +1,46 @@
+"""Pool de processus partagé pour les traitements limités par le CPU (extraction
+PDF, lecture des onglets Excel).
+
+Créé au premier usage puis réutilisé: chaque import ne paie plus le démarrage
+des processus. Les processus sont lancés par un serveur "forkserver" (ou
+"spawn" là où il n'existe pas, sous Windows) et non par fork() du serveur web,
+qui a des threads en cours (pool de threads, boucle d'événements). Le pool est
+arrêté à la fin de l'application (lifespan).
+"""
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_all_start_methods, get_context
+import os
+import threading
+from typing import Optional
+
+from app.core.config import settings
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def process_pool_size() -> int:
+    """Nombre de processus du pool: les traitements y découpent leur travail d'autant."""
+    return settings.process_pool_workers or os.cpu_count() or 1
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _pool
+    # Appelé depuis les threads du pool de FastAPI: une seule création
+    with _lock:
+        if _pool is None:
+            start_method = "forkserver" if "forkserver" in get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(
+                max_workers=process_pool_size(),
+                mp_context=get_context(start_method),
+            )
+        return _pool
+
+
+def shutdown_process_pool():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+
+class ResponseCache:
+    """Cache des réponses du modèle, adressé par le contenu de la requête.
+
+    Deux niveaux: un LRU en mémoire et un répertoire sur disque (un fichier
+    JSON par clé) qui survit aux redémarrages. Les entrées expirent après
+    `ttl_seconds`; chaque niveau est borné en nombre d'entrées.
+
+    Les lectures et écritures sur disque se font hors de la boucle d'événements;
+    le répertoire n'est élagué que toutes les `max_disk_entries // 10` écritures.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path],
+        max_memory_entries: int = 256,
+        max_disk_entries: int = 2000,
+        ttl_seconds: int = 7 * 24 * 3600,
+    ):
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._prune_every = max(1, max_disk_entries // 10)
+        self._writes_since_prune = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, messages: list[dict], temperature: float) -> str:
+        payload = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature},
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            created_at, value = entry
+            if now - created_at <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return value
+            del self._memory[key]
+
+        entry = await run_in_threadpool(self._read_disk, key) if self.cache_dir else None
+        if entry is not None:
+            created_at, value = entry
+            if now - created_at <= self.ttl_seconds:
+                self._remember(key, created_at, value)
+                self.disk_hits += 1
+                return value
+            await run_in_threadpool(self._disk_file(key).unlink, missing_ok=True)
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str):
+        created_at = time.time()
+        self._remember(key, created_at, value)
+        if self.cache_dir:
+            await run_in_threadpool(self._write_disk, key, created_at, value)
+
+    def clear(self):
+        self._memory.clear()
+        if self.cache_dir and self.cache_dir.exists():
+            for path in self.cache_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / total if total else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def _remember(self, key: str, created_at: float, value: str):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_file(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[tuple[float, str]]:
+        if not self.cache_dir:
+            return None
+        try:
+            data = json.loads(self._disk_file(key).read_text(encoding="utf-8"))
+            return data["created_at"], data["content"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_disk(self, key: str, created_at: float, value: str):
+        if not self.cache_dir:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_file(key).write_text(
+                json.dumps({"created_at": created_at, "content": value}, ensure_ascii=False),
+                encoding="utf-8",
+            )
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= self._prune_every:
+                self._writes_since_prune = 0
+                self._prune_disk()
+        except OSError:
+            # Le cache disque est une optimisation: une erreur d'écriture n'est pas bloquante
+            pass
+
+    def _prune_disk(self):
+        files = list(self.cache_dir.glob("*.json"))
+        if len(files) <= self.max_disk_entries:
+            return
+        # Supprimer les entrées les plus anciennes
+        files.sort(key=lambda p: p.stat().st_mtime)
+        for path in files[: len(files) - self.max_disk_entries]:
+            path.unlink(missing_ok=True)
+
+
+response_cache = ResponseCache(
+    cache_dir=settings.cache_path,
+    max_memory_entries=settings.ai_cache_max_memory_entries,
+    max_disk_entries=settings.ai_cache_max_disk_entries,
+    ttl_seconds=settings.ai_cache_ttl_seconds,
+)
@@ -0,0 +1,137 @@
+from app.models.schemas import (
+    WeekPlanning,
+    EmployeeWeekSchedule,
+    ShiftData,
+    DayOfWeek,
+    ServiceType,
+    EmployeeConstraints,
+    SchedulingConstraints,
+)
+
+
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+DAY_LABELS_FR = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"]
+SERVICE_LABELS_FR = {ServiceType.AFTERNOON: "midi", ServiceType.EVENING: "soir"}
+
+
+class PlanningScheduler:
+    """Générateur de planning déterministe, sans appel au modèle.
+
+    Remplit chaque service (jour x midi/soir) avec le nombre d'employés visé,
+    en commençant par les services les plus difficiles à couvrir, et en
+    donnant la priorité aux employés les plus loin de leurs heures de contrat.
+    """
+
+    def generate(
+        self,
+        constraints: SchedulingConstraints,
+        week_number: int,
+        year: int,
+    ) -> tuple[WeekPlanning, list[str]]:
+        """Retourne le planning et la liste des avertissements (services non couverts, contrats incomplets)."""
+        employees = constraints.employees
+        slots = [(day, service) for day in DAYS for service in ServiceType]
+        targets = self._resolve_targets(constraints)
+        shifts = {slot: self._shift_for(constraints, *slot) for slot in slots}
+
+        available = {
+            slot: [i for i, emp in enumerate(employees) if self._is_available(emp, *slot)]
+            for slot in slots
+        }
+
+        hours = [0.0] * len(employees)
+        days_worked: list[set[str]] = [set() for _ in employees]
+        assigned: dict[tuple[str, ServiceType], list[int]] = {slot: [] for slot in slots}
+
+        # Services les plus contraints d'abord (peu de candidats par rapport à la cible)
+        order = sorted(
+            range(len(slots)),
+            key=lambda s: (len(available[slots[s]]) - targets[slots[s]], s),
+        )
+        for slot_idx in order:
+            slot = slots[slot_idx]
+            day, _ = slot
+            duration = shifts[slot].hours
+
+            candidates = [
+                i
+                for i in available[slot]
+                if hours[i] + duration <= employees[i].contract_hours
+                and (day in days_worked[i] or len(days_worked[i]) < employees[i].max_days)
+            ]
+            candidates.sort(key=lambda i: (-round(employees[i].contract_hours - hours[i], 2), i))
+
+            for i in candidates[: targets[slot]]:
+                assigned[slot].append(i)
+                hours[i] += duration
+                days_worked[i].add(day)
+
+        planning = self._build_planning(employees, assigned, shifts, week_number, year)
+        return planning, self._warnings(constraints, slots, targets, assigned, shifts, hours)
+
+    def _resolve_targets(self, constraints: SchedulingConstraints) -> dict[tuple[str, ServiceType], int]:
+        targets = {(day, service): constraints.default_staff for day in DAYS for service in ServiceType}
+        # Les cibles "tous les jours" d'abord, puis les cibles d'un jour précis qui les remplacent
+        for target in sorted(constraints.staffing, key=lambda t: t.day is not None):
+            days = [target.day.value] if target.day else DAYS
+            for day in days:
+                targets[(day, target.service)] = max(0, target.staff)
+        return targets
+
+    def _shift_for(self, constraints: SchedulingConstraints, day: str, service: ServiceType) -> ShiftData:
+        if service == ServiceType.AFTERNOON:
+            hours = constraints.afternoon_hours
+            return ShiftData(start_time=hours.start_time, end_time=hours.end_time, meals=1)
+
+        hours = constraints.evening_hours
+        end_time = hours.end_time
+        if day == DayOfWeek.SATURDAY.value and constraints.saturday_evening_end:
+            end_time = constraints.saturday_evening_end
+        return ShiftData(start_time=hours.start_time, end_time=end_time, meals=1)
+
+    def _is_available(self, employee: EmployeeConstraints, day: str, service: ServiceType) -> bool:
+        if any(d.value == day for d in employee.unavailable_days):
+            return False
+        return not any(
+            s.day.value == day and s.service == service for s in employee.unavailable_services
+        )
+
+    def _build_planning(
+        self,
+        employees: list[EmployeeConstraints],
+        assigned: dict[tuple[str, ServiceType], list[int]],
+        shifts: dict[tuple[str, ServiceType], ShiftData],
+        week_number: int,
+        year: int,
+    ) -> WeekPlanning:
+        schedules = [EmployeeWeekSchedule(name=emp.name) for emp in employees]
+        for (day, service), indices in assigned.items():
+            for i in indices:
+                day_schedule = getattr(schedules[i], day)
+                setattr(day_schedule, service.value, shifts[(day, service)].model_copy())
+        return WeekPlanning(week_number=week_number, year=year, employees=schedules)
+
+    def _warnings(
+        self,
+        constraints: SchedulingConstraints,
+        slots: list[tuple[str, ServiceType]],
+        targets: dict[tuple[str, ServiceType], int],
+        assigned: dict[tuple[str, ServiceType], list[int]],
+        shifts: dict[tuple[str, ServiceType], ShiftData],
+        hours: list[float],
+    ) -> list[str]:
+        warnings = []
+        for day, service in slots:
+            staffed = len(assigned[(day, service)])
+            if staffed < targets[(day, service)]:
+                label = f"{DAY_LABELS_FR[DAYS.index(day)]} {SERVICE_LABELS_FR[service]}"
+                warnings.append(f"{label}: {staffed}/{targets[(day, service)]} employés")
+
+        shortest_shift = min(shift.hours for shift in shifts.values())
+        for emp, worked in zip(constraints.employees, hours):
+            if emp.contract_hours - worked >= shortest_shift:
+                warnings.append(f"{emp.name}: {worked:.1f}h planifiées pour {emp.contract_hours:.1f}h de contrat")
+        return warnings
+
+
+planning_scheduler = PlanningScheduler()
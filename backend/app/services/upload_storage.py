@@ -0,0 +1,122 @@
+"""Stockage des fichiers importés, adressé par leur contenu.
+
+Chaque import est haché pendant sa copie sur disque et rangé sous
+data/uploads/<sha256><extension>: le même fichier importé deux fois n'occupe
+qu'une place. Le ou les WeekPlanning obtenus à partir d'un fichier sont mémorisés
+contre ce hash, ce qui rend instantané un nouvel import du même fichier.
+
+La copie se fait par blocs, les écritures hors de la boucle d'événements; elle
+s'arrête dès que le fichier dépasse la taille maximale ou que ses premiers
+octets ne correspondent pas au type attendu.
+"""
+import hashlib
+from pathlib import Path
+from typing import Optional
+import uuid
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.models.schemas import WeekPlanning
+from app.services.response_cache import ResponseCache
+
+
+CHUNK_SIZE = 1024 * 1024
+PLANNING_LIST = TypeAdapter(list[WeekPlanning])
+
+# Signatures de début de fichier: PDF, et XLSX (archive zip)
+MAGIC_BYTES = {
+    "pdf": (b"%PDF-",),
+    "xlsx": (b"PK\x03\x04",),
+}
+
+
+class UploadTooLargeError(ValueError):
+    pass
+
+
+class UploadTypeError(ValueError):
+    pass
+
+
+class UploadStorage:
+    def __init__(self, upload_dir: Path, planning_cache: ResponseCache):
+        self.upload_dir = upload_dir
+        self.planning_cache = planning_cache
+
+    async def save(
+        self,
+        upload: UploadFile,
+        suffix: str,
+        file_type: str,
+        max_bytes: Optional[int] = None,
+    ) -> tuple[Path, str]:
+        """Copie l'import par blocs en le hachant; retourne (chemin, sha256).
+
+        Lève UploadTypeError si le début du fichier ne correspond pas à
+        `file_type` ("pdf" ou "xlsx"), UploadTooLargeError au-delà de `max_bytes`.
+        """
+        max_bytes = max_bytes or settings.upload_max_bytes
+        if upload.size is not None and upload.size > max_bytes:
+            raise UploadTooLargeError(f"File exceeds the {max_bytes} bytes limit")
+
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        partial_path = self.upload_dir / f".upload_{uuid.uuid4().hex}.part"
+        digest = hashlib.sha256()
+        size = 0
+        f = await run_in_threadpool(open, partial_path, "wb")
+        try:
+            try:
+                while chunk := await upload.read(CHUNK_SIZE):
+                    if size == 0 and not chunk.startswith(MAGIC_BYTES[file_type]):
+                        raise UploadTypeError(f"File content is not a valid {file_type.upper()} file")
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise UploadTooLargeError(f"File exceeds the {max_bytes} bytes limit")
+                    digest.update(chunk)
+                    await run_in_threadpool(f.write, chunk)
+            finally:
+                await run_in_threadpool(f.close)
+            if size == 0:
+                raise UploadTypeError("File is empty")
+
+            file_path = self.upload_dir / f"{digest.hexdigest()}{suffix.lower()}"
+            if file_path.exists():
+                # Fichier déjà importé: la copie existante suffit
+                partial_path.unlink()
+            else:
+                partial_path.replace(file_path)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+        return file_path, digest.hexdigest()
+
+    async def get_planning(self, content_hash: str, variant: str) -> Optional[WeekPlanning]:
+        """Planning déjà obtenu à partir de ce fichier (`variant`: méthode d'import)."""
+        cached = await self.planning_cache.get(self._key(content_hash, variant))
+        return WeekPlanning.model_validate_json(cached) if cached is not None else None
+
+    async def set_planning(self, content_hash: str, variant: str, planning: WeekPlanning):
+        await self.planning_cache.set(self._key(content_hash, variant), planning.model_dump_json())
+
+    async def get_plannings(self, content_hash: str, variant: str) -> Optional[list[WeekPlanning]]:
+        """Plannings déjà obtenus à partir d'un fichier de plusieurs semaines."""
+        cached = await self.planning_cache.get(self._key(content_hash, variant))
+        return PLANNING_LIST.validate_json(cached) if cached is not None else None
+
+    async def set_plannings(self, content_hash: str, variant: str, plannings: list[WeekPlanning]):
+        await self.planning_cache.set(self._key(content_hash, variant), PLANNING_LIST.dump_json(plannings).decode())
+
+    def _key(self, content_hash: str, variant: str) -> str:
+        return f"{variant}_{content_hash}"
+
+
+upload_storage = UploadStorage(
+    upload_dir=settings.upload_path,
+    planning_cache=ResponseCache(
+        cache_dir=settings.cache_path / "uploads",
+        ttl_seconds=settings.ai_cache_ttl_seconds,
+    ),
+)
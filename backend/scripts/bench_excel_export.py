@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Compare l'export Excel en mémoire d'avant (create_multi_week_workbook, recopié
+ci-dessous) et l'export write-only (write_planning_file): durée et pic de mémoire Python.
+
+Usage: python scripts/bench_excel_export.py [--employees 500] [--weeks 8]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+from app.models.schemas import WeekPlanning
+from app.services.excel_handler import DAY_LABELS_FR, excel_handler
+from scripts.bench_planning_encoding import scale_planning
+
+
+def create_multi_week_workbook(plannings: list[WeekPlanning]) -> Workbook:
+    """Ancien export: classeur openpyxl complet en mémoire, mis en forme cellule par cellule."""
+    wb = Workbook()
+    wb.remove(wb.active)
+    week_numbers = [planning.week_number for planning in plannings]
+    for planning in plannings:
+        ws = wb.create_sheet()
+        fill_planning_sheet(ws, planning)
+        if week_numbers.count(planning.week_number) > 1:
+            ws.title = f"Semaine {planning.week_number} {planning.year}"
+    return wb
+
+
+def fill_planning_sheet(ws, planning: WeekPlanning):
+    h = excel_handler
+    week_num, _, start_date, end_date = h._week_info(planning)
+    ws.title = f"Semaine {week_num}"
+
+    ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=45)
+    title = f"Planning des employés WOK10 - Semaine {week_num} du {start_date} au {end_date}"
+    cell = ws.cell(row=1, column=1, value=title)
+    cell.font = h.title_font
+    cell.alignment = h.title_align
+    ws.row_dimensions[2].height = 10
+
+    headers_row1, headers_row2 = h._header_rows()
+    for col, header in enumerate(headers_row1, 1):
+        cell = ws.cell(row=3, column=col, value=header)
+        cell.font = h.header_font_white
+        cell.fill = h.header_fill
+        cell.alignment = h.center_align
+        cell.border = h.thin_border
+    for col, header in enumerate(headers_row2, 1):
+        cell = ws.cell(row=4, column=col, value=header)
+        cell.font = h.header_font
+        cell.alignment = h.center_align
+        cell.border = h.thin_border
+
+    col = 2
+    for _ in DAY_LABELS_FR:
+        ws.merge_cells(start_row=3, start_column=col, end_row=3, end_column=col + 5)
+        col += 6
+    ws.merge_cells(start_row=3, start_column=col, end_row=3, end_column=col + 1)
+    for day_idx in range(7):
+        ws.column_dimensions[get_column_letter(3 + day_idx * 6)].hidden = True
+        ws.column_dimensions[get_column_letter(6 + day_idx * 6)].hidden = True
+
+    for row_idx, employee in enumerate(planning.employees, start=5):
+        h._write_employee_row(ws, row_idx, employee)
+    h._adjust_column_widths(ws)
+
+
+def measure(func) -> tuple[float, float]:
+    """(durée en s, pic de mémoire en Mo); deux exécutions, tracemalloc ralentissant la mesure de durée."""
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--weeks", type=int, default=8)
+    args = parser.parse_args()
+
+    sample = Path(__file__).parent.parent / "data" / "templates" / "sample_planning_wok10.xlsx"
+    planning = scale_planning(excel_handler.load_planning_from_excel(sample), args.employees)
+    plannings = []
+    for week in range(args.weeks):
+        weekly = planning.model_copy(deep=True)
+        weekly.week_number = week + 1
+        plannings.append(weekly)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        in_memory = measure(
+            lambda: excel_handler.save_workbook(create_multi_week_workbook(plannings), Path(tmp) / "in_memory.xlsx")
+        )
+        write_only = measure(lambda: excel_handler.write_planning_file(plannings, Path(tmp) / "write_only.xlsx"))
+
+    print(f"{args.weeks} semaines x {args.employees} employés")
+    print(f"{'':<12} {'durée':>8} {'mémoire':>10}")
+    print(f"{'en mémoire':<12} {in_memory[0]:>6.2f} s {in_memory[1]:>7.1f} Mo")
+    print(f"{'write-only':<12} {write_only[0]:>6.2f} s {write_only[1]:>7.1f} Mo  x{in_memory[0] / write_only[0]:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Compare le chargement d'un grand planning Excel par load_planning_from_excel
+(lecture seule, ligne par ligne) et par l'implémentation précédente (classeur
+complet, lecture cellule par cellule): durée et pic de mémoire Python.
+
+Usage: python scripts/bench_excel_load.py [--employees 1500]
+"""
+
+import argparse
+from datetime import datetime
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from openpyxl import load_workbook
+
+from app.models.schemas import WeekPlanning, EmployeeWeekSchedule, DaySchedule, ShiftData
+from app.services.excel_handler import DAYS, excel_handler
+from scripts.bench_excel_export import create_multi_week_workbook
+from scripts.bench_planning_encoding import scale_planning
+
+
+def load_previous(path: Path) -> WeekPlanning:
+    """Implémentation précédente de load_planning_from_excel, recopiée telle quelle."""
+    wb = load_workbook(path)
+    ws = wb.active
+
+    # Extract week number from sheet title
+    week_number = 1
+    year = datetime.now().year
+
+    if ws.title:
+        if ws.title.startswith("Semaine "):
+            try:
+                week_number = int(ws.title.split(" ")[1])
+            except (ValueError, IndexError):
+                pass
+        elif ws.title.startswith("Week "):
+            try:
+                week_number = int(ws.title.split(" ")[1])
+            except (ValueError, IndexError):
+                pass
+
+    # Detect if there's a title row (new format starts data at row 5)
+    # Old format starts at row 3
+    first_cell = ws.cell(row=1, column=1).value
+    if first_cell and "Planning des employés" in str(first_cell):
+        data_start_row = 5
+    else:
+        data_start_row = 3
+
+    employees = []
+    row = data_start_row
+
+    # Détecter si c'est l'ancien format (4 colonnes par jour) ou le nouveau (6 colonnes par jour)
+    # En vérifiant le header de la ligne 4 ou 3+1
+    header_row = data_start_row - 1
+    # Vérifier si colonne 3 contient "H" (nouveau format) ou "Repas" (ancien format)
+    col3_header = ws.cell(row=header_row, column=3).value or ""
+    is_new_format = str(col3_header).strip() == "H"
+    cols_per_day = 6 if is_new_format else 4
+
+    while True:
+        employee_name = ws.cell(row=row, column=1).value
+        if not employee_name or str(employee_name).upper() == "TOTAL":
+            break
+
+        employee = EmployeeWeekSchedule(name=str(employee_name))
+        col = 2
+
+        for day in DAYS:
+            if is_new_format:
+                # Nouveau format: Midi, H, Repas, Soir, H, Repas
+                afternoon_time = ws.cell(row=row, column=col).value or ""
+                afternoon_start, afternoon_end = excel_handler._parse_time_range(afternoon_time)
+                # col+1 = H (heures, ignoré car calculé)
+                afternoon_meals = ws.cell(row=row, column=col + 2).value
+                afternoon_meals = int(afternoon_meals) if afternoon_meals and afternoon_meals != "-" else 0
+
+                evening_time = ws.cell(row=row, column=col + 3).value or ""
+                evening_start, evening_end = excel_handler._parse_time_range(evening_time)
+                # col+4 = H (heures, ignoré car calculé)
+                evening_meals = ws.cell(row=row, column=col + 5).value
+                evening_meals = int(evening_meals) if evening_meals and evening_meals != "-" else 0
+            else:
+                # Ancien format: Midi, Repas, Soir, Repas
+                afternoon_time = ws.cell(row=row, column=col).value or ""
+                afternoon_start, afternoon_end = excel_handler._parse_time_range(afternoon_time)
+                afternoon_meals = ws.cell(row=row, column=col + 1).value
+                afternoon_meals = int(afternoon_meals) if afternoon_meals and afternoon_meals != "-" else 0
+
+                evening_time = ws.cell(row=row, column=col + 2).value or ""
+                evening_start, evening_end = excel_handler._parse_time_range(evening_time)
+                evening_meals = ws.cell(row=row, column=col + 3).value
+                evening_meals = int(evening_meals) if evening_meals and evening_meals != "-" else 0
+
+            day_schedule = DaySchedule(
+                afternoon=ShiftData(start_time=afternoon_start, end_time=afternoon_end, meals=afternoon_meals),
+                evening=ShiftData(start_time=evening_start, end_time=evening_end, meals=evening_meals),
+            )
+            setattr(employee, day, day_schedule)
+            col += cols_per_day
+
+        employees.append(employee)
+        row += 1
+
+    return WeekPlanning(
+        week_number=week_number,
+        year=year,
+        employees=employees,
+    )
+
+
+def measure(func, runs: int = 3) -> tuple[float, float]:
+    """(durée médiane en s, pic de mémoire en Mo); le pic est mesuré à part, tracemalloc ralentissant l'exécution."""
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(durations), peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=1500)
+    args = parser.parse_args()
+
+    sample = Path(__file__).parent.parent / "data" / "templates" / "sample_planning_wok10.xlsx"
+    planning = scale_planning(excel_handler.load_planning_from_excel(sample), args.employees)
+
+    print(f"{args.employees} lignes")
+    print(f"{'':<34} {'durée':>8} {'mémoire':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {
+            "classeur openpyxl": Path(tmp) / "in_memory.xlsx",
+            "export write-only": Path(tmp) / "write_only.xlsx",
+        }
+        excel_handler.save_workbook(create_multi_week_workbook([planning]), files["classeur openpyxl"])
+        excel_handler.write_planning_file([planning], files["export write-only"])
+
+        for label, path in files.items():
+            assert excel_handler.load_planning_from_excel(path).employees == load_previous(path).employees
+            previous = measure(lambda: load_previous(path))
+            read_only = measure(lambda: excel_handler.load_planning_from_excel(path))
+            print(f"{label + ', précédent':<34} {previous[0]:>6.2f} s {previous[1]:>7.1f} Mo")
+            print(
+                f"{label + ', lecture seule':<34} {read_only[0]:>6.2f} s {read_only[1]:>7.1f} Mo"
+                f"  x{previous[0] / read_only[0]:.2f} / mémoire x{previous[1] / read_only[1]:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
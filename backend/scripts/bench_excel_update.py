@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Compare la reconstruction complète du fichier Excel et la mise à jour par cellules
+pour la modification d'un seul service sur un grand effectif.
+
+Usage: python scripts/bench_excel_update.py [--employees 1000] [--repeat 3]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from openpyxl import load_workbook
+
+from app.models.schemas import ShiftData
+from app.services.excel_handler import excel_handler
+from scripts.bench_planning_encoding import scale_planning
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sample = Path(__file__).parent.parent / "data" / "templates" / "sample_planning_wok10.xlsx"
+    planning = scale_planning(excel_handler.load_planning_from_excel(sample), args.employees)
+    edited = planning.model_copy(deep=True)
+    edited.employees[args.employees // 2].tuesday.evening = ShiftData(start_time="18:00", end_time="22:30", meals=1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "planning.xlsx"
+        excel_handler.write_planning_file([planning], path)
+
+        rebuild = best_of(args.repeat, lambda: excel_handler.update_planning_in_excel(path, edited))
+        excel_handler.write_planning_file([planning], path)
+        incremental = best_of(args.repeat, lambda: excel_handler.update_planning_in_excel(path, edited, planning))
+
+        # Le fichier mis à jour par cellules doit contenir les mêmes valeurs qu'une reconstruction
+        rebuilt_path = Path(tmp) / "rebuilt.xlsx"
+        expected = load_workbook(excel_handler.write_planning_file([edited], rebuilt_path)).active
+        actual = load_workbook(path).active
+        # openpyxl relit les chaînes vides comme None
+        same = all(
+            (a.value if a.value != "" else None) == b.value
+            for row_a, row_b in zip(expected.iter_rows(), actual.iter_rows())
+            for a, b in zip(row_a, row_b)
+        )
+
+    print(f"{args.employees} employés, un service modifié")
+    print(f"reconstruction complète  {rebuild:>7.2f} s")
+    print(f"mise à jour par cellules {incremental:>7.2f} s  x{rebuild / incremental:.2f}")
+    print(f"contenu identique        {same}")
+
+
+if __name__ == "__main__":
+    main()
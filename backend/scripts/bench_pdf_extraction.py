@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Compare l'extraction du PDF en deux passes, en une passe et avec un pool de processus.
+
+Génère un planning de plusieurs dizaines de pages avec PDFGenerator, puis
+mesure chaque variante sur le même fichier.
+
+Usage: python scripts/bench_pdf_extraction.py [--pages 24] [--workers 4]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services.excel_handler import excel_handler
+from app.services.pdf_generator import PDFGenerator, MAX_EMPLOYEES_PER_PAGE
+from app.services.pdf_parser import pdf_parser
+from scripts.bench_planning_encoding import scale_planning
+
+
+def timed(label: str, func, baseline: float = None) -> float:
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    speedup = f"  x{baseline / elapsed:.2f}" if baseline else ""
+    print(f"{label:<32} {elapsed:>7.2f} s{speedup}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=24)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    sample = Path(__file__).parent.parent / "data" / "templates" / "sample_planning_wok10.xlsx"
+    planning = scale_planning(excel_handler.load_planning_from_excel(sample), args.pages * MAX_EMPLOYEES_PER_PAGE)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = Path(tmp) / "bench.pdf"
+        PDFGenerator().generate_planning_pdf(planning, pdf_path)
+        page_count = len(list(pdf_parser.iter_pages(pdf_path)))
+        print(f"{page_count} pages, {len(planning.employees)} employés\n")
+
+        # Ancien extract_all: extract_text puis extract_tables, deux ouvertures du fichier
+        baseline = timed(
+            "deux passes",
+            lambda: (pdf_parser.extract_text(pdf_path), pdf_parser.extract_tables(pdf_path)),
+        )
+        timed("une passe (iter_pages)", lambda: list(pdf_parser.iter_pages(pdf_path)), baseline)
+        settings.pdf_parallel_min_pages = 1
+        settings.process_pool_workers = args.workers
+        timed(f"pool de {args.workers} processus", lambda: pdf_parser.extract_pages(pdf_path), baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Compare la taille en tokens du planning JSON et de l'encodage compact."""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.models.schemas import WeekPlanning, EmployeeWeekSchedule
+from app.services.excel_handler import excel_handler
+from app.services.planning_codec import token_report
+
+
+def scale_planning(planning: WeekPlanning, size: int) -> WeekPlanning:
+    """Duplique les employés du planning jusqu'à atteindre `size` employés."""
+    employees = []
+    for i in range(size):
+        source = planning.employees[i % len(planning.employees)]
+        employees.append(EmployeeWeekSchedule(**{**source.model_dump(), "name": f"{source.name} {i}"}))
+    return WeekPlanning(week_number=planning.week_number, year=planning.year, employees=employees)
+
+
+def main():
+    sample = Path(__file__).parent.parent / "data" / "templates" / "sample_planning_wok10.xlsx"
+    planning = excel_handler.load_planning_from_excel(sample)
+
+    print(f"{'employés':>9} {'json indent':>12} {'json':>8} {'compact':>8} {'gain':>6} round-trip")
+    for size in (len(planning.employees), 30, 60, 120):
+        report = token_report(scale_planning(planning, size))
+        print(
+            f"{report['employees']:>9} {report['json_indent']:>12} {report['json']:>8} "
+            f"{report['compact']:>8} {report['reduction_vs_json_indent']:>6.0%} {report['round_trip_ok']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
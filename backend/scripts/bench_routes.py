@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Mesure la latence et le débit de chaque route de l'API.
+
+À lancer contre un backend branché sur le serveur de test (aucun appel réseau):
+    python scripts/openai_stub_server.py --port 8001 &
+    OPENAI_BASE_URL=http://localhost:8001/v1 OPENAI_API_KEY=stub AI_CACHE_ENABLED=false \\
+        uvicorn app.main:app --port 8000 &
+    python scripts/bench_routes.py --requests 50 --concurrency 10
+
+Avec AI_RECORD_MODE=replay à la place du serveur de test, les réponses
+enregistrées (AI_RECORD_MODE=record) sont rejouées à l'identique.
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+from app.services.excel_handler import excel_handler
+from app.services.pdf_generator import pdf_generator
+
+
+SAMPLE_EXCEL = Path(__file__).parent.parent / "data" / "templates" / "sample_planning_wok10.xlsx"
+
+
+def build_scenarios(pdf_path: Path) -> dict:
+    excel_bytes = SAMPLE_EXCEL.read_bytes()
+    pdf_bytes = pdf_path.read_bytes()
+    xlsx_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    return {
+        "GET /health": lambda c, i: c.get("/health"),
+        "GET /api/planning/current": lambda c, i: c.get("/api/planning/current"),
+        "POST /api/upload/excel": lambda c, i: c.post(
+            "/api/upload/excel", files={"file": ("planning.xlsx", excel_bytes, xlsx_type)}
+        ),
+        "POST /api/upload/pdf": lambda c, i: c.post(
+            "/api/upload/pdf", files={"file": ("planning.pdf", pdf_bytes, "application/pdf")}
+        ),
+        "POST /api/planning/generate": lambda c, i: c.post(
+            "/api/planning/generate", json={"instructions": f"Planning standard, variante {i}"}
+        ),
+        "PUT /api/planning/ai-update": lambda c, i: c.put(
+            "/api/planning/ai-update", json={"instructions": f"Ajuste les horaires du midi ({i})"}
+        ),
+        "POST /api/chat/message": lambda c, i: c.post(
+            "/api/chat/message", json={"message": f"Propose un planning équilibré ({i})"}
+        ),
+        "POST /api/chat/message/stream": lambda c, i: c.post(
+            "/api/chat/message/stream", json={"message": f"Propose un planning équilibré ({i})"}
+        ),
+        "GET /api/export/excel": lambda c, i: c.get("/api/export/excel"),
+        "GET /api/export/pdf": lambda c, i: c.get("/api/export/pdf"),
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, send, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            response = await send(client, i)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+        "max": latencies[-1],
+        "rps": requests / elapsed,
+        "errors": errors,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=20, help="requêtes par route")
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--only", default="", help="filtre sur le nom de la route")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = Path(tmp) / "planning.pdf"
+        pdf_generator.generate_planning_pdf(excel_handler.load_planning_from_excel(SAMPLE_EXCEL), pdf_path)
+        scenarios = build_scenarios(pdf_path)
+
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=300) as client:
+            # Charger un planning pour les routes qui en ont besoin
+            await scenarios["POST /api/upload/excel"](client, 0)
+
+            print(f"{'route':<32} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'req/s':>7} {'err':>4}")
+            for name, send in scenarios.items():
+                if args.only and args.only not in name:
+                    continue
+                stats = await run_scenario(client, send, args.requests, args.concurrency)
+                print(
+                    f"{name:<32} {stats['p50'] * 1000:>8.0f} {stats['p95'] * 1000:>8.0f} "
+                    f"{stats['max'] * 1000:>8.0f} {stats['rps']:>7.1f} {stats['errors']:>4}"
+                )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
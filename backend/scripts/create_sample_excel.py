@@ -120,14 +120,11 @@ def main():
     # Create sample planning
     planning = create_sample_planning()
 
-    # Create workbook
-    wb = excel_handler.create_planning_workbook(planning)
-
     # Save to templates directory
     output_path = Path(__file__).parent.parent / "data" / "templates" / "sample_planning.xlsx"
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    excel_handler.save_workbook(wb, output_path)
+    excel_handler.write_planning_file([planning], output_path)
     print(f"Sample Excel file created: {output_path}")
 
     # Print summary
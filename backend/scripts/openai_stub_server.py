@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Serveur local compatible avec l'API chat.completions d'OpenAI, pour les tests de charge.
+
+Répond sans réseau ni clé API, avec une latence configurable:
+- requêtes JSON (response_format json_object): planning canné, ou {"edits": []}
+  pour les mises à jour par éditions;
+- requêtes de chat: texte + planning dans un bloc ```json```;
+- stream=True: réponse découpée en fragments SSE.
+
+Si --recordings est fourni, une requête déjà enregistrée (AI_RECORD_MODE=record)
+est servie avec la réponse enregistrée.
+
+Usage:
+    python scripts/openai_stub_server.py --port 8001 --latency 0.8
+    OPENAI_BASE_URL=http://localhost:8001/v1 OPENAI_API_KEY=stub uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from app.core.ai_client import RecordReplayTransport
+from app.models.schemas import WeekPlanning
+from app.services.excel_handler import excel_handler
+from app.services.planning_codec import estimate_tokens
+
+
+DEFAULT_PLANNING = Path(__file__).parent.parent / "data" / "templates" / "sample_planning_wok10.xlsx"
+
+
+def load_planning(path: Path) -> WeekPlanning:
+    if path.suffix == ".json":
+        return WeekPlanning.model_validate_json(path.read_text(encoding="utf-8"))
+    return excel_handler.load_planning_from_excel(path)
+
+
+def create_app(
+    planning: WeekPlanning,
+    latency: float,
+    token_delay: float,
+    chunk_size: int,
+    recordings: Path = None,
+) -> FastAPI:
+    app = FastAPI(title="OpenAI stub")
+    planning_json = planning.model_dump_json()
+
+    def reply_for(body: dict) -> str:
+        messages = body.get("messages", [])
+        system_prompt = messages[0]["content"] if messages else ""
+        if body.get("response_format", {}).get("type") == "json_object":
+            return '{"edits": []}' if '"edits"' in system_prompt else planning_json
+        return f"Voici le planning demandé.\n```json\n{planning_json}\n```"
+
+    def usage_for(body: dict, content: str) -> dict:
+        prompt_tokens = sum(estimate_tokens(m.get("content") or "") for m in body.get("messages", []))
+        completion_tokens = estimate_tokens(content)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    async def stream_reply(body: dict, content: str, completion_id: str):
+        base = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": body["model"]}
+        for start in range(0, len(content), chunk_size):
+            chunk = {**base, "choices": [{"index": 0, "delta": {"content": content[start:start + chunk_size]}, "finish_reason": None}]}
+            yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+            if token_delay:
+                await asyncio.sleep(token_delay)
+        yield f"data: {json.dumps({**base, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})}\n\n"
+        if body.get("stream_options", {}).get("include_usage"):
+            yield f"data: {json.dumps({**base, 'choices': [], 'usage': usage_for(body, content)})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        raw_body = await request.body()
+        body = json.loads(raw_body)
+        await asyncio.sleep(latency)
+
+        if recordings:
+            key = RecordReplayTransport.request_key(
+                httpx.Request("POST", request.url.path, content=raw_body)
+            )
+            path = recordings / f"{key}.json"
+            if path.exists():
+                recording = json.loads(path.read_text(encoding="utf-8"))
+                return Response(
+                    recording["body"],
+                    status_code=recording["status_code"],
+                    media_type=recording["headers"].get("content-type"),
+                )
+
+        content = reply_for(body)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        if body.get("stream"):
+            return StreamingResponse(stream_reply(body, content, completion_id), media_type="text/event-stream")
+
+        return JSONResponse({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage_for(body, content),
+        })
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.5, help="secondes avant la réponse")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="secondes entre deux fragments streamés")
+    parser.add_argument("--chunk-size", type=int, default=16, help="caractères par fragment streamé")
+    parser.add_argument("--planning", type=Path, default=DEFAULT_PLANNING, help="planning canné (.xlsx ou .json)")
+    parser.add_argument("--recordings", type=Path, default=None, help="répertoire d'enregistrements à rejouer")
+    args = parser.parse_args()
+
+    app = create_app(load_planning(args.planning), args.latency, args.token_delay, args.chunk_size, args.recordings)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
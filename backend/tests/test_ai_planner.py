@@ -0,0 +1,32 @@
+import pytest
+
+from app.services.ai_planner import PARSE_ERRORS, ai_planner
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '[{"name": "DUPONT Jean"}]',
+        '{"employees": {"name": "DUPONT Jean"}}',
+        '{"employees": [null]}',
+        '{"employees": [{"name": "DUPONT Jean", "monday": 1}]}',
+        '{"employees": [{"name": "DUPONT Jean", "monday": {"evening": [1]}}]}',
+        '{"employees": [{"name": "DUPONT Jean", "monday": {"evening": {"meals": [1]}}}]}',
+        '{"employees": [{"monday": {}}]}',
+    ],
+)
+def test_malformed_planning_raises_a_parse_error(text):
+    # Ces erreurs déclenchent le repli sur le grand modèle au lieu d'une erreur 500
+    with pytest.raises(PARSE_ERRORS):
+        ai_planner._parse_response(text)
+
+
+def test_null_values_are_empty():
+    planning = ai_planner._parse_response(
+        '{"employees": [{"name": "DUPONT Jean", "monday": null, "tuesday": {"evening": {"meals": null}}}]}'
+    )
+    assert planning.employees[0].tuesday.evening.meals == 0
+
+
+def test_chat_block_without_name_is_not_a_planning():
+    assert ai_planner._extract_chat_planning('Voici:\n```json\n{"employees": [{"monday": {}}]}\n```') is None
@@ -0,0 +1,27 @@
+from pydantic import ValidationError
+import pytest
+
+from app.core.config import settings
+from app.models.schemas import BatchGenerateRequest
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {"start_week": 10, "end_week": 2},
+        {"start_week": 0, "end_week": 3},
+        {"start_week": 1, "end_week": 10000},
+        {"start_week": 3},
+        {"weeks": [{"week_number": 54, "year": 2025}]},
+    ],
+)
+def test_invalid_week_ranges_are_rejected(fields):
+    with pytest.raises(ValidationError):
+        BatchGenerateRequest(**fields)
+
+
+def test_batch_size_is_capped(monkeypatch):
+    monkeypatch.setattr(settings, "batch_max_weeks", 4)
+    BatchGenerateRequest(start_week=1, end_week=4)
+    with pytest.raises(ValidationError):
+        BatchGenerateRequest(start_week=1, end_week=4, weeks=[{"week_number": 10, "year": 2025}])
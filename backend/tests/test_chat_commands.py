@@ -0,0 +1,82 @@
+from app.models.schemas import (
+    WeekPlanning,
+    EmployeeWeekSchedule,
+    DaySchedule,
+    ShiftData,
+    DayOfWeek,
+    ServiceType,
+    PlanningEditAction,
+)
+from app.services.chat_commands import ChatCommandParser
+
+
+def _planning() -> WeekPlanning:
+    day = DaySchedule(
+        afternoon=ShiftData(start_time="11:00", end_time="15:00", meals=1),
+        evening=ShiftData(start_time="18:00", end_time="23:00", meals=1),
+    )
+    employees = [
+        EmployeeWeekSchedule(name=name, **{d.value: day for d in DayOfWeek})
+        for name in ["MARTIN Sam", "DE SOUZA Ana", "DUPONT Jean"]
+    ]
+    return WeekPlanning(week_number=5, year=2025, employees=employees)
+
+
+def test_unknown_employee_is_left_to_the_model():
+    # "de" ne doit pas désigner DE SOUZA Ana
+    assert ChatCommandParser().parse("décale Paul de 30 min mardi midi", _planning()) is None
+
+
+def test_move_with_filler_word():
+    edits = ChatCommandParser().parse("décale Dupont de 30 min mardi midi", _planning())
+    assert len(edits) == 1
+    assert edits[0].employee == "DUPONT Jean"
+    assert (edits[0].day, edits[0].service) == (DayOfWeek.TUESDAY, ServiceType.AFTERNOON)
+    assert (edits[0].start_time, edits[0].end_time) == ("11:30", "15:30")
+
+
+def test_name_word_is_not_read_as_a_day():
+    edits = ChatCommandParser().parse("Sam off lundi soir", _planning())
+    assert [(e.employee, e.action, e.day, e.service) for e in edits] == [
+        ("MARTIN Sam", PlanningEditAction.CLEAR_SHIFT, DayOfWeek.MONDAY, ServiceType.EVENING)
+    ]
+
+
+def test_mar_is_tuesday():
+    edits = ChatCommandParser().parse("Dupont off mar soir", _planning())
+    assert [e.day for e in edits] == [DayOfWeek.TUESDAY]
+
+
+def test_two_employees_named_is_left_to_the_model():
+    assert ChatCommandParser().parse("Martin remplace Dupont lundi soir", _planning()) is None
+
+
+def test_shared_surname_needs_the_first_name():
+    planning = _planning()
+    planning.employees.append(EmployeeWeekSchedule(name="DUPONT Marie"))
+    parser = ChatCommandParser()
+    assert parser.parse("Dupont off lundi soir", planning) is None
+    edits = parser.parse("Dupont Marie off lundi soir", planning)
+    assert [e.employee for e in edits] == ["DUPONT Marie"]
+
+
+def test_duration_is_not_read_as_day_off():
+    assert ChatCommandParser().parse("enlève 30 min à Dupont lundi midi", _planning()) is None
+    assert ChatCommandParser().parse("supprime 2h à Dupont lundi soir", _planning()) is None
+
+
+def test_mixed_off_and_work_is_left_to_the_model():
+    parser = ChatCommandParser()
+    assert parser.parse("Dupont off samedi, travaille dimanche 18h-23h", _planning()) is None
+    assert parser.parse("Dupont off samedi, travaille dimanche", _planning()) is None
+
+
+def test_several_time_ranges_are_left_to_the_model():
+    assert ChatCommandParser().parse("Dupont lundi 11h-15h et 18h-23h", _planning()) is None
+
+
+def test_hours_out_of_range_are_rejected():
+    parser = ChatCommandParser()
+    assert parser.parse("Dupont lundi soir 25h-26h", _planning()) is None
+    edits = parser.parse("Dupont lundi soir 18h30-23h", _planning())
+    assert [(e.start_time, e.end_time) for e in edits] == [("18:30", "23:00")]
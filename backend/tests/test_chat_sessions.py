@@ -0,0 +1,63 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.api.deps import PlanningStore
+from app.core.config import settings
+from app.models.schemas import ChatSession, ChatTurn
+from app.services.ai_planner import ai_planner
+
+
+def test_chat_sessions_are_capped(monkeypatch):
+    monkeypatch.setattr(settings, "chat_max_sessions", 2)
+    store = PlanningStore()
+    first = store.get_chat_session("a")
+    store.get_chat_session("b")
+    assert store.get_chat_session("a") is first  # "a" redevient la plus récente
+    store.get_chat_session("c")
+
+    assert store.get_chat_session("a") is first
+    assert list(store._chat_sessions) == ["c", "a"]
+
+
+def test_idle_chat_sessions_expire(monkeypatch):
+    monkeypatch.setattr(settings, "chat_session_ttl_seconds", 0)
+    store = PlanningStore()
+    first = store.get_chat_session("a")
+    assert store.get_chat_session("a") is not first
+
+
+def test_concurrent_compactions_keep_unsummarised_turns(monkeypatch):
+    monkeypatch.setattr(settings, "chat_history_token_budget", 100)
+    session = ChatSession(
+        id="a", turns=[ChatTurn(role="user", content=f"message {i} " + "x" * 80) for i in range(6)]
+    )
+    prompts = []
+
+    async def fake_completion(method, **kwargs):
+        prompt = kwargs["messages"][1]["content"]
+        prompts.append(prompt)
+        await asyncio.sleep(0.01)
+        summary = f"résumé {len(prompts)}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=summary))]), None
+
+    monkeypatch.setattr(ai_planner, "_create_completion", fake_completion)
+
+    async def run():
+        first = asyncio.ensure_future(ai_planner.compact_chat_session(session))
+        second = asyncio.ensure_future(ai_planner.compact_chat_session(session))
+        await asyncio.sleep(0)
+        # Message arrivé pendant le résumé
+        session.turns.append(ChatTurn(role="user", content="dernier"))
+        await asyncio.gather(first, second)
+
+    asyncio.run(run())
+
+    # Chaque message est soit résumé, soit encore dans la session, jamais perdu
+    kept = [turn.content for turn in session.turns]
+    for i in range(6):
+        content = f"message {i} " + "x" * 80
+        assert content in kept or any(content in prompt for prompt in prompts)
+    assert kept[-1] == "dernier"
+    # La seconde compaction attend la première et trouve l'historique déjà réduit
+    assert len(prompts) == 1
+    assert session.summary == "résumé 1"
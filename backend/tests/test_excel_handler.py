@@ -0,0 +1,75 @@
+from openpyxl import load_workbook
+
+from app.models.schemas import WeekPlanning, EmployeeWeekSchedule, DaySchedule, ShiftData
+from app.services.excel_handler import excel_handler
+
+
+def _planning(week_number: int = 12, names=("DUPONT Jean", "MARTIN Sam")) -> WeekPlanning:
+    day = DaySchedule(
+        afternoon=ShiftData(start_time="11:00", end_time="15:00", meals=1),
+        evening=ShiftData(start_time="18:00", end_time="23:00", meals=1),
+    )
+    return WeekPlanning(
+        week_number=week_number,
+        year=2025,
+        employees=[EmployeeWeekSchedule(name=name, monday=day, friday=day) for name in names],
+    )
+
+
+def test_sheet_title_with_a_label_keeps_its_week(tmp_path):
+    path = excel_handler.write_planning_file([_planning(), _planning(13)], tmp_path / "planning.xlsx")
+    wb = load_workbook(path)
+    wb["Semaine 12"].title = "Semaine 12 - Cuisine"
+    wb["Semaine 13"].title = "Semaine 13 2025 - Salle"
+    wb.save(path)
+
+    plannings = excel_handler.load_plannings_from_excel(path)
+    assert [(p.week_number, p.year) for p in plannings] == [(12, 2025), (13, 2025)]
+
+
+def _saved(tmp_path, planning: WeekPlanning):
+    return excel_handler.write_planning_file([planning], tmp_path / "planning.xlsx")
+
+
+def test_cell_edit_is_patched_in_the_sheet_xml(tmp_path, monkeypatch):
+    previous = _planning()
+    path = _saved(tmp_path, previous)
+    edited = previous.model_copy(deep=True)
+    edited.employees[1].monday.evening = ShiftData(start_time="19:00", end_time="22:30", meals=2)
+
+    patched = []
+    patch_sheet_xml = excel_handler._patch_sheet_xml
+
+    def spy(path, changes):
+        patched.append(patch_sheet_xml(path, changes))
+        return patched[-1]
+
+    monkeypatch.setattr(excel_handler, "_patch_sheet_xml", spy)
+    excel_handler.update_planning_in_excel(path, edited, previous)
+
+    assert patched == [True]
+    assert excel_handler.load_planning_from_excel(path) == edited
+
+
+def test_added_and_removed_rows(tmp_path):
+    previous = _planning()
+    path = _saved(tmp_path, previous)
+
+    added = _planning(names=("DUPONT Jean", "MARTIN Sam", "DE SOUZA Ana"))
+    excel_handler.update_planning_in_excel(path, added, previous)
+    assert excel_handler.load_planning_from_excel(path) == added
+
+    removed = _planning(names=("DUPONT Jean",))
+    excel_handler.update_planning_in_excel(path, removed, added)
+    assert excel_handler.load_planning_from_excel(path) == removed
+
+
+def test_week_change_updates_title_and_sheet(tmp_path):
+    previous = _planning()
+    path = _saved(tmp_path, previous)
+    moved = _planning(week_number=14)
+
+    excel_handler.update_planning_in_excel(path, moved, previous)
+
+    assert load_workbook(path).active.title == "Semaine 14"
+    assert excel_handler.load_planning_from_excel(path) == moved
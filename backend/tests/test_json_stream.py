@@ -0,0 +1,46 @@
+import json
+
+from app.services.json_stream import EmployeeStreamParser
+
+
+PLANNING = {
+    "week_number": 5,
+    "notes": [{"name": "pas un employé"}],
+    "employees": [
+        {"name": 'DUPONT "Jo" {chef}', "monday": {"evening": {"start_time": "18:00", "meals": 1}}},
+        {"name": "MARTIN \\ Sam ]}", "tuesday": {}},
+    ],
+    "year": 2025,
+}
+
+
+def _feed(fragments) -> tuple[EmployeeStreamParser, list[dict]]:
+    parser = EmployeeStreamParser()
+    items = []
+    for fragment in fragments:
+        items.extend(parser.feed(fragment))
+    return parser, items
+
+
+def test_employees_split_on_every_character():
+    text = json.dumps(PLANNING)
+    parser, items = _feed(text)
+    assert items == PLANNING["employees"]
+    assert parser.text == text
+
+
+def test_each_employee_is_returned_with_its_closing_brace():
+    text = json.dumps(PLANNING)
+    parser = EmployeeStreamParser()
+    # Coupure juste avant puis juste après l'accolade fermante du premier employé
+    close = text.index(', {"name": "MARTIN') - 1
+    assert parser.feed(text[:close]) == []
+    assert parser.feed(text[close:close + 1]) == [PLANNING["employees"][0]]
+    assert parser.feed(text[close + 1:]) == [PLANNING["employees"][1]]
+
+
+def test_escape_split_across_fragments():
+    text = json.dumps({"employees": [{"name": 'A\\"}B'}]})
+    escape = text.index("\\")
+    _, items = _feed([text[:escape + 1], text[escape + 1:]])
+    assert items == [{"name": 'A\\"}B'}]
@@ -0,0 +1,40 @@
+from app.models.schemas import WeekPlanning, EmployeeWeekSchedule, DaySchedule, ShiftData
+from app.services.pdf_generator import PDFGenerator
+from app.services.pdf_layout import pdf_layout_parser
+from app.services.pdf_parser import pdf_parser
+
+
+def _planning() -> WeekPlanning:
+    lunch = ShiftData(start_time="11:00", end_time="15:00", meals=1)
+    dinner = ShiftData(start_time="18:30", end_time="23:00", meals=2)
+    return WeekPlanning(
+        week_number=12,
+        year=2025,
+        employees=[
+            EmployeeWeekSchedule(
+                name="DUPONT Jean",
+                monday=DaySchedule(afternoon=lunch, evening=dinner),
+                sunday=DaySchedule(evening=dinner),
+            ),
+            EmployeeWeekSchedule(name="MARTIN Sam", friday=DaySchedule(afternoon=lunch)),
+        ],
+    )
+
+
+def test_exported_pdf_is_read_back_without_the_model(tmp_path):
+    planning = _planning()
+    path = PDFGenerator().generate_planning_pdf(planning, tmp_path / "planning.pdf")
+    assert pdf_layout_parser.parse(pdf_parser.extract_pages(path)) == planning
+
+
+def test_foreign_table_layout_is_left_to_the_model():
+    pages = [
+        {
+            "page": 1,
+            "text": "Planning des employés - Semaine 12 du 17/03/2025 au 23/03/2025",
+            "tables": [
+                [["Nom", "Lundi", "Mardi"], ["DUPONT Jean", "11h-15h", "18h-23h"]],
+            ],
+        }
+    ]
+    assert pdf_layout_parser.parse(pages) is None
@@ -0,0 +1,26 @@
+import pytest
+
+from app.models.schemas import WeekPlanning, EmployeeWeekSchedule, DaySchedule, ShiftData
+from app.services.planning_codec import decode_planning, encode_planning
+
+
+@pytest.mark.parametrize(
+    "name",
+    ["DUPONT Jean", "A|B", "FIN\\", "A\\|B", "\\\\|", "A;B", "#1 CHEF", "LIGNE\nDEUX", "R\r\n", "\\n", " X"],
+)
+def test_round_trip_with_special_characters(name):
+    planning = WeekPlanning(
+        week_number=5,
+        year=2025,
+        employees=[
+            EmployeeWeekSchedule(
+                name=name,
+                monday=DaySchedule(
+                    afternoon=ShiftData(start_time="11:00", end_time="15:00", meals=1),
+                    evening=ShiftData(start_time="18:00", end_time="23:00", meals=2),
+                ),
+            ),
+            EmployeeWeekSchedule(name="MARTIN Sam", sunday=DaySchedule(evening=ShiftData(meals=1))),
+        ],
+    )
+    assert decode_planning(encode_planning(planning)) == planning
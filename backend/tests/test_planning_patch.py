@@ -0,0 +1,25 @@
+import pytest
+
+from app.models.schemas import WeekPlanning, EmployeeWeekSchedule
+from app.services.ai_planner import ai_planner
+from app.services.planning_patch import PlanningPatchError, find_employee_index
+
+
+def _planning() -> WeekPlanning:
+    return WeekPlanning(
+        week_number=5,
+        year=2025,
+        employees=[EmployeeWeekSchedule(name="CHARLEAU Marc"), EmployeeWeekSchedule(name="DUPONT Jean")],
+    )
+
+
+def test_partial_name_matches_whole_words_only():
+    assert find_employee_index(_planning(), "dupont") == 1
+    with pytest.raises(PlanningPatchError):
+        find_employee_index(_planning(), "Lea")
+
+
+@pytest.mark.parametrize("response", ["[]", '"edits"', '{"edits": {"employee": "x"}}'])
+def test_edits_response_that_is_not_an_object_is_a_patch_error(response):
+    with pytest.raises(PlanningPatchError):
+        ai_planner._parse_edits(response)
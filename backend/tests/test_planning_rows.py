@@ -0,0 +1,15 @@
+from app.models.schemas import WeekPlanning, EmployeeWeekSchedule, DaySchedule, ShiftData
+from app.services.planning_rows import iter_shift_rows, iter_csv
+
+
+def test_week_53_of_a_52_week_year_is_exported():
+    employee = EmployeeWeekSchedule(
+        name="DUPONT Jean",
+        monday=DaySchedule(afternoon=ShiftData(start_time="10:30", end_time="15:00", meals=1)),
+    )
+    planning = WeekPlanning(week_number=53, year=2025, employees=[employee])
+
+    rows = list(iter_shift_rows([planning]))
+
+    assert rows == [(2025, 53, "2025-12-29", "monday", "DUPONT Jean", "afternoon", "10:30", "15:00", 4.5, 1)]
+    assert "".join(iter_csv(rows)).count("\n") == 2
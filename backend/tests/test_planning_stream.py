@@ -0,0 +1,72 @@
+import asyncio
+
+from app.api.deps import PlanningStore
+from app.api.routes.planning import _stream_into_store
+from app.models.schemas import WeekPlanning, EmployeeWeekSchedule
+
+
+def _store() -> PlanningStore:
+    store = PlanningStore()
+    store.current_planning = WeekPlanning(week_number=4, year=2025, employees=[EmployeeWeekSchedule(name="A")])
+    return store
+
+
+async def _failing_events():
+    yield "employee", EmployeeWeekSchedule(name="B")
+    raise ValueError("model error")
+
+
+def test_failed_stream_drops_the_partial_week():
+    store = _store()
+    response = _stream_into_store(store, _failing_events(), 5, 2025, "ok")
+
+    async def consume():
+        return [line async for line in response.body_iterator]
+
+    lines = asyncio.run(consume())
+
+    assert '"error"' in lines[-1]
+    assert store.current_planning.week_number == 4
+    assert [p.week_number for p in store.plannings] == [4]
+
+
+async def _slow_events():
+    yield "employee", EmployeeWeekSchedule(name="B")
+    await asyncio.sleep(10)
+
+
+def test_client_disconnect_restores_the_previous_planning():
+    store = _store()
+    response = _stream_into_store(store, _slow_events(), 5, 2025, "ok")
+
+    async def disconnect_after_first_line():
+        stream = response.body_iterator
+        await stream.__anext__()
+        assert store.current_planning.week_number == 5
+        await stream.aclose()
+
+    asyncio.run(disconnect_after_first_line())
+
+    assert store.current_planning.week_number == 4
+    assert [p.week_number for p in store.plannings] == [4]
+
+
+def test_client_disconnect_closes_the_model_stream():
+    closed = []
+
+    async def events():
+        try:
+            yield "employee", EmployeeWeekSchedule(name="B")
+            await asyncio.sleep(10)
+        finally:
+            closed.append(True)
+
+    response = _stream_into_store(_store(), events(), 5, 2025, "ok")
+
+    async def disconnect_after_first_line():
+        stream = response.body_iterator
+        await stream.__anext__()
+        await stream.aclose()
+        assert closed == [True]
+
+    asyncio.run(disconnect_after_first_line())
@@ -0,0 +1,39 @@
+import asyncio
+from pathlib import Path
+import time
+
+from app.models.schemas import WeekPlanning
+from app.services import planning_writer as planning_writer_module
+from app.services.planning_writer import PlanningWriter
+
+
+def _planning(week_number: int) -> WeekPlanning:
+    return WeekPlanning(week_number=week_number, year=2025, employees=[])
+
+
+def test_debounce_applies_again_after_a_flush(monkeypatch):
+    written = []
+
+    def slow_write(path, planning, previous=None):
+        time.sleep(0.05)
+        written.append(planning.week_number)
+
+    monkeypatch.setattr(planning_writer_module.excel_handler, "update_planning_in_excel", slow_write)
+    writer = PlanningWriter(debounce_seconds=0.3, max_delay_seconds=5)
+    path = Path("planning.xlsx")
+
+    async def scenario():
+        writer.schedule(path, _planning(1))
+        flushing = asyncio.ensure_future(writer.flush())
+        await asyncio.sleep(0.02)
+        # Modifications arrivées pendant l'écriture demandée par flush(): délai normal
+        writer.schedule(path, _planning(2))
+        writer.schedule(path, _planning(3))
+        await asyncio.sleep(0.15)
+        assert written == [1]
+        await flushing
+        assert written == [1, 3]
+
+    asyncio.run(scenario())
+    assert writer.stats()["coalesced"] == 1
+    assert writer.stats()["writes"] == 2
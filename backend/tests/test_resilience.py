@@ -0,0 +1,72 @@
+import asyncio
+from collections import deque
+
+from app.core.resilience import CircuitBreaker, CircuitOpenError, ResilientCaller
+
+
+def test_cancelled_probe_releases_the_half_open_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.opened_at = 0.0  # ouvert depuis longtemps: demi-ouvert
+    caller = ResilientCaller(deadline=5, max_retries=0, backoff_base=0.1, backoff_max=1, breaker=breaker)
+
+    async def ok():
+        return "ok"
+
+    async def scenario():
+        probe = asyncio.create_task(caller.call(lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0.01)
+        probe.cancel()
+        try:
+            await probe
+        except asyncio.CancelledError:
+            pass
+        return await caller.call(ok)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert breaker.state == "closed"
+
+
+def test_only_the_probe_releases_the_half_open_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    assert breaker.before_call() is False  # fermé: pas une requête de test
+    breaker.opened_at = 0.0
+    assert breaker.before_call() is True
+    # Un second appel est refusé tant que la requête de test est en cours
+    try:
+        breaker.before_call()
+    except CircuitOpenError:
+        pass
+    else:
+        raise AssertionError("second probe allowed")
+
+
+def test_hedged_requests_are_cancelled_with_the_call():
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    caller = ResilientCaller(
+        deadline=0.05,
+        max_retries=0,
+        backoff_base=0.1,
+        backoff_max=1,
+        breaker=breaker,
+        hedging_enabled=True,
+        hedge_min_delay=1,
+        hedge_min_samples=1,
+    )
+    # Délai dépassé avant même le lancement de la requête doublée
+    caller._latencies["default"] = deque([0.01])
+    started = []
+
+    async def slow():
+        started.append(asyncio.current_task())
+        await asyncio.sleep(10)
+
+    async def scenario():
+        try:
+            await caller.call(slow)
+        except asyncio.TimeoutError:
+            pass
+        await asyncio.sleep(0)
+        assert len(started) == 1
+        assert all(task.done() for task in started)
+
+    asyncio.run(scenario())
@@ -0,0 +1,16 @@
+import asyncio
+
+from app.services.response_cache import ResponseCache
+
+
+def test_disk_entries_survive_a_new_instance_and_are_pruned(tmp_path):
+    async def scenario():
+        cache = ResponseCache(cache_dir=tmp_path, max_disk_entries=10)
+        for index in range(25):
+            await cache.set(f"key{index}", f"value{index}")
+        reloaded = ResponseCache(cache_dir=tmp_path, max_disk_entries=10)
+        return await reloaded.get("key24"), reloaded.disk_hits
+
+    assert asyncio.run(scenario()) == ("value24", 1)
+    # Élagage toutes les max_disk_entries // 10 écritures: jamais plus d'une écriture au-delà de la limite
+    assert len(list(tmp_path.glob("*.json"))) <= 11
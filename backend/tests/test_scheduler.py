@@ -0,0 +1,61 @@
+from app.models.schemas import (
+    DayOfWeek,
+    EmployeeConstraints,
+    SchedulingConstraints,
+    ServiceSlot,
+    ServiceType,
+    StaffingTarget,
+)
+from app.services.scheduler import DAYS, PlanningScheduler
+
+
+def _constraints() -> SchedulingConstraints:
+    return SchedulingConstraints(
+        employees=[
+            EmployeeConstraints(name="DUPONT Jean", contract_hours=35, max_days=5),
+            EmployeeConstraints(name="MARTIN Sam", contract_hours=24, max_days=4, unavailable_days=[DayOfWeek.MONDAY]),
+            EmployeeConstraints(
+                name="DE SOUZA Ana",
+                contract_hours=30,
+                unavailable_services=[ServiceSlot(day=DayOfWeek.SATURDAY, service=ServiceType.EVENING)],
+            ),
+            EmployeeConstraints(name="LEROY Paul", contract_hours=20, max_days=3),
+        ],
+        default_staff=2,
+    )
+
+
+def _worked(employee, day: str, service: ServiceType) -> bool:
+    return bool(getattr(getattr(employee, day), service.value).start_time)
+
+
+def test_same_constraints_give_the_same_planning():
+    scheduler = PlanningScheduler()
+    first = scheduler.generate(_constraints(), 5, 2025)
+    second = scheduler.generate(_constraints(), 5, 2025)
+    assert first == second
+
+
+def test_hours_days_and_unavailability_are_respected():
+    constraints = _constraints()
+    planning, _ = PlanningScheduler().generate(constraints, 5, 2025)
+
+    for rules, employee in zip(constraints.employees, planning.employees):
+        assert employee.name == rules.name
+        assert sum(getattr(employee, day).total_hours for day in DAYS) <= rules.contract_hours
+        days = [day for day in DAYS if any(_worked(employee, day, service) for service in ServiceType)]
+        assert len(days) <= rules.max_days
+        for day in rules.unavailable_days:
+            assert day.value not in days
+        for slot in rules.unavailable_services:
+            assert not _worked(employee, slot.day.value, slot.service)
+
+
+def test_impossible_coverage_is_reported():
+    constraints = _constraints()
+    constraints.staffing = [StaffingTarget(service=ServiceType.EVENING, staff=5, day=DayOfWeek.FRIDAY)]
+    planning, warnings = PlanningScheduler().generate(constraints, 5, 2025)
+
+    friday_evening = sum(_worked(employee, "friday", ServiceType.EVENING) for employee in planning.employees)
+    assert friday_evening <= 4
+    assert f"Vendredi soir: {friday_evening}/5 employés" in warnings
@@ -0,0 +1,60 @@
+import asyncio
+import hashlib
+import io
+
+from fastapi import UploadFile
+import pytest
+
+from app.models.schemas import WeekPlanning
+from app.services.response_cache import ResponseCache
+from app.services.upload_storage import UploadStorage, UploadTooLargeError, UploadTypeError
+
+
+PDF = b"%PDF-1.4\n" + b"x" * 3000
+
+
+def _storage(tmp_path) -> UploadStorage:
+    return UploadStorage(tmp_path / "uploads", ResponseCache(cache_dir=tmp_path / "cache", ttl_seconds=60))
+
+
+def _save(storage: UploadStorage, content: bytes, file_type: str = "pdf", **kwargs):
+    upload = UploadFile(io.BytesIO(content), filename=f"planning.{file_type}")
+    return asyncio.run(storage.save(upload, f".{file_type.upper()}", file_type, **kwargs))
+
+
+def test_same_content_is_stored_once_under_its_hash(tmp_path):
+    storage = _storage(tmp_path)
+    first_path, digest = _save(storage, PDF)
+    second_path, _ = _save(storage, PDF)
+
+    assert digest == hashlib.sha256(PDF).hexdigest()
+    assert first_path == second_path == tmp_path / "uploads" / f"{digest}.pdf"
+    assert first_path.read_bytes() == PDF
+    assert [p.name for p in (tmp_path / "uploads").iterdir()] == [first_path.name]
+
+
+def test_wrong_magic_number_is_rejected(tmp_path):
+    storage = _storage(tmp_path)
+    with pytest.raises(UploadTypeError):
+        _save(storage, PDF, file_type="xlsx")
+    assert list((tmp_path / "uploads").iterdir()) == []
+
+
+def test_size_limit(tmp_path):
+    storage = _storage(tmp_path)
+    with pytest.raises(UploadTooLargeError):
+        _save(storage, PDF, max_bytes=len(PDF) - 1)
+    assert list((tmp_path / "uploads").iterdir()) == []
+    assert _save(storage, PDF, max_bytes=len(PDF))[0].exists()
+
+
+def test_planning_is_remembered_by_hash(tmp_path):
+    storage = _storage(tmp_path)
+    planning = WeekPlanning(week_number=5, year=2025, employees=[])
+
+    async def scenario():
+        assert await storage.get_planning("abc", "pdf") is None
+        await storage.set_planning("abc", "pdf", planning)
+        return await storage.get_planning("abc", "pdf")
+
+    assert asyncio.run(scenario()) == planning
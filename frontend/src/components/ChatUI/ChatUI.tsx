@@ -1,6 +1,6 @@
 import { useState, useRef, useEffect } from 'react';
 import { Send, Bot, User } from 'lucide-react';
-import { sendChatMessage } from '../../services/api';
+import { sendChatMessageStream } from '../../services/api';
 
 interface Message {
   role: 'user' | 'assistant';
@@ -21,6 +21,8 @@ export function ChatUI({ onPlanningUpdate }: ChatUIProps) {
   const [input, setInput] = useState('');
   const [isLoading, setIsLoading] = useState(false);
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  // Identifiant de la conversation: le serveur y conserve l'historique résumé
+  const sessionIdRef = useRef<string>(crypto.randomUUID());
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
@@ -40,14 +42,38 @@ export function ChatUI({ onPlanningUpdate }: ChatUIProps) {
     setIsLoading(true);
 
     try {
-      const response = await sendChatMessage(userMessage);
+      let started = false;
+      let planningRefreshed = false;
 
-      setMessages((prev) => [
-        ...prev,
-        { role: 'assistant', content: response.response },
-      ]);
+      // Afficher les tokens au fur et à mesure de leur arrivée
+      const appendToken = (content: string) => {
+        if (!started) {
+          started = true;
+          setMessages((prev) => [...prev, { role: 'assistant', content }]);
+          return;
+        }
+        setMessages((prev) => {
+          const last = prev[prev.length - 1];
+          return [...prev.slice(0, -1), { ...last, content: last.content + content }];
+        });
+      };
+
+      const response = await sendChatMessageStream(userMessage, {
+        onToken: appendToken,
+        onPlanning: () => {
+          planningRefreshed = true;
+          onPlanningUpdate();
+        },
+      }, sessionIdRef.current);
+
+      if (!started) {
+        setMessages((prev) => [
+          ...prev,
+          { role: 'assistant', content: response.response },
+        ]);
+      }
 
-      if (response.planning_updated) {
+      if (response.planning_updated && !planningRefreshed) {
         onPlanningUpdate();
       }
     } catch (error) {
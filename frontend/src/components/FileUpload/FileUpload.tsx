@@ -47,7 +47,7 @@ export function FileUpload({ onUploadSuccess }: FileUploadProps) {
 
       if (fileName.endsWith('.pdf')) {
         await uploadPdf(file, true);
-      } else if (fileName.endsWith('.xlsx') || fileName.endsWith('.xls')) {
+      } else if (fileName.endsWith('.xlsx')) {
         await uploadExcel(file);
       } else {
         setError('Veuillez importer un fichier PDF ou Excel');
@@ -79,7 +79,7 @@ export function FileUpload({ onUploadSuccess }: FileUploadProps) {
           type="file"
           id="file-upload"
           className="hidden"
-          accept=".pdf,.xlsx,.xls"
+          accept=".pdf,.xlsx"
           onChange={handleFileSelect}
           disabled={isUploading}
         />
@@ -71,13 +71,76 @@ export const clearPlanning = async (): Promise<PlanningResponse> => {
 };
 
 // Chat endpoint
-export const sendChatMessage = async (message: string): Promise<ChatResponse> => {
+export const sendChatMessage = async (
+  message: string,
+  sessionId?: string
+): Promise<ChatResponse> => {
   const response = await api.post<ChatResponse>('/chat/message', {
     message,
+    session_id: sessionId,
   });
   return response.data;
 };
 
+// Chat endpoint (streaming, Server-Sent Events)
+export interface ChatStreamHandlers {
+  onToken?: (content: string) => void;
+  onPlanning?: (response: ChatResponse) => void;
+}
+
+export const sendChatMessageStream = async (
+  message: string,
+  handlers: ChatStreamHandlers = {},
+  sessionId?: string
+): Promise<ChatResponse> => {
+  const response = await fetch('/api/chat/message/stream', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ message, session_id: sessionId }),
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`Chat stream failed: ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let result: ChatResponse | null = null;
+
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // Les événements SSE sont séparés par une ligne vide
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary >= 0) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+
+      let event = 'message';
+      let data = '';
+      for (const line of rawEvent.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      if (!data) continue;
+      const payload = JSON.parse(data);
+
+      if (event === 'token') handlers.onToken?.(payload.content);
+      else if (event === 'planning') handlers.onPlanning?.(payload);
+      else if (event === 'done') result = payload;
+      else if (event === 'error') throw new Error(payload.detail);
+    }
+  }
+
+  if (!result) {
+    throw new Error('Chat stream ended without a final response');
+  }
+  return result;
+};
+
 // Export endpoints
 export const exportPdf = (): string => '/api/export/pdf';
 export const exportExcel = (): string => '/api/export/excel';
@@ -41,6 +41,7 @@ export interface ChatResponse {
   response: string;
   planning_updated: boolean;
   planning: WeekPlanning | null;
+  session_id?: string | null;
 }
 
 export interface UploadResponse {